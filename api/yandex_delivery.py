@@ -5,10 +5,19 @@ from decimal import Decimal
 
 import aiohttp
 
+from utils.cache import async_ttl_cache
 from utils.logger import get_logger
 
 log = get_logger("[YandexDeliveryAPI]")
 
+# Сколько секунд считать информацию по заявке актуальной (защита от повторных кликов админа/клиента)
+CLAIM_INFO_TTL = 30.0
+# Планировщик опрашивает все активные заявки — без предела кэш рос бы на весь срок жизни процесса
+CLAIM_INFO_CACHE_SIZE = 256
+# Координаты адреса практически не меняются: держим до суток, не больше GEOCODE_CACHE_SIZE адресов
+GEOCODE_TTL = 24 * 60 * 60.0
+GEOCODE_CACHE_SIZE = 256
+
 
 def decimal_default_serializer(obj):
     if isinstance(obj, Decimal):
@@ -19,7 +28,13 @@ def decimal_default_serializer(obj):
 async def geocode_address(address: str) -> tuple[float, float] | None:
     """
     Преобразует адрес в координаты (lat, lon) через OpenStreetMap Nominatim API.
+    Повторные запросы того же адреса (с точностью до регистра и пробелов) берутся из кэша.
     """
+    return await _geocode_normalized(" ".join(address.lower().split()))
+
+
+@async_ttl_cache(ttl=GEOCODE_TTL, cache_none=False, maxsize=GEOCODE_CACHE_SIZE)
+async def _geocode_normalized(address: str) -> tuple[float, float] | None:
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": address, "format": "json", "limit": 1}
     headers = {"User-Agent": "MyDeliveryBot/1.0"}
@@ -55,7 +70,8 @@ class YandexDeliveryClient:
 
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
-            connector = aiohttp.TCPConnector(ssl=False)
+            # Одна сессия на клиента: keep-alive соединения и DNS переиспользуются между запросами
+            connector = aiohttp.TCPConnector(ssl=False, limit=32, ttl_dns_cache=300, keepalive_timeout=30)
             self._session = aiohttp.ClientSession(
                 headers=self._headers,
                 json_serialize=lambda obj: json.dumps(obj, default=decimal_default_serializer),
@@ -80,13 +96,13 @@ class YandexDeliveryClient:
             async with session.request(method, url, json=json_payload, params=params) as response:
                 data = await response.json()
                 if 200 <= response.status < 300:
-                    log.debug(f"{method} {path} -> {response.status}")
+                    log.debug("%s %s -> %s", method, path, response.status)
                     return data
                 else:
-                    log.error(f"Ошибка API Яндекса ({response.status}) {method} {path}: {data}")
+                    log.error("Ошибка API Яндекса (%s) %s %s: %s", response.status, method, path, data)
                     return None
         except Exception as e:
-            log.exception(f"Исключение при {method} {path}: {e}")
+            log.exception("Исключение при %s %s: %s", method, path, e)
             return None
 
     async def calculate_price(
@@ -105,7 +121,7 @@ class YandexDeliveryClient:
         # --- 1. Получаем координаты клиента ---
         coords = await geocode_address(client_address)
         if not coords:
-            log.error(f"Не удалось геокодировать адрес клиента: {client_address}")
+            log.error("Не удалось геокодировать адрес клиента: %s", client_address)
             return None
         client_lon, client_lat = coords
 
@@ -145,18 +161,28 @@ class YandexDeliveryClient:
             "requirements": {"taxi_class": "express"},
         }
 
-        log.debug(f"Отправка payload в {path}: {json.dumps(payload, indent=2, default=decimal_default_serializer)}")
+        log.debug("Отправка payload в %s: %s", path, json.dumps(payload, indent=2, default=decimal_default_serializer))
         response_data = await self._make_request("POST", path, json_payload=payload)
 
         if response_data and "price" in response_data:
             return float(response_data["price"])
 
-        log.warning(f"Не удалось получить стоимость доставки для адреса: {client_address}. Ответ API: {response_data}")
+        log.warning(
+            "Не удалось получить стоимость доставки для адреса: %s. Ответ API: %s", client_address, response_data
+        )
         return None
 
+    @async_ttl_cache(ttl=CLAIM_INFO_TTL, cache_none=False, maxsize=CLAIM_INFO_CACHE_SIZE)
     async def get_claim_info(self, claim_id: str) -> Optional[Dict[str, Any]]:
         """
-        Получает полную, актуальную информацию по существующей заявке.
+        Информация по заявке с кэшем на CLAIM_INFO_TTL секунд (защита от повторных кликов).
+        Там, где нужен актуальный статус или version, используйте fetch_claim_info.
+        """
+        return await self.fetch_claim_info(claim_id)
+
+    async def fetch_claim_info(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Получает полную, актуальную информацию по существующей заявке, минуя кэш.
         (метод /b2b/cargo/integration/v2/claims/info)
         """
         path = "/b2b/cargo/integration/v2/claims/info"
@@ -166,10 +192,10 @@ class YandexDeliveryClient:
         response_data = await self._make_request("POST", path, params=params, json_payload={})
 
         if response_data and "id" in response_data:
-            log.info(f"Получена информация для заявки {claim_id}. Статус: {response_data.get('status')}")
+            log.info("Получена информация для заявки %s. Статус: %s", claim_id, response_data.get('status'))
             return response_data
 
-        log.warning(f"Не удалось получить информацию для заявки {claim_id}. Ответ: {response_data}")
+        log.warning("Не удалось получить информацию для заявки %s. Ответ: %s", claim_id, response_data)
         return None
 
     async def create_claim(
@@ -190,7 +216,7 @@ class YandexDeliveryClient:
         if "latitude" not in client_info or "longitude" not in client_info:
             coords = await geocode_address(client_info["address"])
             if not coords:
-                log.error(f"Не удалось найти координаты для адреса: {client_info['address']}")
+                log.error("Не удалось найти координаты для адреса: %s", client_info['address'])
                 return None
             client_info["longitude"], client_info["latitude"] = coords
 
@@ -255,13 +281,13 @@ class YandexDeliveryClient:
         # Добавляем request_id как query-параметр, а не в тело
         params = {"request_id": str(uuid.uuid4())}
 
-        log.debug(f"Отправка payload в {path}: {json.dumps(payload, indent=2, default=decimal_default_serializer)}")
+        log.debug("Отправка payload в %s: %s", path, json.dumps(payload, indent=2, default=decimal_default_serializer))
         response_data = await self._make_request("POST", path, json_payload=payload, params=params)
 
         if response_data and "id" in response_data:
             return response_data["id"]
 
-        log.error(f"Не удалось создать заявку для заказа #{order_id}. Ответ API: {response_data}")
+        log.error("Не удалось создать заявку для заказа #%s. Ответ API: %s", order_id, response_data)
         return None
 
     async def accept_claim(self, claim_id: str, version: int = 1) -> Optional[Dict[str, Any]]:
@@ -276,12 +302,13 @@ class YandexDeliveryClient:
         response_data = await self._make_request(
             "POST", path, json_payload=payload, params=params
         )
+        self.get_claim_info.invalidate()
 
         if response_data and "id" in response_data:
-            log.info(f"Заявка {claim_id} успешно подтверждена. Новый статус: {response_data.get('status')}")
+            log.info("Заявка %s успешно подтверждена. Новый статус: %s", claim_id, response_data.get('status'))
             return response_data  # <-- Возвращаем весь ответ
 
-        log.error(f"Ошибка подтверждения заявки {claim_id}. Ответ: {response_data}")
+        log.error("Ошибка подтверждения заявки %s. Ответ: %s", claim_id, response_data)
         return None
 
     async def get_courier_phone(self, claim_id: str) -> Optional[Dict[str, Any]]:
@@ -296,10 +323,10 @@ class YandexDeliveryClient:
         response_data = await self._make_request("POST", path, json_payload=payload)
 
         if response_data and "phone" in response_data:
-            log.info(f"Получен телефон курьера для заявки {claim_id}: {response_data['phone']}")
+            log.info("Получен телефон курьера для заявки %s: %s", claim_id, response_data['phone'])
             return response_data  # Возвращаем весь словарь {'phone': '...', 'ext': '...', 'ttl_seconds': ...}
 
-        log.warning(f"Не удалось получить телефон курьера для заявки {claim_id}. Ответ: {response_data}")
+        log.warning("Не удалось получить телефон курьера для заявки %s. Ответ: %s", claim_id, response_data)
         return None
 
     async def get_points_eta(self, claim_id: str) -> Optional[Dict[str, Any]]:
@@ -314,10 +341,10 @@ class YandexDeliveryClient:
         response_data = await self._make_request("POST", path, params=params, json_payload={})
 
         if response_data and "route_points" in response_data:
-            log.info(f"Получен ETA для заявки {claim_id}.")
+            log.info("Получен ETA для заявки %s.", claim_id)
             return response_data  # Возвращаем полный ответ со всеми точками
 
-        log.warning(f"Не удалось получить ETA для заявки {claim_id}. Ответ: {response_data}")
+        log.warning("Не удалось получить ETA для заявки %s. Ответ: %s", claim_id, response_data)
         return None
 
     async def get_tracking_links(self, claim_id: str) -> Optional[Dict[str, Any]]:
@@ -332,10 +359,10 @@ class YandexDeliveryClient:
         response_data = await self._make_request("GET", path, params=params)  # Используем GET
 
         if response_data and "route_points" in response_data:
-            log.info(f"Получены ссылки для отслеживания для заявки {claim_id}.")
+            log.info("Получены ссылки для отслеживания для заявки %s.", claim_id)
             return response_data
 
-        log.warning(f"Не удалось получить ссылки для отслеживания для заявки {claim_id}. Ответ: {response_data}")
+        log.warning("Не удалось получить ссылки для отслеживания для заявки %s. Ответ: %s", claim_id, response_data)
         return None
 
     async def get_cancellation_info(self, claim_id: str) -> Optional[Dict[str, Any]]:
@@ -350,10 +377,10 @@ class YandexDeliveryClient:
         # --- ИСПРАВЛЕНИЕ: Проверяем поле 'cancel_state' ---
         if response_data and "cancel_state" in response_data:
             state = response_data['cancel_state']
-            log.info(f"Получена информация об отмене для заявки {claim_id}. Статус отмены: {state}")
+            log.info("Получена информация об отмене для заявки %s. Статус отмены: %s", claim_id, state)
             return response_data
 
-        log.warning(f"Не удалось получить информацию об отмене для {claim_id}. Ответ: {response_data}")
+        log.warning("Не удалось получить информацию об отмене для %s. Ответ: %s", claim_id, response_data)
         return None
 
     async def cancel_claim(self, claim_id: str, cancel_state: str, version: int = 1) -> bool:
@@ -371,12 +398,13 @@ class YandexDeliveryClient:
         }
 
         response_data = await self._make_request("POST", path, params=params, json_payload=payload)
+        self.get_claim_info.invalidate()
 
         # Успешный ответ содержит новый статус
         if response_data and "status" in response_data:
             new_status = response_data.get("status")
-            log.info(f"Заявка {claim_id} успешно отменена. Новый статус: {new_status}")
+            log.info("Заявка %s успешно отменена. Новый статус: %s", claim_id, new_status)
             return True
 
-        log.error(f"Ошибка отмены заявки {claim_id}. Ответ: {response_data}")
+        log.error("Ошибка отмены заявки %s. Ответ: %s", claim_id, response_data)
         return False
@@ -1,4 +1,4 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 import asyncpg
 from asyncpg.pool import Pool
@@ -12,8 +12,15 @@ class AsyncDatabase:
     """
     Базовый интерфейсный класс для работы с PostgreSQL через asyncpg.
     Предоставляет методы для выполнения SQL-запросов.
+
+    Одиночные запросы выполняются в autocommit, без явных BEGIN/COMMIT: один оператор
+    в PostgreSQL и так атомарен, а транзакция добавляла бы два лишних round-trip.
+    Для нескольких операторов берите соединение из pool и открывайте transaction() сами.
     """
 
+    # Простаивающие соединения сверх min_size закрываются через столько секунд
+    MAX_INACTIVE_CONNECTION_LIFETIME = 300.0
+
     def __init__(
             self,
             db_name: str,
@@ -45,11 +52,12 @@ class AsyncDatabase:
                 host=self.host,
                 port=self.port,
                 min_size=self.min_size,
-                max_size=self.max_size
+                max_size=self.max_size,
+                max_inactive_connection_lifetime=self.MAX_INACTIVE_CONNECTION_LIFETIME,
             )
             log.debug("[DB] Подключение к базе данных успешно установлено")
         except Exception as e:
-            log.exception(f"[DB] Ошибка при подключении к базе данных: {e}")
+            log.exception("[DB] Ошибка при подключении к базе данных: %s", e)
 
     async def close(self) -> None:
         """
@@ -64,29 +72,38 @@ class AsyncDatabase:
         Выполняет запрос без возврата данных (INSERT, UPDATE, DELETE).
         """
         async with self.pool.acquire() as connection:
-            async with connection.transaction():
-                return await connection.execute(query, *args)
+            return await connection.execute(query, *args)
 
     async def fetch(self, query: str, *args: Any) -> List[asyncpg.Record]:
         """
         Выполняет SELECT-запрос и возвращает все строки.
         """
         async with self.pool.acquire() as connection:
-            async with connection.transaction():
-                return await connection.fetch(query, *args)
+            return await connection.fetch(query, *args)
 
     async def fetchrow(self, query: str, *args: Any) -> Optional[asyncpg.Record]:
         """
         Выполняет SELECT-запрос и возвращает одну строку.
         """
         async with self.pool.acquire() as connection:
-            async with connection.transaction():
-                return await connection.fetchrow(query, *args)
+            return await connection.fetchrow(query, *args)
 
     async def fetchval(self, query: str, *args: Any, column: int = 0) -> Any:
         """
         Выполняет SELECT-запрос и возвращает одно значение.
         """
         async with self.pool.acquire() as connection:
-            async with connection.transaction():
-                return await connection.fetchval(query, *args, column=column)
+            return await connection.fetchval(query, *args, column=column)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Состояние пула соединений: сколько открыто, сколько простаивает и границы размера.
+        """
+        if not self.pool:
+            return {"size": 0, "idle": 0, "min_size": self.min_size, "max_size": self.max_size}
+        return {
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+        }
@@ -0,0 +1,99 @@
+import json
+from typing import Optional
+
+from database.async_db import AsyncDatabase
+
+
+class BroadcastManager:
+    """
+    Рассылки админа в БД: сама рассылка (broadcasts) и очередь ещё не обработанных получателей
+    (broadcast_outbox). Благодаря этому прерванная перезапуском рассылка продолжается с места остановки.
+    """
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    async def create_broadcast(
+            self, admin_chat_id: int, src_chat_id: int, src_message_id: int, payload: Optional[dict],
+    ) -> tuple[int, int]:
+        """Создаёт рассылку и ставит в очередь всех пользователей. Возвращает (id рассылки, кол-во получателей)."""
+        async with self.db.pool.acquire() as conn:
+            async with conn.transaction():
+                broadcast_id = await conn.fetchval(
+                    """
+                    INSERT INTO broadcasts (admin_chat_id, src_chat_id, src_message_id, payload)
+                    VALUES ($1, $2, $3, $4::jsonb)
+                    RETURNING id
+                    """,
+                    admin_chat_id, src_chat_id, src_message_id, json.dumps(payload) if payload else None,
+                )
+                # Очередь заполняется одним INSERT ... SELECT на стороне БД, без выгрузки ID в Python;
+                # заблокировавшие бота пропускаются — им отправка всё равно вернёт 403
+                status = await conn.execute(
+                    "INSERT INTO broadcast_outbox (broadcast_id, tg_user_id) "
+                    "SELECT $1, tg_user_id FROM user_info WHERE NOT bot_blocked",
+                    broadcast_id,
+                )
+        return broadcast_id, int(status.split()[-1])
+
+    async def claim_batch(self, broadcast_id: int, limit: int) -> list[int]:
+        """
+        Забирает из очереди до `limit` получателей (строки удаляются сразу).
+        Доставка «не более одного раза»: после сбоя посреди пачки её остаток не будет отправлен повторно.
+        """
+        sql = """
+              DELETE
+              FROM broadcast_outbox
+              WHERE broadcast_id = $1
+                AND tg_user_id IN (SELECT tg_user_id
+                                   FROM broadcast_outbox
+                                   WHERE broadcast_id = $1
+                                   ORDER BY tg_user_id
+                                   LIMIT $2 FOR UPDATE SKIP LOCKED)
+              RETURNING tg_user_id \
+              """
+        return [r["tg_user_id"] for r in await self.db.fetch(sql, broadcast_id, limit)]
+
+    async def save_progress(self, broadcast_id: int, ok: int, fail: int, blocked: list[int]) -> None:
+        """Сохраняет счётчики и помечает `blocked` (заблокировавших бота) одной транзакцией."""
+        async with self.db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "UPDATE broadcasts SET ok_count = $2, fail_count = $3 WHERE id = $1", broadcast_id, ok, fail
+                )
+                await self._mark_blocked(conn, blocked)
+
+    async def finish_broadcast(
+            self, broadcast_id: int, status: str, ok: int, fail: int, blocked: list[int] = (),
+    ) -> None:
+        """Фиксирует итог рассылки ('done' | 'cancelled'), очищает её очередь и помечает `blocked`."""
+        async with self.db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "UPDATE broadcasts SET status = $2::broadcast_status, ok_count = $3, fail_count = $4 "
+                    "WHERE id = $1",
+                    broadcast_id, status, ok, fail,
+                )
+                await conn.execute("DELETE FROM broadcast_outbox WHERE broadcast_id = $1", broadcast_id)
+                await self._mark_blocked(conn, blocked)
+
+    @staticmethod
+    async def _mark_blocked(conn, tg_user_ids: list[int]) -> None:
+        if tg_user_ids:
+            await conn.execute(
+                "UPDATE user_info SET bot_blocked = TRUE WHERE tg_user_id = ANY($1::bigint[])", list(tg_user_ids)
+            )
+
+    async def list_running(self) -> list[dict]:
+        """Незавершённые рассылки (например, прерванные перезапуском бота)."""
+        rows = await self.db.fetch(
+            "SELECT id, admin_chat_id, src_chat_id, src_message_id, payload, ok_count, fail_count "
+            "FROM broadcasts WHERE status = 'running' ORDER BY id"
+        )
+        result = []
+        for r in rows:
+            data = dict(r)
+            if data["payload"] is not None:
+                data["payload"] = json.loads(data["payload"])
+            result.append(data)
+        return result
@@ -2,44 +2,57 @@ from collections import namedtuple
 from datetime import date
 from typing import Optional
 import json
+import time
 
 from aiogram.types import SuccessfulPayment
 from database.async_db import AsyncDatabase
 from database.models.buyer_orders import BuyerOrders
+from database.managers.product_position_manager import POSITIONS_CACHE_TAG
 
 from utils.statuses import (
     ACTIVE_STATUSES, FINISHED_STATUSES, AWAITING_PICKUP,
     ALLOWED_FROM, S_FINISHED, S_CANCELLED
 )
+from utils.cache import async_ttl_cache, invalidate_tag
 from utils.logger import get_logger
 
+# Тег кэша списков заказов и счётчиков для админки
+ORDERS_CACHE_TAG = "admin_orders"
+# Списки заказов админки меняются только через методы этого менеджера, а каждый из них
+# сбрасывает ORDERS_CACHE_TAG — поэтому TTL лишь страховка и может быть заметно длиннее
+ORDERS_LIST_TTL = 30.0
+
 # Добавим новые поля в namedtuple для удобства
 Item = namedtuple("Item", "title price qty weight_kg length_m width_m height_m")
 log = get_logger("[BuyerOrderManager]")
 
 
 class BuyerOrderManager:
+    # Время жизни предзагруженных карточек заказов для админки (сек.)
+    ORDER_CACHE_TTL = 10.0
+
     def __init__(self, db: AsyncDatabase):
         self.db = db
+        self._order_cache: dict[int, tuple[dict, float]] = {}
+        # Счётчик сбросов карточки: предзагрузка не кладёт строку, прочитанную до изменения заказа
+        self._order_gen: dict[int, int] = {}
 
-    async def count_active_orders_by_tg(self, tg_user_id: int) -> int:
-        sql = """
-              SELECT COUNT(*)
-              FROM buyer_orders bo
-                       JOIN user_info ui ON ui.id = bo.buyer_id
-              WHERE ui.tg_user_id = $1
-                AND bo.status = ANY ($2::order_status[])
-              """
-        return await self.db.fetchval(sql, tg_user_id, list(ACTIVE_STATUSES))
+    def _invalidate_order(self, order_id: int) -> None:
+        self._order_cache.pop(order_id, None)
+        self._order_gen[order_id] = self._order_gen.get(order_id, 0) + 1
+        invalidate_tag(ORDERS_CACHE_TAG)
 
-    async def count_total_orders_by_tg(self, tg_user_id: int) -> int:
+    async def counts_by_tg(self, tg_user_id: int) -> tuple[int, int]:
+        """Количество активных и всех заказов покупателя одним запросом: (active, total)."""
         sql = """
-              SELECT COUNT(*)
+              SELECT COUNT(*) FILTER (WHERE bo.status = ANY ($2::order_status[])) AS active,
+                     COUNT(*)                                                     AS total
               FROM buyer_orders bo
                        JOIN user_info ui ON ui.id = bo.buyer_id
               WHERE ui.tg_user_id = $1
               """
-        return await self.db.fetchval(sql, tg_user_id)
+        rec = await self.db.fetchrow(sql, tg_user_id, list(ACTIVE_STATUSES))
+        return rec["active"], rec["total"]
 
     async def list_orders(
             self, tg_user_id: int, finished: bool
@@ -56,16 +69,37 @@ class BuyerOrderManager:
         recs = await self.db.fetch(sql, tg_user_id, list(statuses))
         return [BuyerOrders.from_record(r) for r in recs]
 
-    async def get_order(self, tg_user_id: int, order_id: int) -> BuyerOrders | None:
+    async def get_order_with_items(self, tg_user_id: int, order_id: int) -> tuple[BuyerOrders | None, list[Item]]:
+        """
+        Заказ покупателя и его позиции одним запросом (LEFT JOIN — заказ без позиций тоже найдётся).
+        Возвращает (order, items); если заказа нет или он чужой — (None, []).
+        """
         sql = """
-              SELECT bo.*
+              SELECT bo.*,
+                     pp.title     AS item_title,
+                     pp.price     AS item_price,
+                     oi.qty       AS item_qty,
+                     pp.weight_kg AS item_weight_kg,
+                     pp.length_m  AS item_length_m,
+                     pp.width_m   AS item_width_m,
+                     pp.height_m  AS item_height_m
               FROM buyer_orders bo
                        JOIN user_info ui ON ui.id = bo.buyer_id
+                       LEFT JOIN order_items oi ON oi.order_id = bo.id
+                       LEFT JOIN product_position pp ON pp.id = oi.position_id
               WHERE ui.tg_user_id = $1
-                AND bo.id = $2;
+                AND bo.id = $2
+              ORDER BY pp.title;
               """
-        rec = await self.db.fetchrow(sql, tg_user_id, order_id)
-        return BuyerOrders.from_record(rec) if rec else None
+        recs = await self.db.fetch(sql, tg_user_id, order_id)
+        if not recs:
+            return None, []
+        items = [
+            Item(r["item_title"], r["item_price"], r["item_qty"], r["item_weight_kg"],
+                 r["item_length_m"], r["item_width_m"], r["item_height_m"])
+            for r in recs if r["item_qty"] is not None
+        ]
+        return BuyerOrders.from_record(recs[0]), items
 
     async def cancel_order(self, order_id: int):
         async with self.db.pool.acquire() as conn:
@@ -73,7 +107,7 @@ class BuyerOrderManager:
                 order_info = await conn.fetchrow(
                     "SELECT buyer_id, used_bonus, status FROM buyer_orders WHERE id = $1 FOR UPDATE", order_id)
                 if not order_info or order_info['status'] not in ACTIVE_STATUSES:
-                    log.warning(f"Попытка отменить уже неактивный заказ #{order_id}")
+                    log.warning("Попытка отменить уже неактивный заказ #%s", order_id)
                     return
 
                 items_to_return = await conn.fetch("SELECT position_id, qty FROM order_items WHERE order_id = $1",
@@ -90,7 +124,9 @@ class BuyerOrderManager:
                         order_info['used_bonus'], order_info['buyer_id']
                     )
                 await conn.execute("UPDATE buyer_orders SET status = 'cancelled' WHERE id = $1", order_id)
-                log.info(f"Заказ #{order_id} отменен. Товары и бонусы возвращены.")
+                log.info("Заказ #%s отменен. Товары и бонусы возвращены.", order_id)
+        self._invalidate_order(order_id)
+        invalidate_tag(POSITIONS_CACHE_TAG)
 
     async def list_items_by_order_id(self, order_id: int) -> list[Item]:
         sql = """
@@ -104,15 +140,6 @@ class BuyerOrderManager:
         return [Item(r["title"], r["price"], r["qty"], r["weight_kg"], r["length_m"], r["width_m"], r["height_m"]) for r
                 in recs]
 
-    async def order_total_sum_by_order_id(self, order_id: int) -> int:
-        sql = """
-              SELECT SUM(pp.price * oi.qty) AS total
-              FROM order_items oi
-                       JOIN product_position pp ON pp.id = oi.position_id
-              WHERE oi.order_id = $1;
-              """
-        return (await self.db.fetchval(sql, order_id)) or 0
-
     async def create_order(
             self,
             tg_user_id: int,
@@ -224,95 +251,176 @@ class BuyerOrderManager:
                         safe_bonus,
                     )
 
+        invalidate_tag(ORDERS_CACHE_TAG)
+        invalidate_tag(POSITIONS_CACHE_TAG)
         return order_id, None  # возвращаем ID заказа
 
     async def get_order_by_id(self, order_id: int) -> BuyerOrders | None:
         rec = await self.db.fetchrow("SELECT * FROM buyer_orders WHERE id = $1", order_id)
         return BuyerOrders.from_record(rec) if rec else None
 
-    async def admin_set_status(self, order_id: int, to_status: str) -> bool:
-        # читаем текущее состояние
-        row = await self.db.fetchrow(
-            "SELECT status, delivery_way FROM buyer_orders WHERE id = $1",
-            order_id,
-        )
-        if not row:
-            return False
-
-        cur, way = row["status"], row["delivery_way"]
-
-        allowed_from = set(ALLOWED_FROM.get(to_status, set()))
-        if to_status == S_FINISHED:
-            allowed_from = {"ready"} if way == "pickup" else {"transferring"}
-
-        if cur not in allowed_from:
-            return False
+    async def admin_set_status_returning(self, order_id: int, to_status: str) -> Optional[dict]:
+        """
+        Меняет статус заказа и сразу возвращает карточку заказа (как admin_get_order)
+        за один запрос. Возвращает None, если переход статуса недопустим.
+        """
+        allowed_from = ALLOWED_FROM.get(to_status)
+        if not allowed_from:
+            return None
 
-        val = await self.db.fetchval(
+        row = await self.db.fetchrow(
             """
-            UPDATE buyer_orders
-            SET status      = $2::order_status,
-                finished_at = CASE
-                                  WHEN $2::order_status = ANY ($3::order_status[]) THEN CURRENT_DATE
-                                  ELSE finished_at
-                    END
-            WHERE id = $1
-              AND status = ANY ($4::order_status[])
-            RETURNING 1
+            WITH upd AS (
+                UPDATE buyer_orders o
+                SET status      = $2::order_status,
+                    finished_at = CASE
+                                      WHEN $2::order_status = ANY ($3::order_status[]) THEN CURRENT_DATE
+                                      ELSE o.finished_at
+                        END
+                WHERE o.id = $1
+                  AND o.status = ANY ($4::order_status[])
+                  -- завершить самовывоз можно из 'ready', доставку — из 'transferring'
+                  AND ($2::order_status <> 'finished'
+                    OR (o.delivery_way = 'pickup' AND o.status = 'ready')
+                    OR (o.delivery_way = 'delivery' AND o.status = 'transferring'))
+                RETURNING o.*)
+            SELECT upd.id,
+                   upd.status,
+                   upd.comment,
+                   upd.delivery_way,
+                   upd.registration_date,
+                   upd.delivery_date,
+                   upd.finished_at,
+                   upd.delivery_address,
+                   upd.used_bonus,
+                   b.name_surname,
+                   b.tel_num,
+                   b.tg_username,
+                   COALESCE((SELECT jsonb_agg(jsonb_build_object('title', p.title, 'price', p.price, 'qty', i.qty)
+                                              ORDER BY p.id)
+                             FROM order_items i
+                                      JOIN product_position p ON p.id = i.position_id
+                             WHERE i.order_id = upd.id), '[]'::jsonb) AS items
+            FROM upd
+                     JOIN user_info u ON u.id = upd.buyer_id
+                     LEFT JOIN buyer_info b ON b.user_id = u.id
             """,
             order_id,
             to_status,
             [S_FINISHED, S_CANCELLED],
             list(allowed_from),
         )
-        return bool(val)
+        if not row:
+            return None
+        self._invalidate_order(order_id)
 
-    async def admin_cancel(self, order_id: int) -> bool:
-        updated = await self.db.execute(
-            "UPDATE buyer_orders SET status = $2, finished_at = CURRENT_DATE "
-            "WHERE id = $1 AND status = ANY($3::order_status[])",
-            order_id, S_CANCELLED, list(ACTIVE_STATUSES)
-        )
-        # ------------------------
-        return updated.upper().startswith("UPDATE")
+        data = dict(row)
+        data["items"] = json.loads(data["items"])
+        data["total"] = int(sum(it["price"] * it["qty"] for it in data["items"]))
+        # Строка уже свежая — кладём её в кэш карточек, чтобы повторное открытие заказа не шло в БД
+        self._order_cache[order_id] = (dict(data), time.monotonic())
+        return data
 
-    async def admin_today_revenue(self) -> int:
+    @async_ttl_cache(ttl=2.0, tag=ORDERS_CACHE_TAG)
+    async def admin_summary(self) -> tuple[int, int, int, int]:
+        """
+        Сводка для меню заказов одним запросом:
+        (выручка за сегодня, ожидают получения, всего заказов, активных заказов).
+        """
         sql = """
-              SELECT COALESCE(SUM(t.sum - t.used), 0)::int
-              FROM (SELECT o.id, \
-                           COALESCE(SUM(p.price * i.qty), 0) AS sum, \
-                           COALESCE(o.used_bonus, 0)         AS used \
-                    FROM buyer_orders o \
-                             JOIN order_items i ON i.order_id = o.id \
-                             JOIN product_position p ON p.id = i.position_id \
-                    WHERE o.status = 'finished' \
-                      AND o.finished_at = CURRENT_DATE \
-                    GROUP BY o.id, o.used_bonus) t \
+              SELECT (SELECT COALESCE(SUM(t.sum - t.used), 0)::int
+                      FROM (SELECT o.id,
+                                   COALESCE(SUM(p.price * i.qty), 0) AS sum,
+                                   COALESCE(o.used_bonus, 0)         AS used
+                            FROM buyer_orders o
+                                     JOIN order_items i ON i.order_id = o.id
+                                     JOIN product_position p ON p.id = i.position_id
+                            WHERE o.status = 'finished'
+                              AND o.finished_at = CURRENT_DATE
+                            GROUP BY o.id, o.used_bonus) t)                          AS today_rev,
+                     COUNT(*) FILTER (WHERE status = ANY ($1::order_status[]))       AS awaiting_cnt,
+                     COUNT(*)                                                         AS total_cnt,
+                     COUNT(*) FILTER (WHERE status = ANY ($2::order_status[]))       AS active_cnt
+              FROM buyer_orders
               """
-        return int(await self.db.fetchval(sql))
+        row = await self.db.fetchrow(sql, list(AWAITING_PICKUP), list(ACTIVE_STATUSES))
+        return int(row["today_rev"]), int(row["awaiting_cnt"]), int(row["total_cnt"]), int(row["active_cnt"])
 
-    async def admin_count_total(self) -> int:
-        return int(await self.db.fetchval("SELECT COUNT(*) FROM buyer_orders"))
-
-    async def admin_count_active(self) -> int:
-        sql = "SELECT COUNT(*) FROM buyer_orders WHERE status = ANY($1::order_status[])"
-        return int(await self.db.fetchval(sql, list(ACTIVE_STATUSES)))
-
-    async def admin_count_awaiting_pickup(self) -> int:
-        sql = "SELECT COUNT(*) FROM buyer_orders WHERE status = ANY($1::order_status[])"
-        return int(await self.db.fetchval(sql, list(AWAITING_PICKUP)))
-
-    async def admin_list_orders(self, finished: bool) -> list[dict]:
+    @async_ttl_cache(ttl=ORDERS_LIST_TTL, tag=ORDERS_CACHE_TAG)
+    async def admin_list_orders(self, finished: bool, limit: int | None = None) -> tuple[tuple[int, date], ...]:
+        """
+        Список заказов для админки как кортеж пар (id, registration_date):
+        без промежуточных dict на каждую строку, сразу хешируемый ключ для кэша клавиатуры.
+        `limit` — взять только первые N заказов (например, первую страницу списка).
+        """
         statuses = FINISHED_STATUSES if finished else ACTIVE_STATUSES
         sql = """
               SELECT id, registration_date
               FROM buyer_orders
               WHERE status = ANY ($1::order_status[])
-              ORDER BY registration_date DESC, id DESC \
+              ORDER BY registration_date DESC, id DESC
+              LIMIT $2 \
               """
-        return [dict(r) for r in await self.db.fetch(sql, list(statuses))]
+        return tuple((r[0], r[1]) for r in await self.db.fetch(sql, list(statuses), limit))
+
+    @async_ttl_cache(ttl=ORDERS_LIST_TTL, tag=ORDERS_CACHE_TAG)
+    async def admin_count_orders(self, finished: bool) -> int:
+        statuses = FINISHED_STATUSES if finished else ACTIVE_STATUSES
+        sql = "SELECT COUNT(*) FROM buyer_orders WHERE status = ANY ($1::order_status[])"
+        return int(await self.db.fetchval(sql, list(statuses)))
+
+    async def admin_prefetch_orders(self, order_ids: list[int]) -> None:
+        """
+        Одним запросом подгружает карточки заказов (как admin_get_order) в кэш,
+        чтобы последующее открытие заказа в админке не ходило в БД.
+        """
+        if not order_ids:
+            return
+        gens = {oid: self._order_gen.get(oid, 0) for oid in order_ids}
+        rows = await self.db.fetch("""
+                                   SELECT o.id,
+                                          o.status,
+                                          o.comment,
+                                          o.delivery_way,
+                                          o.registration_date,
+                                          o.delivery_date,
+                                          o.finished_at,
+                                          o.delivery_address,
+                                          o.used_bonus,
+                                          b.name_surname,
+                                          b.tel_num,
+                                          b.tg_username,
+                                          COALESCE((SELECT jsonb_agg(jsonb_build_object('title', p.title,
+                                                                                        'price', p.price,
+                                                                                        'qty', i.qty)
+                                                                     ORDER BY p.id)
+                                                    FROM order_items i
+                                                             JOIN product_position p ON p.id = i.position_id
+                                                    WHERE i.order_id = o.id), '[]'::jsonb) AS items
+                                   FROM buyer_orders o
+                                            JOIN user_info u ON u.id = o.buyer_id
+                                            JOIN buyer_info b ON b.user_id = u.id
+                                   WHERE o.id = ANY ($1::bigint[])
+                                   """, order_ids)
+
+        now = time.monotonic()
+        for r in rows:
+            if self._order_gen.get(r["id"], 0) != gens.get(r["id"], 0):
+                # Заказ изменили, пока шёл запрос — строка уже устарела
+                continue
+            data = dict(r)
+            data["items"] = json.loads(data["items"])
+            data["total"] = int(sum(it["price"] * it["qty"] for it in data["items"]))
+            self._order_cache[data["id"]] = (data, now)
 
     async def admin_get_order(self, order_id: int) -> Optional[dict]:
+        cached = self._order_cache.get(order_id)
+        if cached is not None:
+            data, ts = cached
+            if time.monotonic() - ts < self.ORDER_CACHE_TTL:
+                return dict(data)
+            self._order_cache.pop(order_id, None)
+
         head = await self.db.fetchrow("""
                                       SELECT o.id,
                                              o.status,
@@ -356,8 +464,9 @@ class BuyerOrderManager:
             """,
             order_id
         )
+        self._invalidate_order(order_id)
         if 'UPDATE 1' in result:
-            log.info(f"Статус заказа #{order_id} (оплачен бонусами) обновлен на 'processing'.")
+            log.info("Статус заказа #%s (оплачен бонусами) обновлен на 'processing'.", order_id)
             return True
         return False
 
@@ -365,6 +474,7 @@ class BuyerOrderManager:
         """Сохраняет ID заявки из Яндекса в соответствующий заказ."""
         sql = "UPDATE buyer_orders SET yandex_claim_id = $1 WHERE id = $2"
         await self.db.execute(sql, claim_id, order_id)
+        self._invalidate_order(order_id)
 
     async def mark_order_as_paid(self, order_id: int, payment_info: SuccessfulPayment):
         payment_data = {
@@ -381,6 +491,7 @@ class BuyerOrderManager:
             """,
             payment_json, order_id
         )
+        self._invalidate_order(order_id)
 
     async def get_tg_user_id_by_order(self, order: BuyerOrders) -> Optional[int]:
         """
@@ -420,7 +531,8 @@ class BuyerOrderManager:
         updated_id = await self.db.fetchval(sql, new_local_status, order_id)
 
         if updated_id:
-            log.info(f"Статус заказа #{order_id} синхронизирован с Яндексом. Новый статус: {new_local_status}")
+            self._invalidate_order(order_id)
+            log.info("Статус заказа #%s синхронизирован с Яндексом. Новый статус: %s", order_id, new_local_status)
             return True
 
         return False
@@ -455,7 +567,7 @@ class BuyerOrderManager:
             return []
 
         order_ids = [r['id'] for r in stale_orders]
-        log.info(f"Найдено {len(order_ids)} просроченных заказов для отмены: {order_ids}")
+        log.info("Найдено %s просроченных заказов для отмены: %s", len(order_ids), order_ids)
 
         cancelled_ids = []
         for order_id in order_ids:
@@ -465,7 +577,7 @@ class BuyerOrderManager:
                 if was_cancelled:
                     cancelled_ids.append(order_id)
             except Exception as e:
-                log.exception(f"Ошибка при автоматической отмене заказа #{order_id}: {e}")
+                log.exception("Ошибка при автоматической отмене заказа #%s: %s", order_id, e)
 
         return cancelled_ids
 
@@ -486,7 +598,7 @@ class BuyerOrderManager:
             return []
 
         order_ids = [r['id'] for r in stale_orders]
-        log.info(f"[Sanitizer] Найдено {len(order_ids)} зависших заказов для отмены: {order_ids}")
+        log.info("[Sanitizer] Найдено %s зависших заказов для отмены: %s", len(order_ids), order_ids)
 
         cancelled_ids = []
         for order_id in order_ids:
@@ -495,6 +607,6 @@ class BuyerOrderManager:
                 if was_cancelled:
                     cancelled_ids.append(order_id)
             except Exception as e:
-                log.exception(f"[Sanitizer] Ошибка при автоматической отмене зависшего заказа #{order_id}: {e}")
+                log.exception("[Sanitizer] Ошибка при автоматической отмене зависшего заказа #%s: %s", order_id, e)
 
         return cancelled_ids
@@ -1,21 +1,36 @@
 from typing import Optional, Tuple
 
 from database.async_db import AsyncDatabase
+from utils.cache import async_ttl_cache, invalidate_tag
+
+# Тег кэша списка позиций (сбрасывается и при изменении остатков в заказах)
+POSITIONS_CACHE_TAG = "product_positions"
+# Карточка позиции: сколько секунд и сколько штук держать в кэше (сбрасывается тем же тегом)
+POSITION_CARD_TTL = 60.0
+POSITION_CARD_CACHE_SIZE = 512
+# Витрина для корзины: каждое нажатие +/- перерисовывает список, а остатки меняются редко
+CATALOG_TTL = 15.0
 
 
 class ProductPositionManager:
     def __init__(self, db: AsyncDatabase):
         self.db = db
 
+    @async_ttl_cache(ttl=2.0, tag=POSITIONS_CACHE_TAG)
     async def list_all_order_positions(self) -> list[dict]:
         sql = "SELECT id, title, price, quantity FROM product_position ORDER BY id"
         return [dict(r) for r in await self.db.fetch(sql)]
 
+    @async_ttl_cache(ttl=CATALOG_TTL, tag=POSITIONS_CACHE_TAG)
     async def list_not_empty_order_positions(self) -> list[dict]:
         sql = ("SELECT id, title, price, quantity, weight_kg, image_path "
                "FROM product_position WHERE quantity>0 ORDER BY id")
         return [dict(r) for r in await self.db.fetch(sql)]
 
+    async def get_stock(self, pos_id: int) -> int:
+        """Текущий остаток позиции мимо кэша (0, если позиции нет)."""
+        return await self.db.fetchval("SELECT quantity FROM product_position WHERE id = $1", pos_id) or 0
+
     async def get_order_position_by_ids(self, ids: list[int]) -> list[dict]:
         if not ids:
             return []
@@ -25,6 +40,12 @@ class ProductPositionManager:
         return [dict(r) for r in records]
 
     async def get_order_position_by_id(self, pos_id: int) -> Optional[dict]:
+        # Копия, чтобы вызывающий код не мог испортить закэшированную строку
+        pos = await self._get_position(pos_id)
+        return dict(pos) if pos else None
+
+    @async_ttl_cache(ttl=POSITION_CARD_TTL, tag=POSITIONS_CACHE_TAG, cache_none=False, maxsize=POSITION_CARD_CACHE_SIZE)
+    async def _get_position(self, pos_id: int) -> Optional[dict]:
         # Просто выбираем все поля
         sql = "SELECT * FROM product_position WHERE id = $1"
         rec = await self.db.fetchrow(sql, pos_id)
@@ -34,14 +55,17 @@ class ProductPositionManager:
             self,
             title: str, price: int, quantity: int,
             weight_kg: float, length_m: float, width_m: float, height_m: float, image_path: str,
-    ) -> int:
+    ) -> dict:
+        """Создаёт позицию и сразу возвращает её строку (для карточки не нужен повторный SELECT)."""
         sql = """
               INSERT INTO product_position (title, price, quantity, weight_kg, length_m, width_m, height_m, image_path)
               VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-              RETURNING id \
+              RETURNING * \
               """
-        return await self.db.fetchval(sql, title, price, quantity, weight_kg, length_m,
-                                      width_m, height_m, image_path)
+        rec = await self.db.fetchrow(sql, title, price, quantity, weight_kg, length_m,
+                                     width_m, height_m, image_path)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec)
 
     async def update_fields(
             self,
@@ -69,36 +93,61 @@ class ProductPositionManager:
         args.append(position_id)
         sql = f"UPDATE product_position SET {', '.join(sets)} WHERE id = ${len(args)}"
         await self.db.execute(sql, *args)
+        invalidate_tag(POSITIONS_CACHE_TAG)
 
-    async def update_title(self, position_id: int, title: str) -> None:
-        sql = "UPDATE product_position SET title = $2 WHERE id = $1"
-        await self.db.execute(sql, position_id, title)
+    async def update_title(self, position_id: int, title: str) -> Optional[dict]:
+        """Обновляет название и возвращает обновлённую строку (чтобы не перечитывать её для вывода)."""
+        sql = "UPDATE product_position SET title = $2 WHERE id = $1 RETURNING *"
+        rec = await self.db.fetchrow(sql, position_id, title)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec) if rec else None
 
-    async def update_price(self, position_id: int, price: int) -> None:
-        sql = "UPDATE product_position SET price = $2 WHERE id = $1"
-        await self.db.execute(sql, position_id, price)
+    async def update_price(self, position_id: int, price: int) -> Optional[dict]:
+        sql = "UPDATE product_position SET price = $2 WHERE id = $1 RETURNING *"
+        rec = await self.db.fetchrow(sql, position_id, price)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec) if rec else None
 
-    async def update_quantity(self, position_id: int, qty: int) -> None:
-        sql = "UPDATE product_position SET quantity = $2 WHERE id = $1"
-        await self.db.execute(sql, position_id, qty)
+    async def update_quantity(self, position_id: int, qty: int) -> Optional[dict]:
+        sql = "UPDATE product_position SET quantity = $2 WHERE id = $1 RETURNING *"
+        rec = await self.db.fetchrow(sql, position_id, qty)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec) if rec else None
 
     async def delete_position(self, position_id: int) -> Tuple[bool, Optional[str]]:
         try:
             await self.db.execute("DELETE FROM product_position WHERE id = $1", position_id)
+            invalidate_tag(POSITIONS_CACHE_TAG)
             return True, None
         except Exception:
             return False, None
 
-    async def update_weight(self, pos_id: int, weight_kg: float):
-        """Обновляет вес товара."""
-        sql = "UPDATE product_position SET weight_kg = $1 WHERE id = $2"
-        await self.db.execute(sql, weight_kg, pos_id)
+    async def update_weight(self, pos_id: int, weight_kg: float) -> Optional[dict]:
+        """Обновляет вес товара и возвращает обновлённую строку."""
+        sql = "UPDATE product_position SET weight_kg = $1 WHERE id = $2 RETURNING *"
+        rec = await self.db.fetchrow(sql, weight_kg, pos_id)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec) if rec else None
 
-    async def update_dims(self, pos_id: int, length_m: float, width_m: float, height_m: float):
-        """Обновляет габариты товара."""
-        sql = "UPDATE product_position SET length_m = $1, width_m = $2, height_m = $3 WHERE id = $4"
-        await self.db.execute(sql, length_m, width_m, height_m, pos_id)
+    async def update_dims(self, pos_id: int, length_m: float, width_m: float, height_m: float) -> Optional[dict]:
+        """Обновляет габариты товара и возвращает обновлённую строку."""
+        sql = "UPDATE product_position SET length_m = $1, width_m = $2, height_m = $3 WHERE id = $4 RETURNING *"
+        rec = await self.db.fetchrow(sql, length_m, width_m, height_m, pos_id)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec) if rec else None
 
-    async def update_image(self, position_id: int, image_path: str) -> None:
-        sql = "UPDATE product_position SET image_path = $2 WHERE id = $1"
-        await self.db.execute(sql, position_id, image_path)
+    async def update_image(self, position_id: int, image_path: str) -> Optional[dict]:
+        """
+        Меняет изображение и возвращает обновлённую строку; прежний путь — в ключе
+        old_image_path (чтобы удалить старый файл без отдельного SELECT).
+        """
+        sql = """
+              UPDATE product_position p
+              SET image_path = $2
+              FROM (SELECT image_path FROM product_position WHERE id = $1 FOR UPDATE) AS old
+              WHERE p.id = $1
+              RETURNING p.*, old.image_path AS old_image_path \
+              """
+        rec = await self.db.fetchrow(sql, position_id, image_path)
+        invalidate_tag(POSITIONS_CACHE_TAG)
+        return dict(rec) if rec else None
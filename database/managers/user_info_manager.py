@@ -6,10 +6,12 @@ class UserInfoManager:
         self.db = db
 
     async def add_user(self, tg_user_id: int) -> int:
+        # Повторный /start означает, что пользователь снова доступен для рассылок
         insert_sql = """
                      INSERT INTO user_info (tg_user_id)
                      VALUES ($1)
-                     ON CONFLICT (tg_user_id) DO NOTHING
+                     ON CONFLICT (tg_user_id) DO UPDATE SET bot_blocked = FALSE
+                     WHERE user_info.bot_blocked
                      RETURNING id; \
                      """
 
@@ -20,10 +22,6 @@ class UserInfoManager:
         select_sql = "SELECT id FROM user_info WHERE tg_user_id = $1;"
         return await self.db.fetchval(select_sql, tg_user_id)
 
-    async def list_all_tg_user_ids(self) -> list[int]:
-        sql = "SELECT tg_user_id FROM user_info ORDER BY id"
-        rows = await self.db.fetch(sql)
-        return [int(r["tg_user_id"]) for r in rows]
-
-    async def count_all(self) -> int:
-        return int(await self.db.fetchval("SELECT COUNT(*) FROM user_info"))
+    async def count_reachable(self) -> int:
+        """Сколько пользователей получат рассылку (заблокировавшие бота пропускаются)."""
+        return int(await self.db.fetchval("SELECT COUNT(*) FROM user_info WHERE NOT bot_blocked"))
@@ -1,5 +1,6 @@
 # database/managers/warehouse_manager.py
 
+import asyncio
 from typing import Optional, Dict, Any
 
 from database.async_db import AsyncDatabase
@@ -7,75 +8,108 @@ from utils.logger import get_logger
 
 log = get_logger("[WarehouseManager]")
 
+# "Белый список" полей, которые администратор может изменять текстом, сразу с готовым SQL.
+# Имя поля подставляется в запрос только отсюда; значения от пользователя всегда идут плейсхолдером
+_FIELD_UPDATE_SQL: dict[str, str] = {
+    field: f'UPDATE warehouses SET "{field}" = $1 WHERE id = $2 RETURNING *'
+    for field in ("name", "address", "contact_name", "contact_phone", "porch", "floor", "apartment", "comment")
+}
+
 
 class WarehouseManager:
     def __init__(self, db: AsyncDatabase):
         self.db = db
+        # Склад по умолчанию в памяти; любой метод, меняющий склады, сбрасывает кэш
+        self._default_cache: Optional[Dict[str, Any]] = None
+        # Холодный промах: один SELECT на всех одновременно ждущих
+        self._default_lock = asyncio.Lock()
+        # Номер записи в кэш: холодный SELECT не перетирает строку, записанную во время его ожидания
+        self._default_gen = 0
 
     async def get_default_warehouse(self) -> Optional[Dict[str, Any]]:
         """
 
         Возвращает информацию об активном складе, который помечен как is_default=TRUE.
+        Возвращается копия, чтобы вызывающий код не мог испортить кэш.
         """
-        sql = "SELECT * FROM warehouses WHERE is_default = TRUE AND is_active = TRUE LIMIT 1"
-        record = await self.db.fetchrow(sql)
-        return dict(record) if record else None
+        if self._default_cache is None:
+            async with self._default_lock:
+                sql = "SELECT * FROM warehouses WHERE is_default = TRUE AND is_active = TRUE LIMIT 1"
+                while self._default_cache is None:
+                    gen = self._default_gen
+                    record = await self.db.fetchrow(sql)
+                    if gen != self._default_gen:
+                        # Пока шёл SELECT, склады изменили: строка писателя свежее нашей,
+                        # а если он лишь сбросил кэш — перечитываем
+                        continue
+                    if not record:
+                        return None
+                    self._default_cache = dict(record)
+        return dict(self._default_cache)
 
-    async def update_field(self, warehouse_id: int, field_name: str, new_value: any):
+    def _store_updated(self, record) -> Optional[Dict[str, Any]]:
         """
-        Обновляет указанное текстовое поле для указанного склада.
+        Обновляет кэш склада по умолчанию строкой из UPDATE ... RETURNING
+        (или сбрасывает его, если изменён другой склад) и возвращает строку как dict.
         """
-        # "Белый список" полей, которые администратор может изменять текстом.
-        allowed_fields = ["name", "address", "contact_name", "contact_phone",
-                          "porch", "floor", "apartment", "comment"]
-
-        if field_name not in allowed_fields:
-            log.warning(f"Попытка обновить запрещенное или неизвестное поле: {field_name}")
-            return
+        self._default_gen += 1
+        row = dict(record) if record else None
+        if row and row.get("is_default") and row.get("is_active"):
+            self._default_cache = row
+            return dict(row)
+        self._default_cache = None
+        return row
 
-        # Используем f-строку для имени поля, так как оно приходит из нашего же кода
-        # и проверено по "белому списку".
-        # Для значений от пользователя ($1, $2) всегда используем плейсхолдеры!
-        sql = f'UPDATE warehouses SET "{field_name}" = $1 WHERE id = $2'
-        await self.db.execute(sql, new_value, warehouse_id)
+    async def update_field(self, warehouse_id: int, field_name: str, new_value: any) -> Optional[Dict[str, Any]]:
+        """
+        Обновляет указанное текстовое поле для указанного склада.
+        Возвращает обновлённую строку склада (None, если поле запрещено или склад не найден).
+        """
+        sql = _FIELD_UPDATE_SQL.get(field_name)
+        if sql is None:
+            log.warning("Попытка обновить запрещенное или неизвестное поле: %s", field_name)
+            return None
+        return self._store_updated(await self.db.fetchrow(sql, new_value, warehouse_id))
 
-    async def update_location(self, warehouse_id: int, latitude: float, longitude: float):
+    async def update_location(self, warehouse_id: int, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
         """
-        Обновляет широту и долготу для указанного склада.
+        Обновляет широту и долготу для указанного склада и возвращает обновлённую строку.
         """
-        sql = "UPDATE warehouses SET latitude = $1, longitude = $2 WHERE id = $3"
-        await self.db.execute(sql, latitude, longitude, warehouse_id)
+        sql = "UPDATE warehouses SET latitude = $1, longitude = $2 WHERE id = $3 RETURNING *"
+        return self._store_updated(await self.db.fetchrow(sql, latitude, longitude, warehouse_id))
 
-    async def create_default_warehouse(self, data: dict) -> int:
+    async def create_default_warehouse(self, data: dict) -> Optional[Dict[str, Any]]:
         """
-        Создает новую запись о складе со всеми деталями.
+        Создает новую запись о складе со всеми деталями и возвращает созданную строку.
         """
         sql = """
               INSERT INTO warehouses (name, address, latitude, longitude,
                                       contact_name, contact_phone,
                                       porch, floor, apartment, is_default, comment)
               VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, TRUE, $10)
-              RETURNING id \
+              RETURNING * \
               """
-        return await self.db.fetchval(
+        record = await self.db.fetchrow(
             sql,
             data.get('name'), data.get('address'),
             data.get('latitude'), data.get('longitude'),
             data.get('contact_name'), data.get('contact_phone'),
             data.get('porch'), data.get('floor'), data.get('apartment'), data.get('comment'),
         )
+        return self._store_updated(record)
 
     async def update_address_and_location(
             self, warehouse_id: int, address: str, latitude: float, longitude: float
-    ):
+    ) -> Optional[Dict[str, Any]]:
         """
-        Обновляет текстовый адрес и координаты для указанного склада.
+        Обновляет текстовый адрес и координаты для указанного склада и возвращает обновлённую строку.
         """
         sql = """
               UPDATE warehouses
               SET address   = $1,
                   latitude  = $2,
                   longitude = $3
-              WHERE id = $4 \
+              WHERE id = $4
+              RETURNING * \
               """
-        await self.db.execute(sql, address, latitude, longitude, warehouse_id)
+        return self._store_updated(await self.db.fetchrow(sql, address, latitude, longitude, warehouse_id))
@@ -1,15 +1,22 @@
 import asyncio
+import html
+import math
+import time
 from contextlib import suppress
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import Callable, Union
 
 from aiogram import Router, F, Bot
-from aiogram.exceptions import TelegramBadRequest, TelegramAPIError
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
-from aiogram.types import Message, CallbackQuery, FSInputFile
+from aiogram.types import Message, CallbackQuery, FSInputFile, InlineKeyboardMarkup
 
+from database.async_db import AsyncDatabase
+from database.managers.broadcast_manager import BroadcastManager
 from database.managers.buyer_order_manager import BuyerOrderManager
 from database.managers.warehouse_manager import WarehouseManager
 from database.managers.product_position_manager import ProductPositionManager
@@ -28,55 +35,99 @@ from keyboards.admin import (admin_positions_list,
                              admin_confirm_geoposition_kb, admin_skip_image_kb
                              )
 from keyboards.client import get_main_inline_keyboard, confirm_geoposition_kb
+from middleware.tg_error_middleware import TgErrorMiddleware
 from api.yandex_delivery import geocode_address, YandexDeliveryClient
+from utils.broadcast import (
+    PROGRESS_EVERY, active_broadcasts, broadcast_method, broadcast_payload, claim_chunks, run_broadcast,
+)
+from utils.callback_data import CbData
 from utils.constants import status_map
 
 from utils.decorators import admin_only
+from utils.edit_coalescer import schedule_edit
 from utils.logger import get_logger
 from utils.phone import normalize_phone
 from utils.save_image import ensure_dir, ext_from_mime_or_name, MEDIA_DIR, MEDIA_PUBLIC_ROOT
 from utils.secrets import get_admin_ids, add_admin_id, remove_admin_id
+from utils.statuses import FINISHED_STATUSES
 
 log = get_logger("[Bot.Admin]")
 
 admin_router = Router()
+admin_router.callback_query.middleware(TgErrorMiddleware())
+admin_router.message.middleware(TgErrorMiddleware())
+
+# Callback-хендлеры разделов «Позиции» и «Заказы» вынесены во вложенные роутеры с фильтром по префиксу:
+# колбэк из другого раздела отсекается одной проверкой, не проходя по фильтрам каждого хендлера.
+# Middleware admin_router на вложенные роутеры распространяются автоматически.
+positions_router = Router(name="admin-positions")
+positions_router.callback_query.filter(F.data.startswith(("positions", "adm-pos")))
+orders_router = Router(name="admin-orders")
+orders_router.callback_query.filter(F.data.startswith(("orders", "adm-order")))
+admin_router.include_routers(positions_router, orders_router)
+
+# Ссылки на фоновые задачи, чтобы их не собрал GC до завершения
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _answer_later(call: CallbackQuery) -> None:
+    """
+    Подтверждает колбэк в фоне: хендлер не ждёт лишний запрос к Telegram.
+    Использовать только последней строкой хендлера, где ответ без текста.
+    """
+    task = asyncio.create_task(call.answer())
+    _background_tasks.add(task)
+    task.add_done_callback(_on_answer_done)
 
 
-async def handle_telegram_error(
-        e: TelegramBadRequest,
-        message: Message = None,
-        call: CallbackQuery = None,
-        state: FSMContext = None
-) -> bool:
-    error_text = str(e).lower()
+def _on_answer_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log.debug("[Bot.Admin] Не удалось ответить на колбэк: %s", task.exception())
 
-    if "message is not modified" in error_text:
-        log.debug("[Bot.Client] Сообщение не изменено (message is not modified)")
-        return True
 
-    if (
-            "message to delete not found" in error_text
-            or "message can't be deleted" in error_text
-            or "message to edit not found" in error_text
-    ):
-        if state:
-            await state.clear()
-            log.debug("[Bot.Client] FSM состояние очищено из-за ошибки Telegram")
+# (chat_id, message_id) -> (hash исходного текста, отрендеренный текст), которые мы последними туда отправили.
+# msg.text содержит уже отрендеренный текст без Markdown-разметки, поэтому для сообщений
+# с parse_mode сравнивать исходный текст с ним бесполезно. Отрендеренный текст хранится,
+# чтобы заметить правку из другого хендлера: тогда запись устарела и не используется.
+_RENDERED_MAX = 1024
+_rendered: dict[tuple[int, int], tuple[int, str | None]] = {}
 
-        user = call.from_user if call else message.from_user if message else None
-        is_admin = user and user.id in get_admin_ids()
 
-        target = call.message if call else message if message else None
-        if target:
-            await target.answer(
-                text="Не удалось изменить предыдущее сообщение. Выберите действие:",
-                reply_markup=get_main_inline_keyboard(is_admin)
-            )
-            log.info(f"[Bot.Client] Ошибка Telegram обработана для пользователя {user.id if user else 'unknown'}")
-        return True
+def _remember_rendered(key: tuple[int, int], text_hash: int, shown: str | None) -> None:
+    _rendered.pop(key, None)
+    if len(_rendered) >= _RENDERED_MAX:
+        _rendered.pop(next(iter(_rendered)))
+    _rendered[key] = (text_hash, shown)
 
-    log.warning(f"[Bot.Client] [UNHANDLED TelegramBadRequest] {e}")
-    return False
+
+async def _safe_edit(
+        msg: Message,
+        text: str,
+        reply_markup: InlineKeyboardMarkup | None = None,
+        **kwargs
+) -> None:
+    """
+    Редактирует сообщение, пропуская запрос, если ничего не изменилось.
+    Если изменилась только клавиатура — отправляет edit_reply_markup.
+    Сравнение идёт с тем, что сейчас показано в сообщении (call.message),
+    поэтому правки из других хендлеров учитываются автоматически.
+    """
+    key = (msg.chat.id, msg.message_id)
+    text_hash = hash((text, kwargs.get("parse_mode")))
+    try:
+        if msg.text == text or _rendered.get(key) == (text_hash, msg.text):
+            if msg.reply_markup == reply_markup:
+                return
+            await msg.edit_reply_markup(reply_markup=reply_markup)
+            return
+        edited = await msg.edit_text(text, reply_markup=reply_markup, **kwargs)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e).lower():
+            raise
+        return
+    if isinstance(edited, Message):
+        _remember_rendered(key, text_hash, edited.text)
 
 
 class PosEdit(StatesGroup):
@@ -88,6 +139,7 @@ class PosEdit(StatesGroup):
     add_width = State()  # Ширина
     add_height = State()  # Высота
     add_image = State()
+    add_composite = State()  # Все поля одним сообщением
 
     edit_title = State()
     edit_price = State()
@@ -121,6 +173,7 @@ class WarehouseCreate(StatesGroup):
     waiting_for_contact_name = State()
     waiting_for_contact_phone = State()
     waiting_for_comment = State()
+    bulk = State()  # Все поля одним сообщением
 
 
 class AdminManagement(StatesGroup):
@@ -131,89 +184,145 @@ def format_product_info(pos: dict) -> str:
     """Форматирует детальную информацию о товаре."""
     if not pos:
         return "Товар не найден."
-    return (
-        f"*Наименование:* {pos['title']}\n"
-        f"*Цена:* `{pos['price']}` руб.\n"
-        f"*Количество:* `{pos['quantity']}` шт.\n"
-        f"*Вес:* `{pos.get('weight_kg', 'не указ.')}` кг.\n"
-        f"*Габариты (ДxШxВ):* `{pos.get('length_m', '?')} x {pos.get('width_m', '?')} x {pos.get('height_m', '?')}` м."
+    # Колонки updated_at в таблице нет, поэтому «версией» строки служат сами выводимые поля
+    return _format_product_info(
+        pos['title'], pos['price'], pos['quantity'], pos.get('weight_kg', 'не указ.'),
+        pos.get('length_m', '?'), pos.get('width_m', '?'), pos.get('height_m', '?'),
+    )
+
+
+_PRODUCT_TMPL = (
+    "*Наименование:* {}\n"
+    "*Цена:* `{}` руб.\n"
+    "*Количество:* `{}` шт.\n"
+    "*Вес:* `{}` кг.\n"
+    "*Габариты (ДxШxВ):* `{} x {} x {}` м."
+).format
+
+# Ключ кэша — сами выводимые поля, поэтому отдельная инвалидация при правках не нужна
+_format_product_info = lru_cache(maxsize=1024)(_PRODUCT_TMPL)
+
+
+# Служебная команда (в меню не выводится): состояние пула соединений с БД
+@admin_router.message(Command("dbstats"))
+@admin_only
+async def admin_db_stats(msg: Message, db: AsyncDatabase):
+    stats = db.get_stats()
+    await msg.answer(
+        f"Пул БД: открыто `{stats['size']}` (простаивает `{stats['idle']}`), "
+        f"границы `{stats['min_size']}`–`{stats['max_size']}`",
+        parse_mode="Markdown",
     )
 
 
 @admin_router.callback_query(F.data == "back-admin-main")
 @admin_only
 async def back_admin_main(call: CallbackQuery):
-    try:
-        await call.message.edit_text("Выберите действие:", reply_markup=get_main_inline_keyboard(is_admin=True))
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    await _safe_edit(call.message, "Выберите действие:", reply_markup=get_main_inline_keyboard(is_admin=True))
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data == "positions")
+@positions_router.callback_query(F.data == "positions")
 @admin_only
 async def adm_positions_root(call: CallbackQuery, product_position_manager):
     items = await product_position_manager.list_all_order_positions()
     kb = admin_positions_list(items, page=1)
-    try:
-        await call.message.edit_text(
-            f"Текущие позиции (всего {len(items)}):",
-            reply_markup=kb
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    await call.message.edit_text(
+        f"Текущие позиции (всего {len(items)}):",
+        reply_markup=kb
+    )
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("positions:page:"))
+@positions_router.callback_query(CbData("positions:page", ("page", int)))
 @admin_only
-async def adm_positions_page(call: CallbackQuery, product_position_manager):
-    try:
-        page = int(call.data.split(":")[-1])
-    except ValueError:
-        page = 1
-
+async def adm_positions_page(call: CallbackQuery, cb, product_position_manager):
     items = await product_position_manager.list_all_order_positions()
-    kb = admin_positions_list(items, page=page)
+    kb = admin_positions_list(items, page=cb.page)
 
-    try:
-        await call.message.edit_reply_markup(reply_markup=kb)
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения (pagin): {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    schedule_edit(call.bot, call.message.chat.id, call.message.message_id, reply_markup=kb)
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data == "adm-pos:back-list")
+@positions_router.callback_query(F.data == "adm-pos:back-list")
 @admin_only
 async def adm_pos_back_list(call: CallbackQuery, product_position_manager):
     items = await product_position_manager.list_all_order_positions()
-    try:
-        await call.message.edit_text("Текущие позиции:", reply_markup=admin_positions_list(items))
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    await _safe_edit(call.message, "Текущие позиции:", reply_markup=admin_positions_list(items))
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data == "adm-pos:add")
+@positions_router.callback_query(F.data == "adm-pos:add")
 @admin_only
 async def adm_pos_add_start(call: CallbackQuery, state: FSMContext):
     await state.set_state(PosEdit.add_title)
+    await call.message.edit_text("Введите *название позиции*:", parse_mode="Markdown",
+                                 reply_markup=admin_edit_back())
+    _answer_later(call)
+
+
+@positions_router.callback_query(F.data == "adm-pos:add-fast")
+@admin_only
+async def adm_pos_add_fast_start(call: CallbackQuery, state: FSMContext):
+    await state.set_state(PosEdit.add_composite)
+    await call.message.edit_text(
+        "Пришлите позицию *одним сообщением* в формате:\n"
+        "`Название; цена; количество; вес (кг); ДxШxВ (м)`\n\n"
+        "Пример: `Клубника 1 кг; 450; 20; 1.1; 0.3x0.2x0.1`",
+        parse_mode="Markdown",
+        reply_markup=admin_edit_back(),
+    )
+    _answer_later(call)
+
+
+def _parse_position_line(text: str | None) -> dict | str:
+    """
+    Разбирает "Название; цена; количество; вес; ДxШxВ" с теми же правилами, что и пошаговый ввод.
+    Возвращает поля для create_position или текст ошибки.
+    """
+    parts = [p.strip() for p in (text or "").split(";")]
+    if len(parts) != 5:
+        return "Нужно ровно 5 полей через «;»: название; цена; количество; вес; ДxШxВ."
+    title, price_s, qty_s, weight_s, dims_s = parts
+    if not title or len(title) > 50:
+        return "Название пустое или слишком длинное (≤ 50)."
+    price = _parse_nonneg_int(price_s)
+    if price is None:
+        return "Цена должна быть целым числом ≥ 0."
+    qty = _parse_nonneg_int(qty_s)
+    if qty is None:
+        return "Количество должно быть целым числом ≥ 0."
     try:
-        await call.message.edit_text("Введите *название позиции*:", parse_mode="Markdown",
-                                     reply_markup=admin_edit_back())
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
+        weight = float(weight_s.replace(',', '.'))
+    except ValueError:
+        weight = -1.0
+    # float() принимает и "nan"/"inf" — такие значения ломают заявку в Яндекс.Доставку
+    if not (math.isfinite(weight) and weight > 0):
+        return "Вес должен быть положительным числом (например: 0.5 или 1.2)."
+    dims = _parse_dims(dims_s)
+    if dims is None:
+        return "Габариты — три положительных числа, например: `0.2x0.15x0.1`."
+    length, width, height = dims
+    return {
+        "title": title, "price": price, "qty": qty, "weight_kg": weight,
+        "length_m": length, "width_m": width, "height_m": height,
+    }
+
+
+@admin_router.message(PosEdit.add_composite)
+@admin_only
+async def adm_pos_add_composite(msg: Message, state: FSMContext):
+    fields = _parse_position_line(msg.text)
+    if isinstance(fields, str):
+        await msg.answer(fields, parse_mode="Markdown")
         return
+    # Дальше — общий шаг с изображением: те же adm_pos_add_image / adm_pos_skip_image
+    await state.update_data(**fields)
+    await state.set_state(PosEdit.add_image)
+    await msg.answer(
+        "Отправьте Изображение или нажмите «Пропустить»",
+        reply_markup=admin_skip_image_kb()
+    )
 
 
 @admin_router.message(PosEdit.add_title)
@@ -231,10 +340,8 @@ async def adm_pos_add_title(msg: Message, state: FSMContext):
 @admin_router.message(PosEdit.add_price)
 @admin_only
 async def adm_pos_add_price(msg: Message, state: FSMContext):
-    try:
-        price = int(msg.text)
-        assert price >= 0
-    except Exception:
+    price = _parse_nonneg_int(msg.text)
+    if price is None:
         await msg.answer("Цена должна быть целым числом ≥ 0.")
         return
     await state.update_data(price=price)
@@ -245,10 +352,8 @@ async def adm_pos_add_price(msg: Message, state: FSMContext):
 @admin_router.message(PosEdit.add_qty)
 @admin_only
 async def adm_pos_add_qty(msg: Message, state: FSMContext):
-    try:
-        qty = int(msg.text)
-        assert qty >= 0
-    except Exception:
+    qty = _parse_nonneg_int(msg.text)
+    if qty is None:
         await msg.answer("Количество должно быть целым числом ≥ 0.")
         return
 
@@ -258,6 +363,18 @@ async def adm_pos_add_qty(msg: Message, state: FSMContext):
     await msg.answer("Введите *вес* одной единицы товара в килограммах (например: 0.5):", parse_mode="Markdown")
 
 
+_PG_INT_MAX = 2_147_483_647  # верхняя граница типа INT в PostgreSQL
+
+
+def _parse_nonneg_int(text: str | None) -> int | None:
+    """Парсит целое число ≥ 0 (только ASCII-цифры), иначе возвращает None."""
+    t = (text or "").strip()
+    if not t or len(t) > 10 or not (t.isascii() and t.isdigit()):
+        return None
+    value = int(t)
+    return value if value <= _PG_INT_MAX else None
+
+
 async def _parse_float(text: str) -> Union[float, None]:
     """Вспомогательная функция для парсинга положительных float чисел."""
     try:
@@ -322,12 +439,12 @@ async def adm_pos_add_height(msg: Message, state: FSMContext):
     )
 
 
-@admin_router.callback_query(F.data == "adm-pos:skip-image")
+@positions_router.callback_query(F.data == "adm-pos:skip-image")
 @admin_only
 async def adm_pos_skip_image(call: CallbackQuery, state: FSMContext, product_position_manager):
     data = await state.get_data()
 
-    pid = await product_position_manager.create_position(
+    pos = await product_position_manager.create_position(
         title=data["title"],
         price=data["price"],
         quantity=data["qty"],
@@ -337,14 +454,12 @@ async def adm_pos_skip_image(call: CallbackQuery, state: FSMContext, product_pos
         height_m=data["height_m"],
         image_path=None,
     )
-
-    pos = await product_position_manager.get_order_position_by_id(pid)
     text = format_product_info(pos)
 
     await state.clear()
     await call.message.edit_text("Позиция *успешно добавлена без изображения* ✅", parse_mode="Markdown")
-    await call.message.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
-    await call.answer()
+    await call.message.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pos["id"]))
+    _answer_later(call)
 
 
 @admin_router.message(PosEdit.add_image)
@@ -375,7 +490,7 @@ async def adm_pos_add_image(msg: Message, state: FSMContext, product_position_ma
     rel_path = f"{MEDIA_PUBLIC_ROOT}/{filename}"
 
     data = await state.get_data()
-    pid = await product_position_manager.create_position(
+    pos = await product_position_manager.create_position(
         title=data["title"],
         price=data["price"],
         quantity=data["qty"],
@@ -387,39 +502,31 @@ async def adm_pos_add_image(msg: Message, state: FSMContext, product_position_ma
     )
     await state.clear()
 
-    pos = await product_position_manager.get_order_position_by_id(pid)
     text = format_product_info(pos)
     await msg.answer("Позиция *успешно добавлена* ✅", parse_mode="Markdown")
 
     await msg.answer_photo(
         photo=FSInputFile(abs_path)
     )
-    await msg.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
+    await msg.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pos["id"]))
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:edit-title:"))
+@positions_router.callback_query(CbData("adm-pos:edit-title", ("pid", int)))
 @admin_only
-async def adm_pos_edit_title_start(call: CallbackQuery, state: FSMContext):
+async def adm_pos_edit_title_start(call: CallbackQuery, cb, state: FSMContext):
     """
     Реагирует на кнопку 'Изменить название' и запускает FSM.
     """
-    try:
-        pid = int(call.data.split(":")[2])
-    except (ValueError, IndexError):
-        await call.answer("Ошибка в данных кнопки.", show_alert=True)
-        return
+    pid = cb.pid
 
     await state.update_data(pid=pid)
     await state.set_state(PosEdit.edit_title)
-    try:
-        await call.message.edit_text(
-            "Введите *новое название* позиции:",
-            parse_mode="Markdown",
-            reply_markup=admin_edit_back(pid)
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        await handle_telegram_error(e, call=call)
+    await call.message.edit_text(
+        "Введите *новое название* позиции:",
+        parse_mode="Markdown",
+        reply_markup=admin_edit_back(pid)
+    )
+    _answer_later(call)
 
 
 @admin_router.message(PosEdit.edit_title)
@@ -430,9 +537,8 @@ async def adm_pos_edit_title_set(msg: Message, state: FSMContext, product_positi
         await msg.answer("Название пустое или слишком длинное (≤ 50).")
         return
     pid = (await state.get_data())["pid"]
-    await product_position_manager.update_title(pid, name)
+    pos = await product_position_manager.update_title(pid, name)
     await state.clear()
-    pos = await product_position_manager.get_order_position_by_id(pid)
 
     # Обновляем текст вывода, чтобы показать новые данные
     text = format_product_info(pos)
@@ -445,35 +551,27 @@ async def adm_pos_edit_title_set(msg: Message, state: FSMContext, product_positi
     await msg.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:edit-price:"))
+@positions_router.callback_query(CbData("adm-pos:edit-price", ("pid", int)))
 @admin_only
-async def adm_pos_edit_price_start(call: CallbackQuery, state: FSMContext):
-    pid = int(call.data.split(":")[2])
+async def adm_pos_edit_price_start(call: CallbackQuery, cb, state: FSMContext):
+    pid = cb.pid
     await state.update_data(pid=pid)
     await state.set_state(PosEdit.edit_price)
-    try:
-        await call.message.edit_text("Введите *новую цену* (целое число ≥ 0):", parse_mode="Markdown",
-                                     reply_markup=admin_edit_back(pid))
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    await call.message.edit_text("Введите *новую цену* (целое число ≥ 0):", parse_mode="Markdown",
+                                 reply_markup=admin_edit_back(pid))
+    _answer_later(call)
 
 
 @admin_router.message(PosEdit.edit_price)
 @admin_only
 async def adm_pos_edit_price_set(msg: Message, state: FSMContext, product_position_manager):
-    try:
-        price = int(msg.text)
-        assert price >= 0
-    except Exception:
+    price = _parse_nonneg_int(msg.text)
+    if price is None:
         await msg.answer("Цена должна быть целым числом ≥ 0.")
         return
     pid = (await state.get_data())["pid"]
-    await product_position_manager.update_price(pid, price)
+    pos = await product_position_manager.update_price(pid, price)
     await state.clear()
-    pos = await product_position_manager.get_order_position_by_id(pid)
 
     # Обновляем текст вывода, чтобы показать новые данные
     text = format_product_info(pos)
@@ -486,26 +584,21 @@ async def adm_pos_edit_price_set(msg: Message, state: FSMContext, product_positi
     await msg.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:edit-qty:"))
+@positions_router.callback_query(CbData("adm-pos:edit-qty", ("pid", int)))
 @admin_only
-async def adm_pos_edit_qty_start(call: CallbackQuery, state: FSMContext):
-    pid = int(call.data.split(":")[2])
+async def adm_pos_edit_qty_start(call: CallbackQuery, cb, state: FSMContext):
+    pid = cb.pid
     await state.update_data(pid=pid)
     await state.set_state(PosEdit.edit_qty)
-    try:
-        await call.message.edit_text("Введите *новое количество* (целое число ≥ 0):", parse_mode="Markdown",
-                                     reply_markup=admin_edit_back(pid))
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    await call.message.edit_text("Введите *новое количество* (целое число ≥ 0):", parse_mode="Markdown",
+                                 reply_markup=admin_edit_back(pid))
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:edit-weight:"))
+@positions_router.callback_query(CbData("adm-pos:edit-weight", ("pid", int)))
 @admin_only
-async def adm_pos_edit_weight_start(call: CallbackQuery, state: FSMContext):
-    pid = int(call.data.split(":")[2])
+async def adm_pos_edit_weight_start(call: CallbackQuery, cb, state: FSMContext):
+    pid = cb.pid
     await state.update_data(pid=pid)
     await state.set_state(PosEdit.edit_weight)
     await call.message.edit_text(
@@ -513,7 +606,7 @@ async def adm_pos_edit_weight_start(call: CallbackQuery, state: FSMContext):
         parse_mode="Markdown",
         reply_markup=admin_edit_back(pid)
     )
-    await call.answer()
+    _answer_later(call)
 
 
 @admin_router.message(PosEdit.edit_weight)
@@ -526,13 +619,12 @@ async def adm_pos_edit_weight_set(msg: Message, state: FSMContext, product_posit
 
     data = await state.get_data()
     pid = data["pid"]
-    await product_position_manager.update_weight(pid, weight)  # Нужен новый метод в менеджере
+    pos = await product_position_manager.update_weight(pid, weight)
     await state.clear()
 
     await msg.answer("✅ Вес товара успешно изменен!")
 
     # Показываем обновленную карточку товара
-    pos = await product_position_manager.get_order_position_by_id(pid)
     text = format_product_info(pos)  # Выносим форматирование в отдельную функцию
     if pos['image_path'] is not None:
         await msg.answer_photo(
@@ -543,10 +635,10 @@ async def adm_pos_edit_weight_set(msg: Message, state: FSMContext, product_posit
 
 # --- Редактирование Габаритов ---
 
-@admin_router.callback_query(F.data.startswith("adm-pos:edit-dims:"))
+@positions_router.callback_query(CbData("adm-pos:edit-dims", ("pid", int)))
 @admin_only
-async def adm_pos_edit_dims_start(call: CallbackQuery, state: FSMContext):
-    pid = int(call.data.split(":")[2])
+async def adm_pos_edit_dims_start(call: CallbackQuery, cb, state: FSMContext):
+    pid = cb.pid
     await state.update_data(pid=pid)
     await state.set_state(PosEdit.edit_dims)
     await call.message.edit_text(
@@ -555,34 +647,41 @@ async def adm_pos_edit_dims_start(call: CallbackQuery, state: FSMContext):
         parse_mode="Markdown",
         reply_markup=admin_edit_back(pid)
     )
-    await call.answer()
+    _answer_later(call)
+
+
+# Таблица для разбора габаритов: "0,2x0.15х0,1" -> "0.2 0.15 0.1"
+_DIMS_TRANSLATE = str.maketrans({',': '.', 'x': ' ', 'X': ' ', 'х': ' ', 'Х': ' '})
+
+
+def _parse_dims(text: str | None) -> tuple[float, float, float] | None:
+    """Разбирает габариты "ДxШxВ" (через пробел, 'x' или русскую 'х'); все три числа должны быть > 0."""
+    try:
+        # Заменяем 'x', 'х' (русскую) и запятые за один проход, чтобы быть гибкими к вводу
+        dims = tuple(map(float, (text or "").translate(_DIMS_TRANSLATE).split()))
+    except ValueError:
+        return None
+    if len(dims) != 3 or not all(math.isfinite(d) and d > 0 for d in dims):
+        return None
+    return dims
 
 
 @admin_router.message(PosEdit.edit_dims)
 @admin_only
 async def adm_pos_edit_dims_set(msg: Message, state: FSMContext, product_position_manager: ProductPositionManager):
-    # Пытаемся распарсить три числа из строки
-    try:
-        # Заменяем 'x', 'х' (русскую) и запятые, чтобы быть гибкими к вводу
-        cleaned_text = msg.text.replace(',', '.').replace('x', ' ').replace('х', ' ')
-        dims = [float(d.strip()) for d in cleaned_text.split()]
-        if len(dims) != 3:
-            raise ValueError
-        length, width, height = dims
-        if not all(d > 0 for d in dims):
-            raise ValueError
-    except (ValueError, TypeError, IndexError):
+    dims = _parse_dims(msg.text)
+    if dims is None:
         await msg.answer("Неверный формат. Пожалуйста, введите три положительных числа, например: `0.2 0.15 0.1`")
         return
+    length, width, height = dims
 
     data = await state.get_data()
     pid = data["pid"]
-    await product_position_manager.update_dims(pid, length, width, height)  # Нужен новый метод в менеджере
+    pos = await product_position_manager.update_dims(pid, length, width, height)
     await state.clear()
 
     await msg.answer("✅ Габариты товара успешно изменены!")
 
-    pos = await product_position_manager.get_order_position_by_id(pid)
     text = format_product_info(pos)
     if pos['image_path'] is not None:
         await msg.answer_photo(
@@ -594,16 +693,13 @@ async def adm_pos_edit_dims_set(msg: Message, state: FSMContext, product_positio
 @admin_router.message(PosEdit.edit_qty)
 @admin_only
 async def adm_pos_edit_qty_set(msg: Message, state: FSMContext, product_position_manager):
-    try:
-        qty = int(msg.text)
-        assert qty >= 0
-    except Exception:
+    qty = _parse_nonneg_int(msg.text)
+    if qty is None:
         await msg.answer("Количество должно быть целым числом ≥ 0.")
         return
     pid = (await state.get_data())["pid"]
-    await product_position_manager.update_quantity(pid, qty)
+    pos = await product_position_manager.update_quantity(pid, qty)
     await state.clear()
-    pos = await product_position_manager.get_order_position_by_id(pid)
 
     # Обновляем текст вывода, чтобы показать новые данные
     text = format_product_info(pos)
@@ -615,39 +711,27 @@ async def adm_pos_edit_qty_set(msg: Message, state: FSMContext, product_position
     await msg.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:delete:"))
+@positions_router.callback_query(CbData("adm-pos:delete", ("pid", int)))
 @admin_only
-async def adm_pos_delete_confirm(call: CallbackQuery):
-    pid = int(call.data.split(":")[2])
-    try:
-        await call.message.edit_text("Вы уверены, что хотите удалить позицию?", reply_markup=admin_confirm_delete(pid))
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+async def adm_pos_delete_confirm(call: CallbackQuery, cb):
+    pid = cb.pid
+    await call.message.edit_text("Вы уверены, что хотите удалить позицию?", reply_markup=admin_confirm_delete(pid))
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:edit-img:"))
+@positions_router.callback_query(CbData("adm-pos:edit-img", ("pid", int)))
 @admin_only
-async def adm_pos_edit_img_start(call: CallbackQuery, state: FSMContext):
-    try:
-        pid = int(call.data.split(":")[2])
-    except (ValueError, IndexError):
-        await call.answer("Ошибка в данных кнопки.", show_alert=True)
-        return
+async def adm_pos_edit_img_start(call: CallbackQuery, cb, state: FSMContext):
+    pid = cb.pid
 
     await state.update_data(pid=pid)
     await state.set_state(PosEdit.edit_img)
-    try:
-        await call.message.edit_text(
-            "Отправьте новое *изображение*:",
-            parse_mode="Markdown",
-            reply_markup=admin_edit_back(pid)
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        await handle_telegram_error(e, call=call)
+    await call.message.edit_text(
+        "Отправьте новое *изображение*:",
+        parse_mode="Markdown",
+        reply_markup=admin_edit_back(pid)
+    )
+    _answer_later(call)
 
 
 @admin_router.message(PosEdit.edit_img)
@@ -679,22 +763,19 @@ async def adm_pos_edit_img_set(msg: Message, state: FSMContext, product_position
     data = await state.get_data()
     pid = data["pid"]
 
-    try:
-        old = await product_position_manager.get_order_position_by_id(pid)
-        old_path = old.get("image_path")
-        if old_path:
-            old_abs = (MEDIA_DIR / Path(old_path).name)
-            if old_abs.is_file():
-                old_abs.unlink(missing_ok=True)
-    except Exception:
-        pass
-
-    pos = await product_position_manager.get_order_position_by_id(pid)
-    text = format_product_info(pos)
-
     await state.clear()
 
-    await product_position_manager.update_image(pid, rel_path)
+    # UPDATE ... RETURNING отдаёт и новую строку, и прежний путь — отдельные SELECT не нужны
+    pos = await product_position_manager.update_image(pid, rel_path)
+    if not pos:
+        await msg.answer("Позиция не найдена")
+        return
+
+    old_path = pos.get("old_image_path")
+    if old_path:
+        with suppress(OSError):
+            (MEDIA_DIR / Path(old_path).name).unlink(missing_ok=True)
+    text = format_product_info(pos)
 
     await msg.answer("Позиция *успешно добавлена* ✅", parse_mode="Markdown")
 
@@ -704,10 +785,10 @@ async def adm_pos_edit_img_set(msg: Message, state: FSMContext, product_position
     await msg.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:delete-yes:"))
+@positions_router.callback_query(CbData("adm-pos:delete-yes", ("pid", int)))
 @admin_only
-async def adm_pos_delete_yes(call: CallbackQuery, product_position_manager):
-    pid = int(call.data.split(":")[2])
+async def adm_pos_delete_yes(call: CallbackQuery, cb, product_position_manager):
+    pid = cb.pid
     ok, err = await product_position_manager.delete_position(pid)
     if not ok:
         await call.answer(err or "Нельзя удалить позицию, есть заказы, связанные с ней", show_alert=True)
@@ -722,252 +803,309 @@ async def adm_pos_delete_yes(call: CallbackQuery, product_position_manager):
             await call.message.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
         return
     items = await product_position_manager.list_all_order_positions()
-    try:
-        await call.message.edit_text("Текущие позиции:", reply_markup=admin_positions_list(items))
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
-        await handle_telegram_error(e, call=call)
-        return
+    await call.message.edit_text("Текущие позиции:", reply_markup=admin_positions_list(items))
+    _answer_later(call)
 
 
+_ADMIN_SUMMARY_TMPL = (
+    "За сегодня:\n"
+    "Всего заработано: `{0}` руб.\n"
+    "Ожидающих получения: `{1}` шт.\n"
+    "Всего заказов: `{2}` шт.\n\n"
+    "Всего ожидаемых заказов: `{3}`\n"
+    "Общее кол-во заказов: `{2}`"
+).format
+
+
+@lru_cache(maxsize=64)
 def _admin_summary_text(today_rev: int, awaiting_cnt: int, total_cnt: int, active_cnt: int) -> str:
-    return (
-        "За сегодня:\n"
-        f"Всего заработано: `{today_rev}` руб.\n"
-        f"Ожидающих получения: `{awaiting_cnt}` шт.\n"
-        f"Всего заказов: `{total_cnt}` шт.\n\n"
-        f"Всего ожидаемых заказов: `{active_cnt}`\n"
-        f"Общее кол-во заказов: `{total_cnt}`"
-    )
+    return _ADMIN_SUMMARY_TMPL(today_rev, awaiting_cnt, total_cnt, active_cnt)
+
+
+@lru_cache(maxsize=1024)
+def _fmt_d(d) -> str:
+    """Дата в формате ДД.ММ.ГГГГ (или «-»); даты хешируемы, поэтому результат кэшируется."""
+    return d.strftime("%d.%m.%Y") if d else "-"
+
+
+# Карточки завершённых заказов: order_id -> (имя, телефон, текст). Такой заказ больше не меняется,
+# поэтому текст сверяется только с контактами покупателя (их можно отредактировать в профиле)
+_FINISHED_TEXT_MAX = 2048
+_finished_texts: dict[int, tuple[str, str, str]] = {}
 
 
 def _order_detail_text(o: dict) -> str:
     """
     o: результат admin_get_order(...)
     """
-    items = "\n".join(
-        f"• {it['title']} ×{it['qty']} — {it['price'] * it['qty']} ₽" for it in o["items"]
-    ) or "—"
-
-    way = "Доставка" if o["delivery_way"] == "delivery" else "Самовывоз"
-    used = int(o.get("used_bonus") or 0)
-    total = int(o.get("total") or 0)
-    to_pay = max(total - used, 0)
-
-    dlv_plan = o["delivery_date"].strftime("%d.%m.%Y") if o.get("delivery_date") else "-"
-    got_dt = o["finished_at"].strftime("%d.%m.%Y") if o.get("finished_at") else "-"
-
-    is_finished = o["status"] in ("finished", "cancelled")
-    header = "*Заказ (завершённый)*" if is_finished else "*Заказ (активный)*"
-
-    comment_text = ""
-    if o.get("comment"):
-        comment_text = f"\n*Комментарий клиента:*\n_{o['comment']}_\n"
-
-    status_txt = status_map.get(o['status'], o['status'])
-
-    text = (
-        f"{header}\n\n"
-        f"*Имя фамилия:* {o['name_surname']}\n"
-        f"*Номер:* {o['tel_num']}\n\n"
-        f"*Комментарий:* {comment_text}\n"
-        f"*Товары:*\n{items}\n\n"
-        f"*Цена:* `{total} ₽`\n"
-        f"*Списано бонусов:* `{used} ₽`\n"
-        f"*К оплате:* `{to_pay} ₽`\n\n"
-        f"*Способ получения:* {way}\n"
-        f"*Статус:* {status_txt}\n"
-        f"*Дата оформления:* {o['registration_date']:%d.%m.%Y}\n"
-        f"*Планируемая дата доставки:* {dlv_plan}\n"
+    is_finished = o["status"] in FINISHED_STATUSES
+    if is_finished:
+        hit = _finished_texts.get(o["id"])
+        if hit is not None and hit[0] == o['name_surname'] and hit[1] == o['tel_num']:
+            return hit[2]
+
+    # Ключ — все выводимые поля заказа: карточка пересобирается только когда строка реально изменилась
+    items = tuple((it['title'], it['qty'], it['price']) for it in o["items"])
+    text = _order_detail_text_cached(
+        o["status"], o["delivery_way"], o.get("yandex_claim_id"), o.get("comment"),
+        o['name_surname'], o['tel_num'], items,
+        int(o.get("total") or 0), int(o.get("used_bonus") or 0),
+        o.get("delivery_date"), o['registration_date'], o.get("finished_at"),
     )
-    if o["delivery_way"] == "delivery" and o.get("yandex_claim_id"):
-        text += "\n*Статус доставки:*\n⏳ _Нажмите 'Обновить статус доставки', чтобы получить информацию._"
     if is_finished:
-        text += f"*Дата завершения:* {got_dt}\n"
+        if len(_finished_texts) >= _FINISHED_TEXT_MAX:
+            _finished_texts.pop(next(iter(_finished_texts)))
+        _finished_texts[o["id"]] = (o['name_surname'], o['tel_num'], text)
     return text
 
 
-@admin_router.callback_query(F.data == "orders")
+_ITEM_LINE = "• {} ×{} — {} ₽".format
+
+# Карточка заказа для админа; подписи разобраны один раз при импорте
+_ORDER_TMPL = (
+    "{header}\n\n"
+    "*Имя фамилия:* {name_surname}\n"
+    "*Номер:* {tel_num}\n\n"
+    "*Комментарий:* {comment}\n"
+    "*Товары:*\n{items}\n\n"
+    "*Цена:* `{total} ₽`\n"
+    "*Списано бонусов:* `{used} ₽`\n"
+    "*К оплате:* `{to_pay} ₽`\n\n"
+    "*Способ получения:* {way}\n"
+    "*Статус:* {status}\n"
+    "*Дата оформления:* {registered}\n"
+    "*Планируемая дата доставки:* {delivery_plan}\n"
+    "{delivery_note}{finished}"
+).format_map
+_ORDER_DELIVERY_NOTE = "\n*Статус доставки:*\n⏳ _Нажмите 'Обновить статус доставки', чтобы получить информацию._"
+
+
+@lru_cache(maxsize=1024)
+def _order_detail_text_cached(
+        status, delivery_way, yandex_claim_id, comment, name_surname, tel_num, items,
+        total, used, delivery_date, registration_date, finished_at,
+) -> str:
+    items_text = "\n".join(_ITEM_LINE(title, qty, price * qty) for title, qty, price in items) or "—"
+    is_finished = status in FINISHED_STATUSES
+    return _ORDER_TMPL({
+        "header": "*Заказ (завершённый)*" if is_finished else "*Заказ (активный)*",
+        "name_surname": name_surname,
+        "tel_num": tel_num,
+        "comment": f"\n*Комментарий клиента:*\n_{comment}_\n" if comment else "",
+        "items": items_text,
+        "total": total,
+        "used": used,
+        "to_pay": max(total - used, 0),
+        "way": "Доставка" if delivery_way == "delivery" else "Самовывоз",
+        "status": status_map.get(status, status),
+        "registered": _fmt_d(registration_date),
+        "delivery_plan": _fmt_d(delivery_date),
+        "delivery_note": _ORDER_DELIVERY_NOTE if delivery_way == "delivery" and yandex_claim_id else "",
+        "finished": f"*Дата завершения:* {_fmt_d(finished_at)}\n" if is_finished else "",
+    })
+
+
+# Размер страницы списка заказов в админке
+_ORDERS_PAGE_SIZE = 50
+
+
+async def _first_orders_page(
+        buyer_order_manager: BuyerOrderManager, finished: bool
+) -> tuple[int, tuple[tuple, ...]]:
+    """Общее число заказов и первая страница списка — двумя параллельными запросами, без выборки всех строк."""
+    return await asyncio.gather(
+        buyer_order_manager.admin_count_orders(finished),
+        buyer_order_manager.admin_list_orders(finished, limit=_ORDERS_PAGE_SIZE),
+    )
+
+
+# Сколько первых заказов списка подгружать заранее и ссылки на фоновые задачи (чтобы их не собрал GC)
+_PREFETCH_ORDERS = 5
+
+
+def _prefetch_orders(buyer_order_manager: BuyerOrderManager, orders: tuple[tuple, ...]) -> None:
+    """Фоном прогревает кэш карточек первых заказов списка, пока админ выбирает заказ."""
+    oids = [oid for oid, _ in orders[:_PREFETCH_ORDERS]]
+    if not oids:
+        return
+
+    async def _run() -> None:
+        try:
+            await buyer_order_manager.admin_prefetch_orders(oids)
+        except Exception as e:
+            log.warning("[Bot.Admin] Не удалось предзагрузить заказы %s: %s", oids, e)
+
+    task = asyncio.create_task(_run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@orders_router.callback_query(F.data == "orders")
 @admin_only
 async def adm_orders_menu(call: CallbackQuery, buyer_order_manager):
-    today_rev = await buyer_order_manager.admin_today_revenue()
-    awaiting_cnt = await buyer_order_manager.admin_count_awaiting_pickup()
-    total_cnt = await buyer_order_manager.admin_count_total()
-    active_cnt = await buyer_order_manager.admin_count_active()
+    today_rev, awaiting_cnt, total_cnt, active_cnt = await buyer_order_manager.admin_summary()
 
-    try:
-        await call.message.edit_text(
-            _admin_summary_text(today_rev, awaiting_cnt, total_cnt, active_cnt),
-            parse_mode="Markdown",
-            reply_markup=get_admin_orders_keyboard(),
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+    await call.message.edit_text(
+        _admin_summary_text(today_rev, awaiting_cnt, total_cnt, active_cnt),
+        parse_mode="Markdown",
+        reply_markup=get_admin_orders_keyboard(),
+    )
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data == "adm-orders:menu")
+@orders_router.callback_query(F.data == "adm-orders:menu")
 @admin_only
 async def adm_orders_menu_again(call: CallbackQuery, buyer_order_manager):
     return await adm_orders_menu(call, buyer_order_manager)
 
 
-@admin_router.callback_query(F.data.in_({"adm-orders:active", "adm-orders:finished"}))
-@admin_only
-async def adm_orders_list(call: CallbackQuery, buyer_order_manager):
-    finished = call.data.endswith("finished")
-    orders = await buyer_order_manager.admin_list_orders(finished=finished)
+@lru_cache(maxsize=256)
+def _orders_list_header(total: int, finished: bool) -> str:
+    return f"Кол-во {'завершённых' if finished else 'ожидаемых'} заказов: `{total}`"
 
-    header = (
-        f"Кол-во ожидаемых заказов: `{len(orders)}`"
-        if not finished else
-        f"Кол-во завершённых заказов: `{len(orders)}`"
-    )
 
-    try:
-        await call.message.edit_text(
-            header,
-            parse_mode="Markdown",
-            reply_markup=get_admin_orders_list_kb(orders, finished, page=1),
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+async def _render_orders_list(msg: Message, buyer_order_manager: BuyerOrderManager, finished: bool) -> None:
+    """
+    Показывает первую страницу списка заказов. Счётчик и страница берутся из TTL-кэша менеджера
+    (сбрасывается при любом изменении заказов), клавиатура и заголовок — из lru_cache,
+    поэтому повторные переходы к списку почти ничего не стоят.
+    """
+    total, orders = await _first_orders_page(buyer_order_manager, finished)
+    _prefetch_orders(buyer_order_manager, orders)
+    await _safe_edit(
+        msg,
+        _orders_list_header(total, finished),
+        parse_mode="Markdown",
+        reply_markup=get_admin_orders_list_kb(orders, finished, page_size=_ORDERS_PAGE_SIZE, total=total),
+    )
 
 
-@admin_router.callback_query(F.data.startswith("adm-orders:page:"))
+@orders_router.callback_query(F.data.in_({"adm-orders:active", "adm-orders:finished"}))
 @admin_only
-async def adm_orders_page(call: CallbackQuery, buyer_order_manager):
-    _, _, status_token, page_str = call.data.split(":")
-    finished = (status_token == "finished")
-    try:
-        page = int(page_str)
-    except ValueError:
-        page = 1
+async def adm_orders_list(call: CallbackQuery, buyer_order_manager):
+    await _render_orders_list(call.message, buyer_order_manager, call.data.endswith("finished"))
+    _answer_later(call)
 
+
+@orders_router.callback_query(CbData("adm-orders:page", ("status", str), ("page", int)))
+@admin_only
+async def adm_orders_page(call: CallbackQuery, cb, buyer_order_manager):
+    finished = (cb.status == "finished")
     orders = await buyer_order_manager.admin_list_orders(finished=finished)
-    kb = get_admin_orders_list_kb(orders, finished, page=page)
+    kb = get_admin_orders_list_kb(orders, finished, page=cb.page)
 
-    try:
-        # меняем только клавиатуру (шапка со счетчиком остаётся прежней)
-        await call.message.edit_reply_markup(reply_markup=kb)
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+    # меняем только клавиатуру (шапка со счетчиком остаётся прежней)
+    schedule_edit(call.bot, call.message.chat.id, call.message.message_id, reply_markup=kb)
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("adm-orders:back-list:"))
+@orders_router.callback_query(CbData("adm-orders:back-list", ("suffix", str)))
 @admin_only
-async def adm_orders_back_list(call: CallbackQuery, buyer_order_manager):
-    suffix = call.data.split(":")[2]  # 'act' | 'fin'
-    finished = (suffix == "fin")
-    orders = await buyer_order_manager.admin_list_orders(finished=finished)
-    header = (
-        f"Кол-во ожидаемых заказов: `{len(orders)}`"
-        if not finished else
-        f"Кол-во завершённых заказов: `{len(orders)}`"
-    )
+async def adm_orders_back_list(call: CallbackQuery, cb, buyer_order_manager):
+    await _render_orders_list(call.message, buyer_order_manager, cb.suffix == "fin")  # 'act' | 'fin'
+    _answer_later(call)
 
-    try:
-        await call.message.edit_text(
-            header,
-            parse_mode="Markdown",
-            reply_markup=get_admin_orders_list_kb(orders, finished),
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
 
+# (chat_id, message_id) -> (order_id, текст, клавиатура) карточки заказа, показанной в сообщении последней.
+# Нужна, чтобы вернуть админа на карточку после неудачной отмены, не перечитывая заказ
+_shown_cards: dict[tuple[int, int], tuple[int, str, InlineKeyboardMarkup]] = {}
 
-@admin_router.callback_query(
-    F.data.startswith("adm-order:") & ~F.data.contains(":advance:") & ~F.data.contains(":cancel")
-)
+
+def _remember_card(msg: Message, order_id: int, text: str, kb: InlineKeyboardMarkup) -> None:
+    key = (msg.chat.id, msg.message_id)
+    _shown_cards.pop(key, None)
+    if len(_shown_cards) >= _RENDERED_MAX:
+        _shown_cards.pop(next(iter(_shown_cards)))
+    _shown_cards[key] = (order_id, text, kb)
+
+
+# "adm-order:advance:..." и "adm-order:cancel:..." сюда не попадут: второе поле не число
+@orders_router.callback_query(CbData("adm-order", ("oid", int), ("suffix", str)))
 @admin_only
-async def adm_order_detail(call: CallbackQuery, buyer_order_manager):
-    _, oid, suffix = call.data.split(":")
-    order = await buyer_order_manager.admin_get_order(int(oid))
+async def adm_order_detail(call: CallbackQuery, cb, buyer_order_manager):
+    oid, suffix = cb
+    order = await buyer_order_manager.admin_get_order(oid)
     if not order:
         await call.answer("Заказ не найден", show_alert=True)
         return
 
     kb = admin_order_detail_kb(order, suffix=suffix)
-    try:
-        await call.message.edit_text(_order_detail_text(order), parse_mode="Markdown", reply_markup=kb)
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+    text = _order_detail_text(order)
+    await _safe_edit(call.message, text, parse_mode="Markdown", reply_markup=kb)
+    _remember_card(call.message, oid, text, kb)
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("adm-order:advance:"))
+@orders_router.callback_query(CbData("adm-order:advance", ("to_status", str), ("oid", int), ("suffix", str)))
 @admin_only
-async def adm_order_advance(call: CallbackQuery, buyer_order_manager):
-    _, _, to_status, oid, suffix = call.data.split(":")
-    ok = await buyer_order_manager.admin_set_status(int(oid), to_status)
-    if not ok:
+async def adm_order_advance(call: CallbackQuery, cb, buyer_order_manager):
+    to_status, oid, suffix = cb
+    order = await buyer_order_manager.admin_set_status_returning(oid, to_status)
+    if order is None:
         await call.answer("Недопустимый переход статуса", show_alert=True)
         return
 
-    order = await buyer_order_manager.admin_get_order(int(oid))
-    try:
-        await call.message.edit_text(
-            _order_detail_text(order),
-            parse_mode="Markdown",
-            reply_markup=admin_order_detail_kb(order, suffix=suffix),
-        )
-        await call.answer("Статус обновлён")
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+    text = _order_detail_text(order)
+    kb = admin_order_detail_kb(order, suffix=suffix)
+    schedule_edit(
+        call.bot, call.message.chat.id, call.message.message_id,
+        text=text,
+        parse_mode="Markdown",
+        reply_markup=kb,
+    )
+    _remember_card(call.message, oid, text, kb)
+    await call.answer("Статус обновлён")
 
 
-@admin_router.callback_query(F.data.startswith("adm-order:cancel:"))
+@orders_router.callback_query(CbData("adm-order:cancel", ("oid", int), ("suffix", str)))
 @admin_only
-async def adm_order_cancel_confirm(call: CallbackQuery):
-    _, _, oid, suffix = call.data.split(":")
-    try:
-        await call.message.edit_text(
-            "Вы уверены, что хотите отменить заказ?",
-            reply_markup=admin_cancel_confirm_kb(int(oid), suffix),
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+async def adm_order_cancel_confirm(call: CallbackQuery, cb):
+    oid, suffix = cb
+    await call.message.edit_text(
+        "Вы уверены, что хотите отменить заказ?",
+        reply_markup=admin_cancel_confirm_kb(oid, suffix),
+    )
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("adm-order:cancel-yes:"))
+@orders_router.callback_query(CbData("adm-order:cancel-yes", ("oid", int), ("suffix", str)))
 @admin_only
 async def adm_order_cancel_yes(
         call: CallbackQuery,
+        cb,
         bot: Bot,
         buyer_order_manager: BuyerOrderManager,
         yandex_delivery_client: YandexDeliveryClient
 ):
-    try:
-        _, _, oid, suffix = call.data.split(":")
-        order_id = int(oid)
-    except (ValueError, IndexError):
-        await call.answer("Ошибка в данных.", show_alert=True)
-        return
+    order_id, suffix = cb
 
     order = await buyer_order_manager.get_order_by_id(order_id)
     if not order:
         await call.answer("Заказ не найден.", show_alert=True)
         return
 
+    # Колбэк можно подтвердить только один раз: после промежуточного ответа итог пишем сообщением
+    answered = False
+
+    async def _report(text: str) -> None:
+        if answered:
+            await call.message.answer(text)
+        else:
+            await call.answer(text, show_alert=True)
+
     # Если у заказа есть заявка в Яндексе, применяем умную логику
     if order.yandex_claim_id:
         await call.answer("Проверяем статус в Яндекс.Доставке...", show_alert=False)
-        claim_info = await yandex_delivery_client.get_claim_info(order.yandex_claim_id)
+        answered = True
+        # claim_id известен только после чтения заказа, поэтому параллелим запросы к Яндексу:
+        # условия отмены нужны для активной заявки (основной случай), для финальной просто не используются
+        claim_info, cancel_info = await asyncio.gather(
+            yandex_delivery_client.fetch_claim_info(order.yandex_claim_id),
+            yandex_delivery_client.get_cancellation_info(order.yandex_claim_id),
+        )
 
         if not claim_info:
-            await call.answer("Не удалось получить информацию о заявке от Яндекса. Отмена невозможна.", show_alert=True)
+            await _report("Не удалось получить информацию о заявке от Яндекса. Отмена невозможна.")
             return
 
         yandex_status = claim_info.get("status")
@@ -978,13 +1116,12 @@ async def adm_order_cancel_yes(
         # В этом случае мы принудительно отменяем заказ в нашей БД для синхронизации.
         if yandex_status in yandex_final_statuses:
             log.info(
-                f"Принудительная отмена заказа #{order_id} админом. Статус в Яндексе уже финальный: {yandex_status}")
+                "Принудительная отмена заказа #%s админом. Статус в Яндексе уже финальный: %s", order_id, yandex_status)
             await buyer_order_manager.cancel_order(order_id)
-            await call.answer("Заказ отменен (синхронизирован со статусом Яндекса).", show_alert=True)
+            done_text = "Заказ отменен (синхронизирован со статусом Яндекса)."
 
         # СЦЕНАРИЙ 2: Статус в Яндексе еще активный. Проверяем условия отмены.
         else:
-            cancel_info = await yandex_delivery_client.get_cancellation_info(order.yandex_claim_id)
             if cancel_info and cancel_info.get("cancel_state") == "free":
                 # Отмена бесплатна, отменяем в Яндексе и потом в БД
                 is_cancelled_on_yandex = await yandex_delivery_client.cancel_claim(
@@ -993,90 +1130,89 @@ async def adm_order_cancel_yes(
                     version=claim_info.get("version", 1)
                 )
                 if not is_cancelled_on_yandex:
-                    await call.answer("Яндекс.Доставка вернула ошибку при отмене.", show_alert=True)
+                    await _report("Яндекс.Доставка вернула ошибку при отмене.")
                     return
 
                 await buyer_order_manager.cancel_order(order_id)
-                await call.answer("Заказ успешно отменён!", show_alert=True)
+                done_text = "Заказ успешно отменён!"
 
             else:
                 # Отмена платная или недоступна для АКТИВНОГО заказа. Блокируем.
                 state = cancel_info.get('cancel_state', 'недоступна') if cancel_info else 'недоступна'
                 error_message = (f"Отмена невозможна: заказ активен "
                                  f"и отмена в Яндексе платная/недоступна (статус: {state}).")
-                await call.answer(error_message, show_alert=True)
-
-                # Возвращаем админа на карточку заказа
-                full_order_data = await buyer_order_manager.admin_get_order(order_id)
-                if full_order_data:
-                    text = _order_detail_text(full_order_data)
-                    kb = admin_order_detail_kb(full_order_data, suffix=suffix)
-                    await call.message.edit_text(text, parse_mode="Markdown", reply_markup=kb)
+                await _report(error_message)
+
+                # Возвращаем админа на карточку заказа. Заказ не менялся, поэтому, если карточка
+                # уже показывалась в этом сообщении, берём её как есть, без запроса в БД
+                card = _shown_cards.get((call.message.chat.id, call.message.message_id))
+                if card is None or card[0] != order_id:
+                    full_order_data = await buyer_order_manager.admin_get_order(order_id)
+                    if not full_order_data:
+                        return
+                    card = (order_id, _order_detail_text(full_order_data),
+                            admin_order_detail_kb(full_order_data, suffix=suffix))
+                await _safe_edit(call.message, card[1], parse_mode="Markdown", reply_markup=card[2])
                 return
 
     # СЦЕНАРИЙ 3: У заказа нет заявки в Яндексе. Просто отменяем его.
     else:
         await buyer_order_manager.cancel_order(order_id)
-        await call.answer("Заказ успешно отменён!", show_alert=True)
+        done_text = "Заказ успешно отменён!"
 
     # --- ОБЩИЙ БЛОК ДЛЯ ВСЕХ УСПЕШНЫХ ОТМЕН ---
 
-    client_tg_id = await buyer_order_manager.get_tg_user_id_by_order(order)
-    if client_tg_id:
-        try:
-            await bot.send_message(client_tg_id, f"❗️Ваш заказ №{order_id} был отменен администратором.")
-        except TelegramBadRequest as e:
-            log.warning(f"Не удалось уведомить клиента {client_tg_id}: {e}")
-
-    finished = (suffix == "fin")
-    orders = await buyer_order_manager.admin_list_orders(finished=finished)
-    header = f"Кол-во {'завершённых' if finished else 'активных'} заказов: `{len(orders)}`"
-    try:
-        await call.message.edit_text(
-            header, parse_mode="Markdown", reply_markup=get_admin_orders_list_kb(orders, finished)
-        )
-    except TelegramBadRequest as e:
-        await handle_telegram_error(e, call=call)
+    async def _notify_client() -> None:
+        client_tg_id = await buyer_order_manager.get_tg_user_id_by_order(order)
+        if client_tg_id:
+            try:
+                await bot.send_message(client_tg_id, f"❗️Ваш заказ №{order_id} был отменен администратором.")
+            except TelegramBadRequest as e:
+                log.warning("Не удалось уведомить клиента %s: %s", client_tg_id, e)
+
+    # Ответ админу, уведомление клиента и обновлённый список заказов друг от друга не зависят;
+    # сбой одного шага не должен оставлять остальные без владельца
+    results = await asyncio.gather(
+        _report(done_text),
+        _notify_client(),
+        _render_orders_list(call.message, buyer_order_manager, suffix == "fin"),
+        return_exceptions=True,
+    )
+    for step, result in zip(("ответ админу", "уведомление клиента", "список заказов"), results):
+        if isinstance(result, Exception):
+            log.error("Отмена заказа #%s: не удалось выполнить шаг «%s»: %r", order_id, step, result)
 
 
 @admin_router.callback_query(F.data == "send-notification")
 @admin_only
 async def notify_start(call: CallbackQuery, state: FSMContext):
-    try:
-        await call.message.edit_text(
-            "Пришлите сообщение, которое нужно разослать всем пользователям.\n\n"
-            "Можно отправить текст или одно вложение (фото/видео/документ) с подписью.\n"
-            "_После получения я покажу превью и попрошу подтверждение._",
-            parse_mode="Markdown",
-            reply_markup=notify_cancel_kb()
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
-        return
+    await call.message.edit_text(
+        "Пришлите сообщение, которое нужно разослать всем пользователям.\n\n"
+        "Можно отправить текст или одно вложение (фото/видео/документ) с подписью.\n"
+        "_После получения я покажу превью и попрошу подтверждение._",
+        parse_mode="Markdown",
+        reply_markup=notify_cancel_kb()
+    )
+    await call.answer()
     await state.set_state(AdminNotify.waiting_message)
 
 
 @admin_router.message(AdminNotify.waiting_message)
 @admin_only
 async def notify_catch_message(msg: Message, state: FSMContext, user_info_manager):
-    await state.update_data(src_chat_id=msg.chat.id, src_message_id=msg.message_id)
+    await state.update_data(
+        src_chat_id=msg.chat.id, src_message_id=msg.message_id, src_payload=broadcast_payload(msg)
+    )
 
-    total = await user_info_manager.count_all()
+    total = await user_info_manager.count_reachable()
 
-    try:
-        await msg.answer(
-            f"Получил сообщение для рассылки.\n"
-            f"Получателей: `{total}`.\n\n"
-            f"Нажмите «Разослать», чтобы отправить всем.",
-            parse_mode="Markdown",
-            reply_markup=notify_confirm_kb()
-        )
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, message=msg)
-        return
+    await msg.answer(
+        f"Получил сообщение для рассылки.\n"
+        f"Получателей: `{total}`.\n\n"
+        f"Нажмите «Разослать», чтобы отправить всем.",
+        parse_mode="Markdown",
+        reply_markup=notify_confirm_kb()
+    )
 
     await state.set_state(AdminNotify.confirm)
 
@@ -1084,22 +1220,22 @@ async def notify_catch_message(msg: Message, state: FSMContext, user_info_manage
 @admin_router.callback_query(AdminNotify.confirm, F.data == "notify:redo")
 @admin_only
 async def notify_redo(call: CallbackQuery, state: FSMContext):
-    try:
-        await call.message.edit_text(
-            "Хорошо, пришлите новое сообщение для рассылки.",
-            reply_markup=notify_cancel_kb()
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
-        return
+    await call.message.edit_text(
+        "Хорошо, пришлите новое сообщение для рассылки.",
+        reply_markup=notify_cancel_kb()
+    )
+    await call.answer()
     await state.set_state(AdminNotify.waiting_message)
 
 
 @admin_router.callback_query(AdminNotify.confirm, F.data == "notify:send")
 @admin_only
-async def notify_send(call: CallbackQuery, state: FSMContext, user_info_manager):
+async def notify_send(call: CallbackQuery, state: FSMContext, broadcast_manager: BroadcastManager):
+    admin_id = call.from_user.id
+    if admin_id in active_broadcasts:
+        await call.answer("Рассылка уже идёт.", show_alert=True)
+        return
+
     data = await state.get_data()
     src_chat_id = data.get("src_chat_id")
     src_message_id = data.get("src_message_id")
@@ -1107,51 +1243,109 @@ async def notify_send(call: CallbackQuery, state: FSMContext, user_info_manager)
         await call.answer("Нет сообщения для рассылки. Пришлите ещё раз.", show_alert=True)
         return
 
-    ids = await user_info_manager.list_all_tg_user_ids()
-
-    ok, fail = 0, 0
+    payload = data.get("src_payload")
+    # Очередь получателей сохраняется в БД: после перезапуска бота рассылка продолжится (resume_broadcasts)
+    broadcast_id, total = await broadcast_manager.create_broadcast(
+        call.message.chat.id, src_chat_id, src_message_id, payload
+    )
     bot = call.message.bot
 
-    for uid in ids:
-        try:
-            await bot.copy_message(
-                chat_id=uid,
-                from_chat_id=src_chat_id,
-                message_id=src_message_id,
-            )
-            ok += 1
-        except TelegramAPIError as e:
-            log.warning(f"[Notify] Failed to deliver to {uid}: {e!r}")
-            fail += 1
-        await asyncio.sleep(0.05)
-
-    await state.clear()
+    # Запрос собирается и валидируется один раз, для каждого получателя меняется только chat_id
+    send_tpl = broadcast_method(src_chat_id, src_message_id, payload)
+    stats = {"ok": 0, "fail": 0}
+    blocked: list[int] = []
 
     try:
         await call.message.edit_text(
-            f"Рассылка завершена.\nУспешно: `{ok}`, ошибок: `{fail}`.",
+            f"Идёт рассылка на `{total}` получателей…",
             parse_mode="Markdown",
-            reply_markup=get_main_inline_keyboard(True)
+            reply_markup=notify_cancel_kb()
         )
-        await call.answer("Готово")
+        await call.answer()
     except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+        log.error("[Bot.Admin] Не удалось показать начало рассылки: %s", e)
+
+    chat_id, message_id = call.message.chat.id, call.message.message_id
+
+    async def _chunks_with_progress():
+        # Прогресс идёт через coalescer: частые правки схлопываются и не обгоняют итоговую
+        reported = 0
+        async for chunk in claim_chunks(broadcast_manager, broadcast_id, stats, blocked):
+            yield chunk
+            done = stats["ok"] + stats["fail"]
+            if done - reported >= PROGRESS_EVERY:
+                reported = done
+                schedule_edit(
+                    bot, chat_id, message_id,
+                    text=f"Идёт рассылка: `{done}`/`{total}`…",
+                    parse_mode="Markdown",
+                    reply_markup=notify_cancel_kb(),
+                )
+
+    task = asyncio.create_task(run_broadcast(bot, _chunks_with_progress(), send_tpl, stats, blocked))
+    active_broadcasts[admin_id] = task
+    try:
+        await task
+        title, status = "Рассылка завершена.", "done"
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise
+        title, status = "Рассылка прервана.", "cancelled"
+    finally:
+        active_broadcasts.pop(admin_id, None)
+
+    await broadcast_manager.finish_broadcast(broadcast_id, status, stats["ok"], stats["fail"], blocked)
+    await state.clear()
+
+    # Через тот же coalescer, чтобы ещё не отправленная правка прогресса не перезаписала итог
+    schedule_edit(
+        bot, chat_id, message_id,
+        text=f"{title}\nУспешно: `{stats['ok']}`, ошибок: `{stats['fail']}`.",
+        parse_mode="Markdown",
+        reply_markup=get_main_inline_keyboard(True),
+    )
 
 
 @admin_router.callback_query(F.data == "cancel-fsm-admin")
 @admin_only
 async def notify_cancel(call: CallbackQuery, state: FSMContext):
+    task = active_broadcasts.get(call.from_user.id)
+    if task is not None:
+        # Итоговое сообщение с результатами покажет сам notify_send
+        task.cancel()
+        await call.answer("Рассылка остановлена")
+        return
+
     await state.clear()
-    try:
-        await call.message.edit_text(
-            "Действие отменено. Что делаем дальше?",
-            reply_markup=get_main_inline_keyboard(True)
-        )
-        await call.answer()
-    except TelegramBadRequest as e:
-        log.error(e)
-        await handle_telegram_error(e, call=call)
+    await call.message.edit_text(
+        "Действие отменено. Что делаем дальше?",
+        reply_markup=get_main_inline_keyboard(True)
+    )
+    _answer_later(call)
+
+
+_WAREHOUSE_TEMPLATE = (
+    "🚚 Информация о складе для отправки заказов:\n\n"
+    "Название: {name}\n"
+    "Адрес: {address_line}\n"
+    "Контактное лицо: {contact_name}\n"
+    "Телефон: {contact_phone}\n"
+    "Координаты (шир, долг): <code>{latitude}, {longitude}</code>\n"
+    "Комментарий курьеру: {comment}"
+)
+_WAREHOUSE_DETAIL_FIELDS = (('porch', 'подъезд {}'), ('floor', 'этаж {}'), ('apartment', 'кв/офис {}'))
+_WAREHOUSE_CARD_KEYS = (
+    'name', 'address', 'porch', 'floor', 'apartment', 'contact_name', 'contact_phone', 'latitude', 'longitude',
+    'comment',
+)
+_WAREHOUSE_DEFAULTS = {'name': 'не указано', 'contact_name': 'не указано', 'contact_phone': 'не указан'}
+
+
+class _WarehouseFields(dict):
+    """Поля склада для шаблона: отсутствующие ключи заменяются значениями по умолчанию."""
+
+    def __missing__(self, key):
+        return _WAREHOUSE_DEFAULTS.get(key)
 
 
 def format_warehouse_info(warehouse_data: dict) -> str:
@@ -1161,27 +1355,44 @@ def format_warehouse_info(warehouse_data: dict) -> str:
             "❗️ Склад по умолчанию не найден в базе данных.\n\n"
             "Доставка не будет работать, пока вы не создадите запись о складе ")
 
+    # Служебные колонки (id, is_default, ...) в карточку не попадают и в ключ кэша не входят
+    return _warehouse_card(tuple((k, warehouse_data[k]) for k in _WAREHOUSE_CARD_KEYS if k in warehouse_data))
+
+
+# Ключ кэша — сами выводимые поля: после правки склада просто получится новый ключ
+@lru_cache(maxsize=16)
+def _warehouse_card(fields: tuple) -> str:
+    # Карточка уходит с parse_mode="HTML": значения, введённые админом, экранируются
+    warehouse_data = {k: v if v is None else html.escape(str(v)) for k, v in fields}
+    details = [fmt.format(v) for key, fmt in _WAREHOUSE_DETAIL_FIELDS if (v := warehouse_data.get(key))]
     address_line = warehouse_data.get('address', 'не указан')
-    details = []
-    if warehouse_data.get('porch'):
-        details.append(f"подъезд {warehouse_data['porch']}")
-    if warehouse_data.get('floor'):
-        details.append(f"этаж {warehouse_data['floor']}")
-    if warehouse_data.get('apartment'):
-        details.append(f"кв/офис {warehouse_data['apartment']}")
     if details:
-        address_line += f" ({', '.join(details)})"
-
-    return (
-        "🚚 Информация о складе для отправки заказов:\n\n"
-        f"Название: {warehouse_data.get('name', 'не указано')}\n"
-        f"Адрес: {address_line}\n"
-        f"Контактное лицо: {warehouse_data.get('contact_name', 'не указано')}\n"
-        f"Телефон: {warehouse_data.get('contact_phone', 'не указан')}\n"
-        f"Координаты (шир, долг): `{warehouse_data.get('latitude')},"
-        f" {warehouse_data.get('longitude')}`\n"
-        f"Комментарий курьеру: {warehouse_data.get('comment') if warehouse_data.get('comment') else 'Не указан'}"
-    )
+        address_line = f"{address_line} ({', '.join(details)})"
+
+    return _WAREHOUSE_TEMPLATE.format_map(_WarehouseFields(
+        warehouse_data, address_line=address_line, comment=warehouse_data.get('comment') or 'Не указан',
+    ))
+
+
+async def _render_warehouse_card(
+        target: Message | CallbackQuery, warehouse_manager: WarehouseManager, warehouse: dict | None = None,
+        notice: str = "",
+) -> None:
+    """
+    Показывает карточку склада: для CallbackQuery — правкой сообщения с кнопкой, для Message — новым сообщением.
+    `warehouse` — уже известная строка (например, из UPDATE ... RETURNING); если её нет, берётся склад
+    по умолчанию, а если нет и его — текст с кнопкой создания. `notice` выводится над карточкой.
+    """
+    if warehouse is None:
+        warehouse = await warehouse_manager.get_default_warehouse()
+    kb = admin_warehouse_detail_kb(warehouse['id']) if warehouse else admin_create_warehouse_kb()
+    text = format_warehouse_info(warehouse)
+    if notice:
+        text = f"{notice}\n\n{text}"
+    if isinstance(target, CallbackQuery):
+        await target.message.edit_text(text, parse_mode="HTML", reply_markup=kb)
+    else:
+        await target.answer(text, parse_mode="HTML", reply_markup=kb)
 
 
 # --- Хендлер для кнопки "Настройки доставки" ---
@@ -1192,18 +1403,7 @@ async def admin_delivery_settings(call: CallbackQuery, warehouse_manager: Wareho
     Показывает информацию о складе или предлагает его создать.
     """
     await call.answer()
-    default_warehouse = await warehouse_manager.get_default_warehouse()
-
-    if default_warehouse:
-        # Склад найден, показываем детали и кнопки редактирования (старая логика)
-        text = format_warehouse_info(default_warehouse)
-        kb = admin_warehouse_detail_kb(default_warehouse['id'])
-    else:
-        # Склад НЕ найден, показываем ошибку и кнопку "Создать"
-        text = format_warehouse_info(None)  # Функция вернет текст ошибки
-        kb = admin_create_warehouse_kb()
-
-    await call.message.edit_text(text, parse_mode="Markdown", reply_markup=kb)
+    await _render_warehouse_card(call, warehouse_manager)
 
 
 @admin_router.message(WarehouseEdit.waiting_for_contact_phone)
@@ -1213,7 +1413,7 @@ async def process_edit_warehouse_phone(msg: Message, state: FSMContext, warehous
     Получает новый номер телефона, валидирует, нормализует и сохраняет его.
     """
     # --- ВОТ ВАША ЛОГИКА ---
-    phone_e164 = normalize_phone(msg.text.strip())
+    phone_e164 = normalize_phone((msg.text or "").strip())
     if phone_e164 is None:
         await msg.answer(
             "❌ Телефон выглядит некорректно.\n"
@@ -1224,72 +1424,60 @@ async def process_edit_warehouse_phone(msg: Message, state: FSMContext, warehous
     data = await state.get_data()
     warehouse_id = data.get("warehouse_id")
 
-    await warehouse_manager.update_field(warehouse_id, "contact_phone", phone_e164)
+    warehouse = await warehouse_manager.update_field(warehouse_id, "contact_phone", phone_e164)
 
     await state.clear()
-    await msg.answer("✅ Контактный телефон склада успешно обновлен!")
+    # Итог и обновлённая карточка — одним сообщением
+    await _render_warehouse_card(
+        msg, warehouse_manager, warehouse, notice="✅ Контактный телефон склада успешно обновлен!"
+    )
+
 
-    # Показываем админу обновленную информацию
-    default_warehouse = await warehouse_manager.get_default_warehouse()
-    text = format_warehouse_info(default_warehouse)
-    kb = admin_warehouse_detail_kb(default_warehouse['id']) if default_warehouse else None
-    await msg.answer(text, parse_mode="Markdown", reply_markup=kb)
+def _warehouse_value_prompt(field_title: str) -> tuple[State, str, str]:
+    return WarehouseEdit.waiting_for_value, f"Введите новое значение для поля <b>{field_title}</b>:", "HTML"
+
+
+# Поле склада -> (состояние FSM, приглашение, parse_mode); адрес и телефон идут своими сценариями
+_WAREHOUSE_EDIT_DISPATCH: dict[str, tuple[State, str, str | None]] = {
+    "address": (
+        WarehouseEdit.waiting_for_new_address_text,
+        "Введите основную часть адреса <b>склада</b> через запятую (город, улица, дом).\n\n"
+        "Например: <b>Нижний Новгород, Большая Покровская, 1</b>",
+        "HTML",
+    ),
+    "contact_phone": (
+        WarehouseEdit.waiting_for_contact_phone,
+        "Введите новый контактный телефон склада (например, +79...):",
+        None,
+    ),
+    "name": _warehouse_value_prompt("название склада"),
+    "porch": _warehouse_value_prompt("подъезд"),
+    "floor": _warehouse_value_prompt("этаж"),
+    "apartment": _warehouse_value_prompt("номер квартиры/офиса"),
+    "contact_name": _warehouse_value_prompt("имя контактного лица"),
+    "comment": _warehouse_value_prompt("комментарий"),
+}
 
 
 # --- Хендлер для кнопок "Изменить..." ---
-@admin_router.callback_query(F.data.startswith("wh:edit:"))
+@admin_router.callback_query(CbData("wh:edit", ("field", str), ("warehouse_id", int)))
 @admin_only
-async def start_edit_warehouse_field(call: CallbackQuery, state: FSMContext):
+async def start_edit_warehouse_field(call: CallbackQuery, cb, state: FSMContext):
     """
     Запускает FSM для редактирования одного поля склада.
     """
     await call.answer()
-    try:
-        _, _, field_to_edit, warehouse_id_str = call.data.split(":")
-        warehouse_id = int(warehouse_id_str)
-    except ValueError:
-        await call.message.answer("Ошибка: некорректные данные в кнопке.")
-        return
-
-    await state.update_data(warehouse_id=warehouse_id)
+    field_to_edit, warehouse_id = cb
 
-    # Если это адрес, запускаем специальный процесс
-    if field_to_edit == "address":
-        await state.set_state(WarehouseEdit.waiting_for_new_address_text)
-        await state.update_data(warehouse_id=warehouse_id)
-        await call.message.edit_text(
-            "Введите основную часть адреса <b>склада</b> через запятую (город, улица, дом).\n\n"
-            "Например: <b>Нижний Новгород, Большая Покровская, 1</b>", parse_mode="HTML"
-        )
-        return
-
-    if field_to_edit == "contact_phone":
-        await state.set_state(WarehouseEdit.waiting_for_contact_phone)
-        await call.message.edit_text("Введите новый контактный телефон склада (например, +79...):")
-        return
-
-    # --- ИЗМЕНЕНИЕ ЗДЕСЬ: ДОБАВЛЯЕМ НОВЫЕ ПОЛЯ В field_map ---
-    field_map = {
-        "name": "название склада",
-        "address": "основной адрес (улица, дом)",
-        "porch": "подъезд",
-        "floor": "этаж",
-        "apartment": "номер квартиры/офиса",
-        "contact_name": "имя контактного лица",
-        "contact_phone": "контактный телефон",
-        "comment": "комментарий"
-    }
-
-    prompt_text = field_map.get(field_to_edit)
-    if not prompt_text:
+    entry = _WAREHOUSE_EDIT_DISPATCH.get(field_to_edit)
+    if entry is None:
         await call.message.answer("Ошибка: попытка редактировать неизвестное поле.")
         return
 
-    await state.set_state(WarehouseEdit.waiting_for_value)
+    next_state, prompt, parse_mode = entry
+    await state.set_state(next_state)
     await state.update_data(field_to_edit=field_to_edit, warehouse_id=warehouse_id)
-
-    # Используем parse_mode="HTML" для жирного шрифта
-    await call.message.edit_text(f"Введите новое значение для поля <b>{prompt_text}</b>:", parse_mode="HTML")
+    await call.message.edit_text(prompt, parse_mode=parse_mode)
 
 
 # --- Хендлер, который ловит ответ от админа с новым значением ---
@@ -1302,17 +1490,14 @@ async def process_edit_warehouse_value(msg: Message, state: FSMContext, warehous
     data = await state.get_data()
     field = data.get("field_to_edit")
     warehouse_id = data.get("warehouse_id")
-    new_value = msg.text.strip()
+    # Необязательные поля, как и при создании, очищаются прочерком
+    new_value = _opt(msg.text) if field in _WAREHOUSE_OPTIONAL_FIELDS else (msg.text or "").strip()
 
-    await warehouse_manager.update_field(warehouse_id, field, new_value)
+    warehouse = await warehouse_manager.update_field(warehouse_id, field, new_value)
 
     await state.clear()
-    await msg.answer("✅ Данные склада успешно обновлены!")
-
-    default_warehouse = await warehouse_manager.get_default_warehouse()
-    text = format_warehouse_info(default_warehouse)
-    kb = admin_warehouse_detail_kb(default_warehouse['id']) if default_warehouse else None
-    await msg.answer(text, parse_mode="Markdown", reply_markup=kb)
+    # Итог и обновлённая карточка — одним сообщением
+    await _render_warehouse_card(msg, warehouse_manager, warehouse, notice="✅ Данные склада успешно обновлены!")
 
 
 @admin_router.message(WarehouseEdit.waiting_for_location, F.location)
@@ -1328,22 +1513,18 @@ async def process_edit_warehouse_location(msg: Message, state: FSMContext, wareh
     longitude = msg.location.longitude
 
     # Вызываем новый метод в менеджере для обновления координат
-    await warehouse_manager.update_location(warehouse_id, latitude, longitude)
+    warehouse = await warehouse_manager.update_location(warehouse_id, latitude, longitude)
 
     await state.clear()
-    await msg.answer("✅ Координаты склада успешно обновлены!")
-
-    # Показываем админу обновленную информацию
-    default_warehouse = await warehouse_manager.get_default_warehouse()
-    text = format_warehouse_info(default_warehouse)
-    kb = admin_warehouse_detail_kb(default_warehouse['id']) if default_warehouse else None
-    await msg.answer(text, parse_mode="Markdown", reply_markup=kb)
+    # Итог и обновлённая карточка — одним сообщением
+    await _render_warehouse_card(msg, warehouse_manager, warehouse, notice="✅ Координаты склада успешно обновлены!")
 
 
-@admin_router.callback_query(F.data.startswith("adm-pos:") & ~F.data.in_({"adm-pos:add", "adm-pos:back-list"}))
+# Остальные "adm-pos:<действие>..." сюда не попадут: поле должно быть числом
+@positions_router.callback_query(CbData("adm-pos", ("pid", int)))
 @admin_only
-async def adm_pos_detail(call: CallbackQuery, product_position_manager):
-    pid = int(call.data.split(":")[1])
+async def adm_pos_detail(call: CallbackQuery, cb, product_position_manager):
+    pid = cb.pid
     pos = await product_position_manager.get_order_position_by_id(pid)
     if not pos:
         await call.answer("Позиция не найдена", show_alert=True)
@@ -1351,15 +1532,11 @@ async def adm_pos_detail(call: CallbackQuery, product_position_manager):
 
     # Формируем новый, расширенный текст
     text = format_product_info(pos)
-    try:
-        if pos['image_path'] is not None:
-            await call.message.answer_photo(
-                photo=FSInputFile(pos['image_path'])
-            )
-        await call.message.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
-    except TelegramBadRequest as e:
-        await handle_telegram_error(e, call=call)
-        return
+    if pos['image_path'] is not None:
+        await call.message.answer_photo(
+            photo=FSInputFile(pos['image_path'])
+        )
+    await call.message.answer(text, parse_mode="Markdown", reply_markup=admin_pos_detail(pid))
 
 
 # =======================================================================================
@@ -1370,10 +1547,100 @@ async def adm_pos_detail(call: CallbackQuery, product_position_manager):
 @admin_only
 async def start_create_warehouse(call: CallbackQuery, state: FSMContext):
     """Начинает FSM для создания склада."""
+    # Сбрасываем данные прерванного создания (в т.ч. флаг bulk), иначе шаги 3–8 будут пропущены
+    await state.set_data({})
     await state.set_state(WarehouseCreate.waiting_for_name)
     await call.message.edit_text(
-        "*Шаг 1/8:* Введите *название* склада (например, `Основной склад`):", parse_mode="Markdown")
-    await call.answer()
+        "<b>Шаг 1/8:</b> Введите <b>название</b> склада (например, <code>Основной склад</code>):", parse_mode="HTML")
+    _answer_later(call)
+
+
+@admin_router.callback_query(F.data == "wh:create-fast")
+@admin_only
+async def start_create_warehouse_bulk(call: CallbackQuery, state: FSMContext):
+    await state.set_data({})
+    await state.set_state(WarehouseCreate.bulk)
+    await call.message.edit_text(
+        "Пришлите склад <b>одним сообщением</b>, каждое поле с новой строки:\n"
+        "<code>Название</code>\n<code>Адрес (город, улица, дом)</code>\n"
+        "<code>Подъезд</code>\n<code>Этаж</code>\n<code>Квартира/офис</code>\n"
+        "<code>Контактное лицо</code>\n<code>Телефон</code>\n<code>Комментарий курьеру</code>\n\n"
+        "Для пустых подъезда, этажа, квартиры и комментария укажите <code>-</code>.",
+        parse_mode="HTML",
+    )
+    _answer_later(call)
+
+
+_WAREHOUSE_BULK_FIELDS = (
+    "name", "address", "porch", "floor", "apartment", "contact_name", "contact_phone", "comment",
+)
+_WAREHOUSE_OPTIONAL_FIELDS = frozenset(("porch", "floor", "apartment", "comment"))
+
+
+def _opt(text: str | None) -> str | None:
+    """Значение необязательного поля склада: прочерк `-` означает «нет»."""
+    value = (text or "").strip()
+    return None if value == '-' else value
+
+
+def _parse_warehouse_block(text: str | None) -> dict | str:
+    """
+    Разбирает склад из восьми строк (порядок — как в пошаговом вводе).
+    Возвращает поля для create_default_warehouse (без координат) или текст ошибки.
+    """
+    lines = [line.strip() for line in (text or "").splitlines() if line.strip()]
+    if len(lines) != len(_WAREHOUSE_BULK_FIELDS):
+        return f"Нужно ровно {len(_WAREHOUSE_BULK_FIELDS)} строк — по одной на каждое поле."
+    fields = dict(zip(_WAREHOUSE_BULK_FIELDS, lines))
+    for key, value in fields.items():
+        if value == '-':
+            if key not in _WAREHOUSE_OPTIONAL_FIELDS:
+                return "Название, адрес, контактное лицо и телефон обязательны."
+            fields[key] = None
+    fields["contact_phone"] = normalize_phone(fields["contact_phone"])
+    if fields["contact_phone"] is None:
+        return "Телефон выглядит некорректно (пример: +77771234567)."
+    return fields
+
+
+@admin_router.message(WarehouseCreate.bulk)
+@admin_only
+async def process_create_warehouse_bulk(msg: Message, state: FSMContext, bot: Bot):
+    fields = _parse_warehouse_block(msg.text)
+    if isinstance(fields, str):
+        await msg.answer(fields)
+        return
+
+    # Флаг bulk: после подтверждения точки склад сохраняется сразу, без шагов 3–8
+    await state.update_data(bulk=True, **fields)
+    await msg.answer("⏳ Ищу адрес на карте...")
+    coords = await geocode_address(fields["address"])
+    if not coords:
+        # Остальные поля уже сохранены — дальше обычный шаг ввода адреса
+        await state.set_state(WarehouseCreate.waiting_for_address)
+        await msg.answer("Не удалось найти такой адрес. Введите его подробнее (город, улица, дом):")
+        return
+
+    lon, lat = coords
+    await state.update_data(latitude=lat, longitude=lon)
+    await state.set_state(WarehouseCreate.confirm_geoposition)
+    await bot.send_location(chat_id=msg.chat.id, latitude=lat, longitude=lon)
+    await msg.answer("Я нашел склад здесь. Местоположение верное?", reply_markup=confirm_geoposition_kb())
+
+
+async def _save_created_warehouse(
+        msg: Message, state: FSMContext, warehouse_manager: WarehouseManager, data: dict
+) -> None:
+    """`data` — итоговые данные FSM (update_data уже возвращает их, повторный get_data не нужен)."""
+    await state.clear()
+
+    # Вызываем обновленный метод, который сохранит все поля
+    warehouse = await warehouse_manager.create_default_warehouse(data)
+
+    # Итог и обновлённая карточка — одним сообщением
+    await _render_warehouse_card(
+        msg, warehouse_manager, warehouse, notice="✅ Склад по умолчанию успешно создан и сохранен!"
+    )
 
 
 @admin_router.message(WarehouseCreate.waiting_for_name)
@@ -1382,9 +1649,9 @@ async def process_create_warehouse_name(msg: Message, state: FSMContext):
     await state.update_data(name=msg.text.strip())
     await state.set_state(WarehouseCreate.waiting_for_address)
     await msg.answer(
-        "*Шаг 2/8:* Теперь введите *адрес* склада (город, улица, дом) через запятую.\n"
-        "Например: *Нижний Новгород, Большая Покровская, 1*",
-        parse_mode="Markdown")
+        "<b>Шаг 2/8:</b> Теперь введите <b>адрес</b> склада (город, улица, дом) через запятую.\n"
+        "Например: <b>Нижний Новгород, Большая Покровская, 1</b>",
+        parse_mode="HTML")
 
 
 @admin_router.message(WarehouseCreate.waiting_for_address, F.text)
@@ -1409,75 +1676,88 @@ async def process_create_warehouse_text_address(msg: Message, state: FSMContext,
 
 @admin_router.message(WarehouseCreate.confirm_geoposition, F.location)
 @admin_only
-async def process_create_warehouse_manual_location(msg: Message, state: FSMContext):
+async def process_create_warehouse_manual_location(
+        msg: Message, state: FSMContext, warehouse_manager: WarehouseManager
+):
     """Ловит геолокацию, отправленную вручную."""
-    await state.update_data(
+    data = await state.update_data(
         latitude=msg.location.latitude,
         longitude=msg.location.longitude,
     )
-    await state.set_state(WarehouseCreate.waiting_for_porch)
+    if data.get("bulk"):
+        await _save_created_warehouse(msg, state, warehouse_manager, data)
+        return
     await state.set_state(WarehouseCreate.waiting_for_porch)
     await msg.answer(
-        "*Шаг 3/8:* Точка принята! Теперь введите *подъезд* (или отправьте прочерк `-`, если его нет):",
-        parse_mode="Markdown")
+        "<b>Шаг 3/8:</b> Точка принята! Теперь введите <b>подъезд</b> "
+        "(или отправьте прочерк <code>-</code>, если его нет):",
+        parse_mode="HTML")
 
 
-@admin_router.callback_query(WarehouseCreate.confirm_geoposition, F.data.startswith("geo:"))
+@admin_router.callback_query(WarehouseCreate.confirm_geoposition, CbData("geo", ("action", str)))
 @admin_only
-async def process_create_warehouse_geoposition_confirm(call: CallbackQuery, state: FSMContext):
+async def process_create_warehouse_geoposition_confirm(
+        call: CallbackQuery, cb, state: FSMContext, warehouse_manager: WarehouseManager
+):
     """Обрабатывает подтверждение геоточки."""
     await call.answer()
-    action = call.data.split(":")[1]
+    action = cb.action
 
     with suppress(TelegramBadRequest):
-        await call.message.delete()
-        await call.bot.delete_message(chat_id=call.message.chat.id, message_id=call.message.message_id - 1)
+        # Карта и вопрос под ней удаляются одним запросом deleteMessages
+        await call.bot.delete_messages(call.message.chat.id, [call.message.message_id - 1, call.message.message_id])
 
     if action == "confirm":
+        data = await state.get_data()
+        if data.get("bulk"):
+            await _save_created_warehouse(call.message, state, warehouse_manager, data)
+            return
         await state.set_state(WarehouseCreate.waiting_for_porch)
         await call.message.answer(
-            "*Шаг 3/8:* Отлично! Теперь введите *подъезд* (или отправьте прочерк `-`, если его нет):",
-            parse_mode="Markdown")
+            "<b>Шаг 3/8:</b> Отлично! Теперь введите <b>подъезд</b> "
+            "(или отправьте прочерк <code>-</code>, если его нет):",
+            parse_mode="HTML")
         return
 
 
-@admin_router.message(WarehouseCreate.waiting_for_porch)
-@admin_only
-async def process_create_warehouse_porch(msg: Message, state: FSMContext):
-    await state.update_data(porch=msg.text.strip() if msg.text.strip() != '-' else None)
-    await state.set_state(WarehouseCreate.waiting_for_floor)
-    await msg.answer("*Шаг 4/8*: Принято. Введите *этаж* (или `-`):", parse_mode="Markdown")
+def _required(text: str | None) -> str:
+    return (text or "").strip()
 
 
-@admin_router.message(WarehouseCreate.waiting_for_floor)
-@admin_only
-async def process_create_warehouse_floor(msg: Message, state: FSMContext):
-    await state.update_data(floor=msg.text.strip() if msg.text.strip() != '-' else None)
-    await state.set_state(WarehouseCreate.waiting_for_apartment)
-    await msg.answer("*Шаг 5/8*: Принято. Введите *номер квартиры/офиса* (или `-`):", parse_mode="Markdown")
+# Текстовые шаги создания склада: состояние -> (поле, разбор ввода, следующее состояние, приглашение)
+_WAREHOUSE_CREATE_STEPS: dict[str, tuple[str, Callable[[str | None], str | None], State, str]] = {
+    WarehouseCreate.waiting_for_porch.state: (
+        "porch", _opt, WarehouseCreate.waiting_for_floor,
+        "<b>Шаг 4/8:</b> Принято. Введите <b>этаж</b> (или <code>-</code>):",
+    ),
+    WarehouseCreate.waiting_for_floor.state: (
+        "floor", _opt, WarehouseCreate.waiting_for_apartment,
+        "<b>Шаг 5/8:</b> Принято. Введите <b>номер квартиры/офиса</b> (или <code>-</code>):",
+    ),
+    WarehouseCreate.waiting_for_apartment.state: (
+        "apartment", _opt, WarehouseCreate.waiting_for_contact_name,
+        "<b>Шаг 6/8:</b> Адрес полностью собран! Теперь введите <b>имя контактного лица</b>:",
+    ),
+    WarehouseCreate.waiting_for_contact_name.state: (
+        "contact_name", _required, WarehouseCreate.waiting_for_contact_phone,
+        "<b>Шаг 7/8:</b> Введите <b>контактный телефон</b> склада:",
+    ),
+}
 
 
-@admin_router.message(WarehouseCreate.waiting_for_apartment)
+@admin_router.message(StateFilter(*_WAREHOUSE_CREATE_STEPS))
 @admin_only
-async def process_create_warehouse_apartment(msg: Message, state: FSMContext):
-    await state.update_data(apartment=msg.text.strip() if msg.text.strip() != '-' else None)
-    await state.set_state(WarehouseCreate.waiting_for_contact_name)
-    await msg.answer("*Шаг 6/8:* Адрес полностью собран! Теперь введите *имя контактного лица*:",
-                     parse_mode="Markdown")
-
-
-@admin_router.message(WarehouseCreate.waiting_for_contact_name)
-@admin_only
-async def process_create_warehouse_contact_name(msg: Message, state: FSMContext):
-    await state.update_data(contact_name=msg.text.strip())
-    await state.set_state(WarehouseCreate.waiting_for_contact_phone)
-    await msg.answer("*Шаг 7/8:* Введите *контактный телефон* склада:", parse_mode="Markdown")
+async def process_create_warehouse_step(msg: Message, state: FSMContext, raw_state: str):
+    field, parse, next_state, prompt = _WAREHOUSE_CREATE_STEPS[raw_state]
+    await state.update_data({field: parse(msg.text)})
+    await state.set_state(next_state)
+    await msg.answer(prompt, parse_mode="HTML")
 
 
 @admin_router.message(WarehouseCreate.waiting_for_contact_phone)
 @admin_only
 async def process_create_warehouse_contact_phone(msg: Message, state: FSMContext):
-    phone_e164 = normalize_phone(msg.text.strip())
+    phone_e164 = normalize_phone((msg.text or "").strip())
 
     if phone_e164 is None:
         await msg.answer(
@@ -1486,53 +1766,73 @@ async def process_create_warehouse_contact_phone(msg: Message, state: FSMContext
         )
         return
 
-    await state.update_data(contact_phone=msg.text.strip())
+    await state.update_data(contact_phone=phone_e164)
     await state.set_state(WarehouseCreate.waiting_for_comment)
-    await msg.answer("*Шаг 8/8:* Введите *комментарий* для курьера о складе (или `-`):", parse_mode="Markdown")
+    await msg.answer(
+        "<b>Шаг 8/8:</b> Введите <b>комментарий</b> для курьера о складе (или <code>-</code>):", parse_mode="HTML"
+    )
 
 
 @admin_router.message(WarehouseCreate.waiting_for_comment)
 @admin_only
 async def process_create_warehouse_comment_and_save(msg: Message, state: FSMContext,
                                                     warehouse_manager: WarehouseManager):
-    comment = msg.text.strip() if msg.text.strip() != '-' else None
+    comment = _opt(msg.text)
 
-    await state.update_data(comment=comment)
-    data = await state.get_data()
-    await state.clear()
+    data = await state.update_data(comment=comment)
+    await _save_created_warehouse(msg, state, warehouse_manager, data)
 
-    # Вызываем обновленный метод, который сохранит все поля
-    new_warehouse_id = await warehouse_manager.create_default_warehouse(data)
 
-    await msg.answer("✅ Склад по умолчанию успешно создан и сохранен!")
+# Имена администраторов из bot.get_chat: admin_id -> (истекает в, full_name, username) или None, если чат недоступен
+_ADMIN_CHAT_TTL = 300.0
+_admin_chats: dict[int, tuple[float, tuple[str, str | None] | None]] = {}
+
 
-    # Показываем результат
-    new_warehouse_data = await warehouse_manager.get_default_warehouse()
-    text = format_warehouse_info(new_warehouse_data)  # <-- Нужно будет обновить и эту функцию
-    kb = admin_warehouse_detail_kb(new_warehouse_id)  # <-- И эту клавиатуру
-    await msg.answer(text, parse_mode="Markdown", reply_markup=kb)
+def _is_admin_chat_fresh(admin_id: int, now: float) -> bool:
+    hit = _admin_chats.get(admin_id)
+    return hit is not None and hit[0] > now
+
+
+async def _fetch_admin_chat(bot: Bot, admin_id: int) -> tuple[str, str | None] | None:
+    now = time.monotonic()
+    if _is_admin_chat_fresh(admin_id, now):
+        return _admin_chats[admin_id][1]
+    try:
+        chat = await bot.get_chat(admin_id)
+        info = (chat.full_name, chat.username)
+    except TelegramBadRequest:
+        # Например, пользователь удалил аккаунт
+        info = None
+    _admin_chats[admin_id] = (now + _ADMIN_CHAT_TTL, info)
+    return info
 
 
 async def get_admin_list_text_and_data(bot: Bot) -> tuple[str, list[dict]]:
     """Вспомогательная функция для получения списка админов и текста для сообщения."""
     admin_ids = get_admin_ids()
     admin_data = []
-    text_lines = ["*Текущие администраторы:*"]
+    text_lines = ["<b>Текущие администраторы:</b>"]
 
     if not admin_ids:
-        text_lines.append("\n_Список пуст._")
+        text_lines.append("\n<i>Список пуст.</i>")
     else:
+        # В сеть идём только за устаревшими/новыми записями (после добавления или удаления
+        # админа это ровно одна запись или ни одной), остальные берутся из _admin_chats
+        now = time.monotonic()
+        missing = [admin_id for admin_id in admin_ids if not _is_admin_chat_fresh(admin_id, now)]
+        if missing:
+            await asyncio.gather(*(_fetch_admin_chat(bot, admin_id) for admin_id in missing))
         for admin_id in admin_ids:
-            try:
-                # Пытаемся получить информацию о пользователе, чтобы показать имя
-                chat = await bot.get_chat(admin_id)
-                full_name = chat.full_name
-                username = f"(@{chat.username})" if chat.username else ""
-                text_lines.append(f"• {full_name} {username} - `ID: {admin_id}`")
+            info = _admin_chats[admin_id][1]
+            if info is not None:
+                full_name, username = info
+                # Имя и username приходят из Telegram как есть (подчёркивания, < и т.п.) — экранируем
+                username = f"(@{html.escape(username)})" if username else ""
+                text_lines.append(f"• {html.escape(full_name)} {username} - <code>ID: {admin_id}</code>")
                 admin_data.append({"id": admin_id, "full_name": full_name})
-            except TelegramBadRequest:
-                # Если не удалось получить инфо (например, юзер удалил аккаунт), показываем только ID
-                text_lines.append(f"• Пользователь с `ID: {admin_id}` (недоступен)")
+            else:
+                # Если не удалось получить инфо, показываем только ID
+                text_lines.append(f"• Пользователь с <code>ID: {admin_id}</code> (недоступен)")
                 admin_data.append({"id": admin_id, "full_name": f"ID {admin_id}"})
 
     text_lines.append("\nВы можете добавить нового администратора по его Telegram User ID или удалить существующего.")
@@ -1546,10 +1846,10 @@ async def show_admin_management_menu(call: CallbackQuery, bot: Bot):
     text, admin_data = await get_admin_list_text_and_data(bot)
     await call.message.edit_text(
         text,
-        parse_mode="Markdown",
+        parse_mode="HTML",
         reply_markup=admin_manage_admins_kb(admin_data)
     )
-    await call.answer()
+    _answer_later(call)
 
 
 @admin_router.callback_query(F.data == "admin:manage:add")
@@ -1558,12 +1858,13 @@ async def start_add_admin(call: CallbackQuery, state: FSMContext):
     """Начинает процесс добавления нового администратора."""
     await state.set_state(AdminManagement.waiting_for_user_id)
     await call.message.edit_text(
-        "Пришлите **Telegram User ID** нового администратора.\n\n"
-        "_Чтобы узнать ID пользователя, попросите его переслать вам сообщение от бота @userinfobot. Бот скажет id_",
-        parse_mode="Markdown",
+        "Пришлите <b>Telegram User ID</b> нового администратора.\n\n"
+        "<i>Чтобы узнать ID пользователя, попросите его переслать вам сообщение от бота @userinfobot. "
+        "Бот скажет id</i>",
+        parse_mode="HTML",
         reply_markup=admin_manage_add_back_kb()  # <-- ДОБАВЛЕНО
     )
-    await call.answer()
+    _answer_later(call)
 
 
 @admin_router.message(AdminManagement.waiting_for_user_id)
@@ -1577,9 +1878,11 @@ async def process_add_admin_id(msg: Message, state: FSMContext, bot: Bot):
         return
 
     if add_admin_id(new_admin_id):
-        await msg.answer(f"✅ Администратор с ID `{new_admin_id}` успешно добавлен.")
+        # Новый админ — единственная запись, за которой нужно сходить в Telegram
+        _admin_chats.pop(new_admin_id, None)
+        await msg.answer(f"✅ Администратор с ID <code>{new_admin_id}</code> успешно добавлен.", parse_mode="HTML")
     else:
-        await msg.answer(f"⚠️ Администратор с ID `{new_admin_id}` уже был в списке.")
+        await msg.answer(f"⚠️ Администратор с ID <code>{new_admin_id}</code> уже был в списке.", parse_mode="HTML")
 
     await state.clear()
 
@@ -1587,20 +1890,16 @@ async def process_add_admin_id(msg: Message, state: FSMContext, bot: Bot):
     text, admin_data = await get_admin_list_text_and_data(bot)
     await msg.answer(
         text,
-        parse_mode="Markdown",
+        parse_mode="HTML",
         reply_markup=admin_manage_admins_kb(admin_data)
     )
 
 
-@admin_router.callback_query(F.data.startswith("admin:manage:delete:"))
+@admin_router.callback_query(CbData("admin:manage:delete", ("user_id", int)))
 @admin_only
-async def confirm_delete_admin(call: CallbackQuery):
+async def confirm_delete_admin(call: CallbackQuery, cb):
     """Запрашивает подтверждение на удаление администратора."""
-    try:
-        user_id_to_delete = int(call.data.split(":")[-1])
-    except (ValueError, IndexError):
-        await call.answer("Ошибка в данных.", show_alert=True)
-        return
+    user_id_to_delete = cb.user_id
 
     # Защита от случайного удаления самого себя
     if call.from_user.id == user_id_to_delete:
@@ -1608,24 +1907,22 @@ async def confirm_delete_admin(call: CallbackQuery):
         return
 
     await call.message.edit_text(
-        f"Вы уверены, что хотите удалить администратора с ID `{user_id_to_delete}` из списка?",
-        parse_mode="Markdown",
+        f"Вы уверены, что хотите удалить администратора с ID <code>{user_id_to_delete}</code> из списка?",
+        parse_mode="HTML",
         reply_markup=admin_confirm_delete_admin_kb(user_id_to_delete)
     )
-    await call.answer()
+    _answer_later(call)
 
 
-@admin_router.callback_query(F.data.startswith("admin:manage:delete_confirm:"))
+@admin_router.callback_query(CbData("admin:manage:delete_confirm", ("user_id", int)))
 @admin_only
-async def process_delete_admin(call: CallbackQuery, bot: Bot):
+async def process_delete_admin(call: CallbackQuery, cb, bot: Bot):
     """Обрабатывает подтверждение и удаляет администратора."""
-    try:
-        user_id_to_delete = int(call.data.split(":")[-1])
-    except (ValueError, IndexError):
-        await call.answer("Ошибка в данных.", show_alert=True)
-        return
+    user_id_to_delete = cb.user_id
 
     if remove_admin_id(user_id_to_delete):
+        # Остальные записи кэша остаются валидными, перерисовка списка обойдётся без get_chat
+        _admin_chats.pop(user_id_to_delete, None)
         await call.answer(f"Администратор с ID {user_id_to_delete} удален.", show_alert=True)
     else:
         await call.answer("Этого администратора уже нет в списке.", show_alert=True)
@@ -1634,7 +1931,7 @@ async def process_delete_admin(call: CallbackQuery, bot: Bot):
     text, admin_data = await get_admin_list_text_and_data(bot)
     await call.message.edit_text(
         text,
-        parse_mode="Markdown",
+        parse_mode="HTML",
         reply_markup=admin_manage_admins_kb(admin_data)
     )
 
@@ -1663,23 +1960,23 @@ async def process_new_warehouse_address_text(msg: Message, state: FSMContext, bo
     )
 
 
-@admin_router.callback_query(WarehouseEdit.confirm_new_address_location, F.data.startswith("geo:"))
+@admin_router.callback_query(WarehouseEdit.confirm_new_address_location, CbData("geo", ("action", str)))
 @admin_only
 async def process_new_warehouse_geoposition_confirm(
-        call: CallbackQuery, state: FSMContext, warehouse_manager: WarehouseManager
+        call: CallbackQuery, cb, state: FSMContext, warehouse_manager: WarehouseManager
 ):
     """Обрабатывает подтверждение геоточки."""
     await call.answer()
-    action = call.data.split(":")[1]
+    action = cb.action
 
     # Удаляем сообщения с картой и вопросом
     with suppress(TelegramBadRequest):
-        await call.message.delete()
-        await call.bot.delete_message(chat_id=call.message.chat.id, message_id=call.message.message_id - 1)
+        # Карта и вопрос под ней удаляются одним запросом deleteMessages
+        await call.bot.delete_messages(call.message.chat.id, [call.message.message_id - 1, call.message.message_id])
 
     if action == "confirm":
         data = await state.get_data()
-        await warehouse_manager.update_address_and_location(
+        warehouse = await warehouse_manager.update_address_and_location(
             warehouse_id=data['warehouse_id'],
             address=data['new_address'],
             latitude=data['new_latitude'],
@@ -1687,10 +1984,8 @@ async def process_new_warehouse_geoposition_confirm(
         )
         await state.clear()
 
-        await call.message.answer("✅ Адрес и координаты склада успешно обновлены!")
-        # Показываем админу обновленную информацию
-        default_warehouse = await warehouse_manager.get_default_warehouse()
-        text = format_warehouse_info(default_warehouse)
-        kb = admin_warehouse_detail_kb(default_warehouse['id'])
-        await call.message.answer(text, parse_mode="Markdown", reply_markup=kb)
+        # Итог и обновлённая карточка — одним сообщением
+        await _render_warehouse_card(
+            call.message, warehouse_manager, warehouse, notice="✅ Адрес и координаты склада успешно обновлены!"
+        )
         return
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import suppress
 from math import ceil
 from pathlib import Path
 
@@ -26,12 +28,13 @@ from keyboards.client import (
     confirm_geoposition_kb
 )
 
+from utils.callback_data import CbData
 from utils.constants import status_map, delivery_map
 from utils.logger import get_logger
 from utils.notifications import notify_admins
 from utils.phone import normalize_phone
 from utils.save_image import MEDIA_PUBLIC_ROOT, MEDIA_DIR
-from utils.secrets import get_admin_ids
+from utils.secrets import is_admin_id
 
 MIN_PAYMENT_AMOUNT = 60
 
@@ -40,31 +43,6 @@ log = get_logger("[Bot.Client]")
 client_router = Router()
 
 
-# --- ВРЕМЕННЫЙ ОТЛАДОЧНЫЙ MIDDLEWARE ---
-@client_router.callback_query.outer_middleware()
-async def spy_middleware(handler, event: CallbackQuery, data: dict):
-    state: FSMContext = data.get("state")
-    if state:
-        current_state = await state.get_state()
-        print("🕵️‍ SPY: Перед обработкой CallbackQuery")
-        print(f"   - Данные callback: {event.data}")
-        print(f"   - Текущее состояние FSM: {current_state}")
-
-    # Запускаем основной хендлер
-    result = await handler(event, data)
-
-    if state:
-        new_state = await state.get_state()
-        print("🕵️‍ SPY: После обработки CallbackQuery")
-        print(f"   - Новое состояние FSM: {new_state}")
-        print("-" * 30)
-
-    return result
-
-
-# ------------------------------
-
-
 async def handle_telegram_error(
         e: TelegramBadRequest,
         message: Message = None,
@@ -87,7 +65,7 @@ async def handle_telegram_error(
             log.debug("[Bot.Client] FSM состояние очищено из-за ошибки Telegram")
 
         user = call.from_user if call else message.from_user if message else None
-        is_admin = user and user.id in get_admin_ids()
+        is_admin = user and is_admin_id(user.id)
 
         target = call.message if call else message if message else None
         if target:
@@ -95,10 +73,10 @@ async def handle_telegram_error(
                 text="Не удалось изменить предыдущее сообщение. Выберите действие:",
                 reply_markup=get_main_inline_keyboard(is_admin)
             )
-            log.info(f"[Bot.Client] Ошибка Telegram обработана для пользователя {user.id if user else 'unknown'}")
+            log.info("[Bot.Client] Ошибка Telegram обработана для пользователя %s", user.id if user else 'unknown')
         return True
 
-    log.warning(f"[Bot.Client] [UNHANDLED TelegramBadRequest] {e}")
+    log.warning("[Bot.Client] [UNHANDLED TelegramBadRequest] %s", e)
     return False
 
 
@@ -127,10 +105,10 @@ class CreateOrder(StatesGroup):
 @client_router.message(CommandStart())
 async def client_start(message: Message, state: FSMContext, user_info_manager: UserInfoManager,
                        buyer_info_manager: BuyerInfoManager):
-    log.info(f"[Bot.Client] Новый старт пользователя {message.from_user.id}")
+    log.info("[Bot.Client] Новый старт пользователя %s", message.from_user.id)
     user_id = await user_info_manager.add_user(message.from_user.id)
 
-    is_admin = message.from_user.id in get_admin_ids()
+    is_admin = is_admin_id(message.from_user.id)
     if not is_admin:
         is_registered = await buyer_info_manager.is_registered(user_id)
         if is_registered:
@@ -161,7 +139,7 @@ async def client_start(message: Message, state: FSMContext, user_info_manager: U
 async def reg_get_fullname(message: Message, state: FSMContext) -> None:
     full_name: str = message.text.strip()
 
-    log.info(f"[Bot.Client] Пользователь {message.from_user.id} вводит имя {full_name}")
+    log.info("[Bot.Client] Пользователь %s вводит имя %s", message.from_user.id, full_name)
 
     if len(full_name.split()) < 2:
         await message.answer("Пожалуйста, укажите *имя и фамилию* через пробел")
@@ -183,7 +161,7 @@ async def reg_get_phone(
 ) -> None:
     phone_e164 = normalize_phone(message.text)
 
-    log.info(f"[Bot.Client] Пользователь {message.from_user.id} вводит имя {phone_e164}")
+    log.info("[Bot.Client] Пользователь %s вводит имя %s", message.from_user.id, phone_e164)
 
     if phone_e164 is None:
         await message.answer(
@@ -207,7 +185,7 @@ async def reg_get_phone(
         "Спасибо, регистрация завершена! 🙌\nВыбери дальнейшее действие:",
         reply_markup=get_main_inline_keyboard(is_admin=False),
     )
-    log.info(f"[Bot.Client] Пользователь {message.from_user.id} успешно зарегистрировался!")
+    log.info("[Bot.Client] Пользователь %s успешно зарегистрировался!", message.from_user.id)
     await state.clear()
 
 
@@ -215,10 +193,10 @@ async def reg_get_phone(
 async def cb_my_orders(call: CallbackQuery, buyer_order_manager) -> None:
     await call.answer()
     tg_user_id = call.from_user.id
-    log.info(f"[Bot.Client] Пользователь {tg_user_id} просматривает свои заказы")
+    log.info("[Bot.Client] Пользователь %s просматривает свои заказы", tg_user_id)
 
-    active_cnt = await buyer_order_manager.count_active_orders_by_tg(tg_user_id)
-    total_cnt = await buyer_order_manager.count_total_orders_by_tg(tg_user_id)
+    # Оба счётчика — одним агрегатным запросом
+    active_cnt, total_cnt = await buyer_order_manager.counts_by_tg(tg_user_id)
 
     await call.message.edit_text(
         f"Кол-во ожидаемых заказов: `{active_cnt}` \nОбщее кол-во заказов: `{total_cnt}`",
@@ -231,7 +209,7 @@ async def cb_my_orders(call: CallbackQuery, buyer_order_manager) -> None:
 async def cb_back_main(call: CallbackQuery, state: FSMContext, buyer_info_manager):
     await call.answer()
     await cleanup_client_media(call.bot, state, call.message.chat.id)
-    is_admin = call.from_user.id in get_admin_ids()
+    is_admin = is_admin_id(call.from_user.id)
     bonuses = await buyer_info_manager.get_user_bonuses_by_tg(call.from_user.id)
     try:
         await call.message.edit_text(
@@ -242,7 +220,7 @@ async def cb_back_main(call: CallbackQuery, state: FSMContext, buyer_info_manage
         )
         await state.clear()
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
@@ -261,7 +239,7 @@ async def show_active_list(call: CallbackQuery, buyer_order_manager):
             reply_markup=get_orders_list_kb(orders, finished=False, page=1)
         )
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
@@ -280,19 +258,15 @@ async def show_finished_list(call: CallbackQuery, buyer_order_manager):
             reply_markup=get_orders_list_kb(orders, finished=True, page=1)
         )
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
 
-@client_router.callback_query(F.data.startswith("orders:page:"))
-async def on_orders_page(call: CallbackQuery, buyer_order_manager):
-    _, _, suffix, page_str = call.data.split(":")
-    finished = (suffix == "fin")
-    try:
-        page = int(page_str)
-    except ValueError:
-        page = 1
+@client_router.callback_query(CbData("orders:page", ("suffix", str), ("page", int)))
+async def on_orders_page(call: CallbackQuery, cb, buyer_order_manager):
+    finished = (cb.suffix == "fin")
+    page = cb.page
 
     tg = call.from_user.id
     orders = await buyer_order_manager.list_orders(tg_user_id=tg, finished=finished)
@@ -302,26 +276,31 @@ async def on_orders_page(call: CallbackQuery, buyer_order_manager):
         await call.message.edit_reply_markup(reply_markup=kb)
         await call.answer()
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении клавиатуры: {e}")
+        log.error("[Bot.Client] Ошибка при изменении клавиатуры: %s", e)
         await handle_telegram_error(e, call=call)
 
 
-@client_router.callback_query(F.data.startswith("order:"), StateFilter(None))
-async def order_detail(call: CallbackQuery, buyer_order_manager, *, delivery_status_text: str | None = None):
+@client_router.callback_query(CbData("order", ("oid", int), ("kind", str)), StateFilter(None))
+async def order_detail(call: CallbackQuery, cb, buyer_order_manager):
+    await call.answer()
+    await render_order_detail(call, buyer_order_manager, cb.oid)
+
+
+async def render_order_detail(call: CallbackQuery, buyer_order_manager, order_id: int,
+                              delivery_status_text: str | None = None):
     """
     Показывает детали заказа. Может принимать дополнительный текст о статусе доставки.
     """
-    await call.answer()
-    _, oid, kind = call.data.split(":")
-    order = await buyer_order_manager.get_order(call.from_user.id, int(oid))
+    # Заказ и позиции — один запрос к БД
+    order, items = await buyer_order_manager.get_order_with_items(call.from_user.id, order_id)
     if not order:
         await call.answer("Заказ не найден", show_alert=True)
         return
 
-    items = await buyer_order_manager.list_items_by_order_id(order.id)
     items_text = "\n".join([f"• {it.title} ×{it.qty} — {it.price * it.qty} ₽" for it in items]) if items else "пусто"
 
-    total = await buyer_order_manager.order_total_sum_by_order_id(order.id)
+    # Сумма считается по уже загруженным позициям — отдельный SUM-запрос не нужен
+    total = sum(it.price * it.qty for it in items)
     status_txt = status_map.get(order.status.value, order.status.value)
     delivery_txt = delivery_map.get(order.delivery_way.value, order.delivery_way.value)
 
@@ -352,19 +331,18 @@ async def order_detail(call: CallbackQuery, buyer_order_manager, *, delivery_sta
         )
     except TelegramBadRequest as e:
         if "message is not modified" not in str(e):
-            log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+            log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
             await handle_telegram_error(e, call=call)
 
 
-@client_router.callback_query(F.data.startswith("cancel-no:"))
-async def cancel_no(call: CallbackQuery, buyer_order_manager):
-    _, order_id, suffix = call.data.split(":")
-    order = await buyer_order_manager.get_order(call.from_user.id, int(order_id))
+@client_router.callback_query(CbData("cancel-no", ("order_id", int), ("suffix", str)))
+async def cancel_no(call: CallbackQuery, cb, buyer_order_manager):
+    order_id, suffix = cb
+    order, items = await buyer_order_manager.get_order_with_items(call.from_user.id, order_id)
     if not order:
         await call.answer("Заказ уже не найден", show_alert=True)
         return
 
-    items = await buyer_order_manager.list_items_by_order_id(order.id)
     if items:
         lines = [
             f"• {it.title} ×{it.qty} — `{it.price * it.qty}`₽"
@@ -374,11 +352,14 @@ async def cancel_no(call: CallbackQuery, buyer_order_manager):
     else:
         items_text = "_пусто_"
 
-    total = await buyer_order_manager.order_total_sum_by_order_id(order.id)
+    total = sum(it.price * it.qty for it in items)
 
     status_txt = status_map.get(order.status.value, order.status.value)
     delivery_txt = delivery_map[order.delivery_way.value]
 
+    delivery_date_txt = (
+        f"\n*Плановая дата получения:* {order.delivery_date:%d.%m.%Y}" if order.delivery_date else ""
+    )
     text = (
         f"*Заказ №{order.id}*\n\n"
         f"*Товары:*\n{items_text}\n\n"
@@ -386,9 +367,8 @@ async def cancel_no(call: CallbackQuery, buyer_order_manager):
         f"*Способ получения:* {delivery_txt}\n"
         f"*Статус:* {status_txt}\n"
         f"*Дата оформления:* {order.registration_date:%d.%m.%Y}"
+        f"{delivery_date_txt}"
     )
-    if order.delivery_date:
-        text += f"\n*Плановая дата получения:* {order.delivery_date:%d.%m.%Y}"
 
     try:
         await call.message.edit_text(
@@ -397,56 +377,57 @@ async def cancel_no(call: CallbackQuery, buyer_order_manager):
             reply_markup=get_order_detail_kb(order),
         )
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
 
-@client_router.callback_query(F.data.startswith("order-cancel:"))
-async def order_cancel_init(call: CallbackQuery):
-    _, order_id, suffix = call.data.split(":")
+@client_router.callback_query(CbData("order-cancel", ("order_id", int), ("suffix", str)))
+async def order_cancel_init(call: CallbackQuery, cb):
+    order_id, suffix = cb
     await call.answer()
     try:
         await call.message.edit_text(
             "Вы уверены, что хотите отменить заказ?",
-            reply_markup=get_cancel_confirm_kb(int(order_id), suffix),
+            reply_markup=get_cancel_confirm_kb(order_id, suffix),
         )
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
 
-@client_router.callback_query(F.data.startswith("cancel-yes:"))
+@client_router.callback_query(CbData("cancel-yes", ("order_id", int), ("suffix", str)))
 async def order_cancel_yes(
         call: CallbackQuery,
+        cb,
         bot: Bot,
         buyer_order_manager: BuyerOrderManager,
         yandex_delivery_client: YandexDeliveryClient,
         buyer_info_manager: BuyerInfoManager,
 ):
-    order_id = int(call.data.split(":")[1])
-    log.info(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Процесс запущен пользователем {call.from_user.id}")
+    order_id = cb.order_id
+    log.info("[ОТМЕНА ЗАКАЗА #%s] - Процесс запущен пользователем %s", order_id, call.from_user.id)
 
     order = await buyer_order_manager.get_order_by_id(order_id)
     if not order:
-        log.warning(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Заказ не найден в БД.")
+        log.warning("[ОТМЕНА ЗАКАЗА #%s] - Заказ не найден в БД.", order_id)
         await call.answer("Заказ не найден.", show_alert=True)
         return
 
     if order.yandex_claim_id:
         await call.answer("Проверяем условия отмены в Яндексе...")
-        log.info(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Найден claim_id: {order.yandex_claim_id}. Проверяем условия.")
+        log.info("[ОТМЕНА ЗАКАЗА #%s] - Найден claim_id: %s. Проверяем условия.", order_id, order.yandex_claim_id)
 
         # 1. Запрашиваем информацию для получения ВЕРСИИ
-        claim_info = await yandex_delivery_client.get_claim_info(order.yandex_claim_id)
+        claim_info = await yandex_delivery_client.fetch_claim_info(order.yandex_claim_id)
         if not claim_info:
-            log.error(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Не удалось получить информацию о заявке от Яндекса.")
+            log.error("[ОТМЕНА ЗАКАЗА #%s] - Не удалось получить информацию о заявке от Яндекса.", order_id)
             await call.answer("Не удалось получить информацию о заявке в Яндексе.", show_alert=True)
             return
 
         current_version = claim_info.get("version", 1)
-        log.info(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Текущая версия заявки: {current_version}")
+        log.info("[ОТМЕНА ЗАКАЗА #%s] - Текущая версия заявки: %s", order_id, current_version)
 
         # 2. Узнаем условия отмены
         cancel_info = await yandex_delivery_client.get_cancellation_info(order.yandex_claim_id)
@@ -459,8 +440,8 @@ async def order_cancel_yes(
 
             cancel_state = cancel_info.get("cancel_state") if cancel_info else "неизвестно"
             log.warning(
-                f"[ОТМЕНА ЗАКАЗА #{order_id}] - Отмена не является бесплатной. "
-                f"Статус отмены: {cancel_state}. Процесс прерван.")
+                "[ОТМЕНА ЗАКАЗА #%s] - Отмена не является бесплатной. Статус отмены: %s. Процесс прерван.",
+                order_id, cancel_state)
 
             # Редактируем сообщение, чтобы показать причину
             await call.message.edit_text(
@@ -475,22 +456,22 @@ async def order_cancel_yes(
             return
 
         # 3. Отменяем заявку в Яндексе
-        log.info(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Отмена бесплатна. Отправляем запрос на отмену...")
+        log.info("[ОТМЕНА ЗАКАЗА #%s] - Отмена бесплатна. Отправляем запрос на отмену...", order_id)
         is_cancelled_on_yandex = await yandex_delivery_client.cancel_claim(
             claim_id=order.yandex_claim_id,
             cancel_state="free",
             version=current_version
         )
         if not is_cancelled_on_yandex:
-            log.error(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Яндекс вернул ошибку при отмене.")
+            log.error("[ОТМЕНА ЗАКАЗА #%s] - Яндекс вернул ошибку при отмене.", order_id)
             await call.answer("Не удалось отменить заказ в системе доставки. Свяжитесь с поддержкой.", show_alert=True)
             return
 
-        log.info(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Заявка в Яндексе успешно отменена.")
+        log.info("[ОТМЕНА ЗАКАЗА #%s] - Заявка в Яндексе успешно отменена.", order_id)
 
     # 4. Отменяем заказ в нашей БД
     await buyer_order_manager.cancel_order(order_id)
-    log.info(f"[ОТМЕНА ЗАКАЗА #{order_id}] - Заказ успешно отменен в локальной БД.")
+    log.info("[ОТМЕНА ЗАКАЗА #%s] - Заказ успешно отменен в локальной БД.", order_id)
 
     await call.answer("Ваш заказ успешно отменён!", show_alert=True)
     # --- НАЧАЛО БЛОКА УВЕДОМЛЕНИЯ АДМИНУ ---
@@ -519,11 +500,10 @@ async def order_cancel_yes(
                                   reply_markup=get_orders_list_kb(orders, finished=False))
 
 
-@client_router.callback_query(F.data.startswith("back-to-list:"))
-async def back_to_list(call: CallbackQuery, buyer_order_manager):
+@client_router.callback_query(CbData("back-to-list", ("suffix", str)))
+async def back_to_list(call: CallbackQuery, cb, buyer_order_manager):
     await call.answer()
-    suffix = call.data.split(":")[1]
-    finished = suffix == "fin"
+    finished = cb.suffix == "fin"
 
     orders = await buyer_order_manager.list_orders(
         tg_user_id=call.from_user.id,
@@ -543,18 +523,17 @@ async def back_to_list(call: CallbackQuery, buyer_order_manager):
             reply_markup=get_orders_list_kb(orders, finished)
         )
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
 
-@client_router.callback_query(F.data.startswith("back-orders-menu:"))
+@client_router.callback_query(CbData("back-orders-menu", ("suffix", str)))
 async def back_orders_menu(call: CallbackQuery, buyer_order_manager):
     await call.answer()
 
     tg_id = call.from_user.id
-    active_cnt = await buyer_order_manager.count_active_orders_by_tg(tg_id)
-    total_cnt = await buyer_order_manager.count_total_orders_by_tg(tg_id)
+    active_cnt, total_cnt = await buyer_order_manager.counts_by_tg(tg_id)
 
     header = (
         f"Кол-во ожидаемых заказов: `{active_cnt}`\n"
@@ -568,7 +547,7 @@ async def back_orders_menu(call: CallbackQuery, buyer_order_manager):
             reply_markup=get_orders_inline_keyboard(),
         )
     except TelegramBadRequest as e:
-        log.error(f"[Bot.Client] Ошибка при изменении сообщения: {e}")
+        log.error("[Bot.Client] Ошибка при изменении сообщения: %s", e)
         await handle_telegram_error(e, call=call)
         return
 
@@ -604,11 +583,10 @@ CLIENT_MEDIA_IDS_KEY = "client_media_msg_ids"
 async def cleanup_client_media(bot, state, chat_id: int):
     data = await state.get_data()
     ids = data.get(CLIENT_MEDIA_IDS_KEY, [])
-    for mid in ids:
-        try:
-            await bot.delete_message(chat_id, mid)
-        except TelegramBadRequest:
-            pass
+    # Весь альбом удаляется одним запросом (deleteMessages принимает до 100 id, ненайденные пропускает)
+    for i in range(0, len(ids), 100):
+        with suppress(TelegramBadRequest):
+            await bot.delete_messages(chat_id, ids[i:i + 100])
     await state.update_data(**{CLIENT_MEDIA_IDS_KEY: []})
 
 
@@ -657,14 +635,9 @@ async def send_products_album(target: Message | CallbackQuery, products_page: li
     await state.update_data(**{CLIENT_MEDIA_IDS_KEY: [m.message_id for m in msgs]})
 
 
-@client_router.callback_query(F.data.startswith("cart:page:"))
-async def on_cart_page(call: CallbackQuery, state: FSMContext, product_position_manager):
-    try:
-        page = int(call.data.split(":")[-1])
-    except ValueError:
-        await call.answer()
-        return
-
+@client_router.callback_query(CbData("cart:page", ("page", int)))
+async def on_cart_page(call: CallbackQuery, cb, state: FSMContext, product_position_manager):
+    page = cb.page
     data = await state.get_data()
     cart: dict[int, int] = data.get("cart", {})
     products = await product_position_manager.list_not_empty_order_positions()
@@ -743,9 +716,10 @@ async def back_from_confirm_to_delivery(call: CallbackQuery, state: FSMContext):
     await state.set_state(CreateOrder.choose_delivery)
 
 
-@client_router.callback_query(CreateOrder.enter_address, F.data.startswith("addr:"))
+@client_router.callback_query(CreateOrder.enter_address, CbData("addr", ("action", str)))
 async def handle_address_source_choice(
         call: CallbackQuery,
+        cb,
         state: FSMContext,
         bot: Bot,  # Нам понадобится bot для отправки карты
         buyer_info_manager: BuyerInfoManager
@@ -754,7 +728,7 @@ async def handle_address_source_choice(
     Обрабатывает кнопки "Использовать сохраненный" или "Ввести вручную".
     """
     await call.answer()
-    action = call.data.split(":")[1]
+    action = cb.action
 
     if action == "enter":
         await call.message.edit_text("Введите основную часть адреса через запятую (город, улица, дом).\n\n"
@@ -793,11 +767,11 @@ async def handle_address_source_choice(
 async def pre_checkout_handler(pre_checkout_query: PreCheckoutQuery):
     # Здесь можно добавить дополнительную проверку (например, наличие товара)
     order_id = int(pre_checkout_query.invoice_payload.split(":")[1])
-    log.info(f"Получен pre-checkout запрос для заказа #{order_id}")
+    log.info("Получен pre-checkout запрос для заказа #%s", order_id)
 
     # Подтверждаем, что готовы принять платеж
     await pre_checkout_query.answer(ok=True)
-    log.info(f"Ответили ok=True на pre-checkout для заказа #{order_id}")
+    log.info("Ответили ok=True на pre-checkout для заказа #%s", order_id)
 
 
 @client_router.callback_query(F.data == "noop")
@@ -820,8 +794,11 @@ async def _render_profile_text(tg_id: int, buyer_info_manager) -> str:
 
 async def show_profile_menu(target: Message | CallbackQuery, buyer_info_manager):
     tg_id = target.from_user.id if isinstance(target, CallbackQuery) else target.from_user.id
-    await buyer_info_manager.upsert_username_by_tg(tg_id, target.from_user.username)
-    text = await _render_profile_text(tg_id, buyer_info_manager)
+    # username в карточке профиля не выводится, поэтому обновление и чтение идут параллельно
+    _, text = await asyncio.gather(
+        buyer_info_manager.upsert_username_by_tg(tg_id, target.from_user.username),
+        _render_profile_text(tg_id, buyer_info_manager),
+    )
     if isinstance(target, CallbackQuery):
         await target.message.edit_text(text, parse_mode="Markdown", reply_markup=get_profile_inline_keyboard())
         await target.answer()
@@ -4,7 +4,7 @@ from contextlib import suppress
 from datetime import datetime, timedelta
 from typing import Union, Tuple
 
-from aiogram import Router, F, Bot
+from aiogram import F, Bot
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
@@ -24,17 +24,17 @@ from keyboards.client import (
     confirm_create_order, confirm_geoposition_kb, get_main_inline_keyboard
 )
 
-from handlers.client import order_detail as show_client_order_detail
+from handlers.client import render_order_detail
 
+from utils.callback_data import CbData, one_of
 from utils.config import PAYMENT_TOKEN
 from utils.logger import get_logger
 from utils.notifications import notify_admins, format_order_for_admin
-from utils.secrets import get_admin_ids
+from utils.secrets import is_admin_id
 
 # --- Константы и FSM ---
 MIN_PAYMENT_AMOUNT = 60.00
 log = get_logger("[Bot.OrderProcessing]")
-order_router = Router()
 
 
 class CreateOrder(StatesGroup):
@@ -221,33 +221,36 @@ async def create_yandex_delivery_claim(
 # ======================== ОСНОВНАЯ ЦЕПОЧКА FSM ДЛЯ ЗАКАЗА ==============================
 # =======================================================================================
 
-@client_router.callback_query(CreateOrder.choose_products, F.data.startswith("cart:"))
-async def cart_ops(call: CallbackQuery, state: FSMContext, product_position_manager):
-    products = await product_position_manager.list_not_empty_order_positions()
+@client_router.callback_query(CreateOrder.choose_products, F.data == "cart:done")
+async def cart_done(call: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     cart: dict[int, int] = data.get("cart", {})
+    if not cart:
+        await call.answer(text="Корзина пуста", show_alert=True)
+        return
 
-    action, *rest = call.data.split(":")[1:]
-    if action == "done":
-        if not cart:
-            await call.answer(text="Корзина пуста", show_alert=True)
-            return
+    await cleanup_client_media(call.bot, state, call.message.chat.id)
 
-        await cleanup_client_media(call.bot, state, call.message.chat.id)
+    await state.update_data(cart=cart)
+    await state.set_state(CreateOrder.choose_delivery)
+    await call.message.edit_text("Способ получения:", reply_markup=choice_of_delivery())
 
-        await state.update_data(cart=cart)
-        await state.set_state(CreateOrder.choose_delivery)
-        await call.message.edit_text("Способ получения:", reply_markup=choice_of_delivery())
-        return
 
-    pid = int(rest[0])
-    stock_map = {p["id"]: p["quantity"] for p in products}
+@client_router.callback_query(
+    CreateOrder.choose_products, CbData("cart", ("action", one_of("toggle", "add", "sub")), ("pid", int))
+)
+async def cart_ops(call: CallbackQuery, cb, state: FSMContext, product_position_manager):
+    data = await state.get_data()
+    cart: dict[int, int] = data.get("cart", {})
+
+    action, pid = cb
     qty = cart.get(pid, 0)
 
     if action == "toggle":
         cart.pop(pid, None) if qty > 0 else cart.__setitem__(pid, 1)
     elif action == "add":
-        new_qty = min(qty + 1, stock_map.get(pid, 0))
+        # Остаток нужен только для нажатой позиции — берём его точечно, а не из закэшированной витрины
+        new_qty = min(qty + 1, await product_position_manager.get_stock(pid))
         cart[pid] = new_qty
     elif action == "sub":
         new_qty = max(qty - 1, 0)
@@ -257,18 +260,19 @@ async def cart_ops(call: CallbackQuery, state: FSMContext, product_position_mana
             cart[pid] = new_qty
 
     await state.update_data(cart=cart)
+    products = await product_position_manager.list_not_empty_order_positions()
     await call.message.edit_text("Выберите нужные позиции:", reply_markup=get_all_products(products, cart))
 
 
 # --- Шаг 1: Пользователь нажимает "Доставка" или "Самовывоз" ---
-@client_router.callback_query(CreateOrder.choose_delivery, F.data.startswith("del:"))
-async def handle_delivery_choice(call: CallbackQuery, state: FSMContext, buyer_info_manager: BuyerInfoManager,
+@client_router.callback_query(CreateOrder.choose_delivery, CbData("del", ("way", str)))
+async def handle_delivery_choice(call: CallbackQuery, cb, state: FSMContext, buyer_info_manager: BuyerInfoManager,
                                  product_position_manager: ProductPositionManager):
     """
     Обрабатывает выбор способа доставки.
     """
     await call.answer()
-    delivery_way = "delivery" if call.data.split(":")[1] == "delivery" else "pickup"
+    delivery_way = "delivery" if cb.way == "delivery" else "pickup"
     await state.update_data(delivery_way=delivery_way)
 
     if delivery_way == "pickup":
@@ -335,15 +339,15 @@ async def process_manual_location(msg: Message, state: FSMContext):
 
 
 # --- Шаг 3.4: Пользователь реагирует на карту ---
-@client_router.callback_query(CreateOrder.confirm_geoposition, F.data.startswith("geo:"))
-async def process_geoposition_confirm(call: CallbackQuery, state: FSMContext):
+@client_router.callback_query(CreateOrder.confirm_geoposition, CbData("geo", ("action", str)))
+async def process_geoposition_confirm(call: CallbackQuery, cb, state: FSMContext):
     await call.answer()
-    action = call.data.split(":")[1]
+    action = cb.action
 
     # Удаляем предыдущие сообщения, чтобы не было мусора
     with suppress(TelegramBadRequest):
-        await call.message.delete()
-        await call.bot.delete_message(chat_id=call.message.chat.id, message_id=call.message.message_id - 1)
+        # Карта и вопрос под ней удаляются одним запросом deleteMessages
+        await call.bot.delete_messages(call.message.chat.id, [call.message.message_id - 1, call.message.message_id])
 
     if action == "confirm":
         await state.set_state(CreateOrder.enter_porch)
@@ -357,8 +361,8 @@ async def process_geoposition_confirm(call: CallbackQuery, state: FSMContext):
 async def back_from_geoconfirm_to_delivery_choice(call: CallbackQuery, state: FSMContext):
     await call.answer()
     with suppress(TelegramBadRequest):
-        await call.message.delete()
-        await call.bot.delete_message(chat_id=call.message.chat.id, message_id=call.message.message_id - 1)
+        # Карта и вопрос под ней удаляются одним запросом deleteMessages
+        await call.bot.delete_messages(call.message.chat.id, [call.message.message_id - 1, call.message.message_id])
 
     await call.message.answer(
         "Как вы хотите получить заказ?",
@@ -402,8 +406,8 @@ async def process_apartment_and_calculate(
     и корректно обрабатывает все возможные ошибки.
     """
     apartment = msg.text.strip()
-    await state.update_data(apartment=apartment if apartment != '-' else None)
-    data = await state.get_data()
+    # update_data возвращает уже объединённые данные — отдельный get_data не нужен
+    data = await state.update_data(apartment=apartment if apartment != '-' else None)
     main_address = data.get("address", "")
 
     # --- Общая функция для возврата в главное меню при ошибке ---
@@ -411,7 +415,7 @@ async def process_apartment_and_calculate(
         await msg.answer(error_message)
         await state.clear()
 
-        is_admin = msg.from_user.id in get_admin_ids()
+        is_admin = is_admin_id(msg.from_user.id)
         bonuses = await buyer_info_manager.get_user_bonuses_by_tg(msg.from_user.id)
 
         await msg.answer(
@@ -445,7 +449,7 @@ async def process_apartment_and_calculate(
     # 3. Проверяем наличие профиля
     buyer_profile = await buyer_info_manager.get_profile_by_tg(msg.from_user.id)
     if not buyer_profile:
-        log.error(f"Не найден профиль для {msg.from_user.id} на этапе расчета.")
+        log.error("Не найден профиль для %s на этапе расчета.", msg.from_user.id)
         await return_to_main_menu("❗️Произошла системная ошибка: не найден ваш профиль.\n"
                                   "Пожалуйста, нажмите /start")
         return
@@ -468,7 +472,7 @@ async def process_apartment_and_calculate(
             buyer_info=dict(buyer_profile)
         )
     except Exception as e:
-        log.exception(f"Непредвиденное исключение в yandex_delivery_client.calculate_price: {e}")
+        log.exception("Непредвиденное исключение в yandex_delivery_client.calculate_price: %s", e)
         delivery_cost = None  # Считаем, что расчет не удался
 
     if delivery_cost is None:
@@ -511,6 +515,7 @@ async def confirm_bonus(call: CallbackQuery, state: FSMContext):
     items_preview = data.get("items_preview", [])
     delivery_way = data.get("delivery_way")
     address = data.get("address")
+    comment = data.get("comment")
 
     # Бонусами можно оплатить только стоимость товаров, не доставки.
     can_use_bonus = min(bonuses, total_goods)
@@ -520,11 +525,13 @@ async def confirm_bonus(call: CallbackQuery, state: FSMContext):
     await state.update_data(used_bonus=used_bonus)
 
     # Формируем обновленный текст предпросмотра
-    text = _text_order_preview(items_preview, total_goods, delivery_way, address, delivery_cost, used_bonus)
+    text = _text_order_preview(
+        items_preview, total_goods, delivery_way, address, delivery_cost, used_bonus, comment=comment
+    )
 
     # Формируем обновленную клавиатуру
     full_price = total_goods + delivery_cost
-    kb = confirm_create_order(bonuses, used_bonus, total_sum=full_price)
+    kb = confirm_create_order(bonuses, used_bonus, total_sum=full_price, has_comment=bool(comment))
 
     # Редактируем сообщение с новыми данными
     await call.message.edit_text(text, parse_mode="Markdown", reply_markup=kb)
@@ -610,9 +617,12 @@ async def confirm_ok(
             # Проверяем, что сумма все еще не слишком мала после округления
             if total_amount_kopecks < int(MIN_PAYMENT_AMOUNT * 100):
                 # Эта логика скопирована из блока elif ниже для консистентности
-                await call.answer("Заказ отменен: сумма к оплате слишком мала.", show_alert=True)
-                await buyer_order_manager.cancel_order(order_id)
-                is_admin = call.from_user.id in get_admin_ids()
+                # Бонусы читаем только после отмены: cancel_order возвращает списанные бонусы
+                await asyncio.gather(
+                    call.answer("Заказ отменен: сумма к оплате слишком мала.", show_alert=True),
+                    buyer_order_manager.cancel_order(order_id),
+                )
+                is_admin = is_admin_id(call.from_user.id)
                 bonuses = await buyer_info_manager.get_user_bonuses_by_tg(call.from_user.id)
                 await call.message.answer(
                     text=f"❗️Сумма к оплате ({final_amount_to_pay_float:.2f} руб.)"
@@ -687,15 +697,17 @@ async def confirm_ok(
             await state.set_state(CreateOrder.waiting_payment)
 
         except TelegramBadRequest as e:
-            log.error(f"Ошибка при выставлении счета для заказа #{order_id}: {e}")
+            log.error("Ошибка при выставлении счета для заказа #%s: %s", order_id, e)
             await call.message.answer("❗️ Произошла ошибка при создании счета. Ваш заказ отменен.")
             await buyer_order_manager.cancel_order(order_id)
             await state.clear()
 
     elif final_amount_to_pay_float > 0:
-        await call.answer("Заказ отменен: сумма к оплате слишком мала.", show_alert=True)
-        await buyer_order_manager.cancel_order(order_id)
-        is_admin = call.from_user.id in get_admin_ids()
+        await asyncio.gather(
+            call.answer("Заказ отменен: сумма к оплате слишком мала.", show_alert=True),
+            buyer_order_manager.cancel_order(order_id),
+        )
+        is_admin = is_admin_id(call.from_user.id)
         bonuses = await buyer_info_manager.get_user_bonuses_by_tg(call.from_user.id)
         await call.message.edit_text(
             text=f"❗️Сумма к оплате ({final_amount_to_pay_float:.2f} руб.)"
@@ -794,7 +806,7 @@ async def successful_payment_handler(
 
     # --- ФИНАЛЬНЫЙ ШАГ: "КИДАЕМ НА ГЛАВНОЕ МЕНЮ" ---
     # Получаем актуальные данные для меню
-    is_admin = message.from_user.id in get_admin_ids()
+    is_admin = is_admin_id(message.from_user.id)
     bonuses = await buyer_info_manager.get_user_bonuses_by_tg(message.from_user.id)
 
     # Отправляем новое, полноценное сообщение главного меню
@@ -806,13 +818,15 @@ async def successful_payment_handler(
     )
 
 
-@client_router.callback_query(F.data.startswith("cancel_invoice:"))
-async def cancel_payment_invoice(call: CallbackQuery, state: FSMContext, buyer_order_manager, buyer_info_manager):
+@client_router.callback_query(CbData("cancel_invoice", ("order_id", int)))
+async def cancel_payment_invoice(
+        call: CallbackQuery, cb, state: FSMContext, buyer_order_manager, buyer_info_manager
+):
     """
     Обрабатывает отмену заказа на этапе выставленного счета.
     Редактирует сообщение, превращая его в главное меню.
     """
-    order_id = int(call.data.split(":")[1])
+    order_id = cb.order_id
     order_obj = await buyer_order_manager.get_order_by_id(order_id)
 
     if not order_obj:
@@ -835,9 +849,9 @@ async def cancel_payment_invoice(call: CallbackQuery, state: FSMContext, buyer_o
         await call.message.delete()
     except TelegramBadRequest as e:
         # Игнорируем ошибку, если сообщение уже было удалено (например, при двойном клике)
-        log.warning(f"Не удалось удалить сообщение при отмене счета: {e}")
+        log.warning("Не удалось удалить сообщение при отмене счета: %s", e)
         # 2. Отправляем абсолютно новое сообщение с главным меню
-    is_admin = call.from_user.id in get_admin_ids()
+    is_admin = is_admin_id(call.from_user.id)
     bonuses = await buyer_info_manager.get_user_bonuses_by_tg(call.from_user.id)
     await call.message.answer(
         text="Выбери действие: \n"
@@ -858,12 +872,12 @@ async def _format_delivery_status(
     Возвращает (текст_статуса, флаг_нужно_полное_обновление).
     """
     # 1. Получаем ОБЩИЙ СТАТУС заявки
-    claim_info = await yandex_delivery_client.get_claim_info(claim_id)
+    claim_info = await yandex_delivery_client.fetch_claim_info(claim_id)
     if not claim_info:
         return "\n\n*Статус доставки:*\n❌ Не удалось получить информацию о заявке.", False
 
     status = claim_info.get("status")
-    log.debug(f"Статус заявки {claim_id} в Яндексе: {status}")
+    log.debug("Статус заявки %s в Яндексе: %s", claim_id, status)
 
     # 2. СИНХРОНИЗИРУЕМ статус в нашей БД, если он конечный
     was_status_updated = await buyer_order_manager.sync_order_status_from_yandex(order_id, status)
@@ -921,15 +935,16 @@ async def _format_delivery_status(
     return "\n".join(lines), was_status_updated
 
 
-@client_router.callback_query(F.data.startswith("delivery:refresh:"))
+@client_router.callback_query(CbData("delivery:refresh", ("order_id", int)))
 async def refresh_delivery_status(
         call: CallbackQuery,
+        cb,
         buyer_order_manager: BuyerOrderManager,
         yandex_delivery_client: YandexDeliveryClient,
 ):
     # Сразу отвечаем пользователю, чтобы он видел, что кнопка сработала
     await call.answer("Обновляю информацию...")
-    order_id = int(call.data.split(":")[2])
+    order_id = cb.order_id
 
     order = await buyer_order_manager.get_order_by_id(order_id)
     if not (order and order.yandex_claim_id):
@@ -943,10 +958,11 @@ async def refresh_delivery_status(
 
     if needs_full_update:
         # Если статус изменился на конечный (доставлен/отменен), полностью перерисовываем карточку
-        log.info(f"Статус заказа #{order_id} изменился на конечный. Полное обновление карточки.")
-        await show_client_order_detail(
+        log.info("Статус заказа #%s изменился на конечный. Полное обновление карточки.", order_id)
+        await render_order_detail(
             call,
             buyer_order_manager,
+            order_id,
             delivery_status_text=delivery_status_text
         )
         return
@@ -976,7 +992,7 @@ async def refresh_delivery_status(
     except TelegramBadRequest as e:
         # Эта проверка на случай, если ошибка все же возникнет
         if "message is not modified" not in str(e):
-            log.error(f"Ошибка при обновлении статуса доставки для заказа #{order_id}: {e}")
+            log.error("Ошибка при обновлении статуса доставки для заказа #%s: %s", order_id, e)
 
 
 '''
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from math import ceil
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
@@ -10,6 +11,17 @@ def admin_positions_list(
         positions: list[dict],
         page: int = 1,
         page_size: int = 50,
+) -> InlineKeyboardMarkup:
+    # Ключ — только то, что попадает в кнопки: одинаковый список даёт тот же объект клавиатуры
+    key = tuple((p['id'], p['title'], p['price'], p['quantity']) for p in positions)
+    return _admin_positions_list(key, page, page_size)
+
+
+@lru_cache(maxsize=256)
+def _admin_positions_list(
+        positions: tuple[tuple, ...],
+        page: int,
+        page_size: int,
 ) -> InlineKeyboardMarkup:
     total = len(positions)
     total_pages = max(1, ceil(total / page_size))
@@ -21,9 +33,9 @@ def admin_positions_list(
 
     rows: list[list[InlineKeyboardButton]] = []
 
-    for p in page_positions:
-        title = f"{p['title']} — {p['price']} руб, {p['quantity']} шт"
-        rows.append([InlineKeyboardButton(text=title, callback_data=f"adm-pos:{p['id']}")])
+    for pid, title, price, quantity in page_positions:
+        text = f"{title} — {price} руб, {quantity} шт"
+        rows.append([InlineKeyboardButton(text=text, callback_data=f"adm-pos:{pid}")])
 
     if total_pages > 1:
         prev_page = page - 1 if page > 1 else 1
@@ -38,18 +50,23 @@ def admin_positions_list(
                                  callback_data=f"positions:page:{total_pages}" if page < total_pages else "noop"),
         ])
 
-    rows.append([InlineKeyboardButton(text="➕ Добавить", callback_data="adm-pos:add")])
+    rows.append([
+        InlineKeyboardButton(text="➕ Добавить", callback_data="adm-pos:add"),
+        InlineKeyboardButton(text="⚡ Одним сообщением", callback_data="adm-pos:add-fast"),
+    ])
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="back-admin-main")])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=None)
 def admin_skip_image_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="Пропустить", callback_data="adm-pos:skip-image")]
     ])
 
 
+@lru_cache(maxsize=512)
 def admin_pos_detail(pid: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="Изменить название", callback_data=f"adm-pos:edit-title:{pid}")],
@@ -63,6 +80,7 @@ def admin_pos_detail(pid: int) -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=256)
 def admin_confirm_delete(pid: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="ДА", callback_data=f"adm-pos:delete-yes:{pid}")],
@@ -70,6 +88,8 @@ def admin_confirm_delete(pid: int) -> InlineKeyboardMarkup:
     ])
 
 
+# Статичные клавиатуры собираются один раз и переиспользуются — возвращаемый объект не мутировать
+@lru_cache(maxsize=1024)
 def admin_edit_back(pid: int | None = None) -> InlineKeyboardMarkup:
     cb = f"adm-pos:{pid}" if pid else "positions"
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -77,6 +97,7 @@ def admin_edit_back(pid: int | None = None) -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=None)
 def get_admin_orders_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="Активные", callback_data="adm-orders:active")],
@@ -86,30 +107,47 @@ def get_admin_orders_keyboard() -> InlineKeyboardMarkup:
 
 
 def get_admin_orders_list_kb(
-        orders: list[dict],
+        orders: tuple[tuple, ...],
         finished: bool,
         page: int = 1,
         page_size: int = 50,
+        total: int | None = None,
+) -> InlineKeyboardMarkup:
+    """
+    orders: результат admin_list_orders — кортеж пар (id, registration_date).
+    Без `total` передаётся весь список и страница вырезается здесь;
+    с `total` в orders уже лежит только запрошенная страница, а total — общее число заказов.
+    """
+    if total is None:
+        total = len(orders)
+        total_pages = max(1, ceil(total / page_size))
+        page = max(1, min(page, total_pages))  # clamp
+        start = (page - 1) * page_size
+        orders = orders[start:start + page_size]
+    else:
+        total_pages = max(1, ceil(total / page_size))
+        page = max(1, min(page, total_pages))
+    return _admin_orders_list_kb(tuple(orders), finished, page, total_pages)
+
+
+@lru_cache(maxsize=256)
+def _admin_orders_list_kb(
+        page_orders: tuple[tuple, ...],
+        finished: bool,
+        page: int,
+        total_pages: int,
 ) -> InlineKeyboardMarkup:
-    total = len(orders)
-    total_pages = max(1, ceil(total / page_size))
-    page = max(1, min(page, total_pages))  # clamp
-
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_orders = orders[start:end]
-
     status_token = "finished" if finished else "active"
     suffix = "fin" if finished else "act"
 
     rows: list[list[InlineKeyboardButton]] = [
         [
             InlineKeyboardButton(
-                text=f"#{o['id']} ({o['registration_date']:%d.%m})",
-                callback_data=f"adm-order:{o['id']}:{suffix}",
+                text=f"#{oid} ({registration_date:%d.%m})",
+                callback_data=f"adm-order:{oid}:{suffix}",
             )
         ]
-        for o in page_orders
+        for oid, registration_date in page_orders
     ]
 
     if total_pages > 1:
@@ -183,6 +221,7 @@ def admin_order_detail_kb(order: dict, *, suffix: str) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=256)
 def admin_cancel_confirm_kb(order_id: int, suffix: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="ДА", callback_data=f"adm-order:cancel-yes:{order_id}:{suffix}")],
@@ -190,12 +229,14 @@ def admin_cancel_confirm_kb(order_id: int, suffix: str) -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=None)
 def notify_cancel_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel-fsm-admin")]
     ])
 
 
+@lru_cache(maxsize=None)
 def notify_confirm_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="✅ Разослать", callback_data="notify:send")],
@@ -204,6 +245,7 @@ def notify_confirm_kb() -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=16)
 def admin_warehouse_detail_kb(warehouse_id: int) -> InlineKeyboardMarkup:
     """Клавиатура для детального просмотра и редактирования склада."""
     builder = InlineKeyboardBuilder()
@@ -223,12 +265,14 @@ def admin_warehouse_detail_kb(warehouse_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def admin_create_warehouse_kb() -> InlineKeyboardMarkup:
     """
     Клавиатура, предлагающая создать склад по умолчанию, если он не найден.
     """
     builder = InlineKeyboardBuilder()
     builder.button(text="➕ Создать склад по умолчанию", callback_data="wh:create")
+    builder.button(text="⚡ Одним сообщением", callback_data="wh:create-fast")
     builder.button(text="⬅️ Назад в админ-меню", callback_data="back-admin-main")
     builder.adjust(1)
     return builder.as_markup()
@@ -253,6 +297,7 @@ def admin_manage_admins_kb(admins: list[dict]) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=64)
 def admin_confirm_delete_admin_kb(user_id: int) -> InlineKeyboardMarkup:
     """Клавиатура для подтверждения удаления администратора."""
     builder = InlineKeyboardBuilder()
@@ -262,6 +307,7 @@ def admin_confirm_delete_admin_kb(user_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def admin_manage_add_back_kb() -> InlineKeyboardMarkup:
     """Клавиатура с кнопкой "Назад" для меню добавления администратора."""
     builder = InlineKeyboardBuilder()
@@ -269,6 +315,7 @@ def admin_manage_add_back_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def admin_confirm_geoposition_kb() -> InlineKeyboardMarkup:
     """
     Клавиатура для подтверждения геоточки в админ-панели.
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from math import ceil
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
@@ -6,6 +7,8 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from database.models.buyer_orders import BuyerOrders
 
 
+# Статичные клавиатуры собираются один раз и переиспользуются — возвращаемый объект не мутировать
+@lru_cache(maxsize=None)
 def get_main_inline_keyboard(is_admin: bool):
     buttons = [
         [InlineKeyboardButton(text="Мои заказы", callback_data="my-orders")],
@@ -23,6 +26,7 @@ def get_main_inline_keyboard(is_admin: bool):
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=None)
 def get_orders_inline_keyboard():
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -94,6 +98,7 @@ def get_order_detail_kb(order: BuyerOrders) -> InlineKeyboardMarkup:  # Убед
     return builder.as_markup()
 
 
+@lru_cache(maxsize=256)
 def get_cancel_confirm_kb(order_id: int, suffix: str):
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -157,6 +162,7 @@ def get_all_products(
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=None)
 def choice_of_delivery() -> InlineKeyboardMarkup:
     rows = [
         [InlineKeyboardButton(text="Самовывоз", callback_data="del:pickup")],
@@ -166,6 +172,7 @@ def choice_of_delivery() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=256)
 def delivery_address_select(saved: str | None) -> InlineKeyboardMarkup:
     rows = []
     if saved:
@@ -175,6 +182,7 @@ def delivery_address_select(saved: str | None) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=256)
 def confirm_create_order(bonuses: int,
                          used_bonus: int,
                          total_sum: float,
@@ -222,6 +230,7 @@ def confirm_create_order(bonuses: int,
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def get_profile_inline_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="Изменить имя и фамилию", callback_data="profile:edit-name")],
@@ -245,6 +254,7 @@ def cancel_payment(amount_to_pay: int, order_id: int) -> InlineKeyboardMarkup:
     ])
 
 
+@lru_cache(maxsize=None)
 def back_to_delivery_choice_kb() -> InlineKeyboardMarkup:
     """
     Клавиатура с одной кнопкой "Назад" для возврата к выбору способа доставки.
@@ -254,6 +264,7 @@ def back_to_delivery_choice_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def confirm_geoposition_kb() -> InlineKeyboardMarkup:
     """
     Клавиатура для подтверждения правильности найденной геоточки.
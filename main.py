@@ -5,11 +5,18 @@ import logging
 from contextlib import suppress
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+try:
+    import uvloop
+except ImportError:  # uvloop не поддерживает Windows — там работаем на стандартном цикле
+    uvloop = None
+
 from api.yandex_delivery import YandexDeliveryClient
 from database.async_db import AsyncDatabase
+from database.managers.broadcast_manager import BroadcastManager
 from database.managers.buyer_info_manager import BuyerInfoManager
 from database.managers.buyer_order_manager import BuyerOrderManager
 from database.managers.order_items_manager import OrderItemsManager
@@ -17,14 +24,18 @@ from database.managers.payments_manager import PaymentsManager
 from database.managers.product_position_manager import ProductPositionManager
 from database.managers.user_info_manager import UserInfoManager
 from database.managers.warehouse_manager import WarehouseManager
+from utils.broadcast import resume_broadcasts
+from utils.fsm_storage import CompactMemoryStorage
 from utils.logger import get_logger, setup_logging
+from utils.secrets import reload_admin_ids
 from utils.config import (
-    BOT_TOKEN, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD,
+    BOT_TOKEN, BOT_SESSION_LIMIT, BOT_RATE_LIMIT, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD,
     DB_MIN_POOL_SIZE, DB_MAX_POOL_SIZE, YANDEX_DELIVERY_TOKEN
 )
 from utils.scheduler_jobs import check_delivery_statuses
 
 from middleware.manager_middleware import ManagerMiddleware
+from middleware.request_throttle_middleware import RequestThrottleMiddleware
 from handlers import register_handlers
 
 setup_logging(level=logging.DEBUG, log_to_file=True)
@@ -55,8 +66,11 @@ async def shutdown(bot: Bot, dp: Dispatcher):
 async def main():
     log.info("[Bot] Запуск основного процесса")
     PENDING_ORDER_TIMEOUT_MINUTES = 10  # Заказы будут отменяться через 15 минут
-    bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher()
+    # Одна сессия с общим пулом keep-alive соединений на весь процесс (в т.ч. для рассылки)
+    bot = Bot(token=BOT_TOKEN, session=AiohttpSession(limit=BOT_SESSION_LIMIT))
+    # Все исходящие запросы (edit_text/answer/рассылка) идут через общий token bucket
+    bot.session.middleware(RequestThrottleMiddleware(rate=BOT_RATE_LIMIT))
+    dp = Dispatcher(storage=CompactMemoryStorage())
     yandex_delivery_client = YandexDeliveryClient(token=YANDEX_DELIVERY_TOKEN)
 
     db = AsyncDatabase(
@@ -78,6 +92,7 @@ async def main():
     user_info_manager = UserInfoManager(db)
     warehouse_manager = WarehouseManager(db)
     payments_manager = PaymentsManager(db)
+    broadcast_manager = BroadcastManager(db)
 
     # --- БЛОК НАСТРОЙКИ ПЛАНИРОВЩИКА ---
     scheduler = AsyncIOScheduler(timezone="Europe/Moscow")  # Укажите ваш часовой пояс
@@ -112,7 +127,8 @@ async def main():
             warehouse_manager=warehouse_manager,
             payments_manager=payments_manager,
             bot=bot,
-            yandex_delivery_client=yandex_delivery_client
+            yandex_delivery_client=yandex_delivery_client,
+            broadcast_manager=broadcast_manager,
         )
     )
     log.info("[Bot] Middleware настроен [✓]")
@@ -120,20 +136,29 @@ async def main():
     register_handlers(dp)
     log.info("[Bot] Обработчики зарегистрированы [✓]")
 
+    # Досылаем рассылки, прерванные прошлым перезапуском (ссылка на задачу держится до конца main)
+    resume_task = asyncio.create_task(resume_broadcasts(bot, broadcast_manager))
+    resume_task.add_done_callback(
+        lambda t: t.cancelled() or t.exception() is None
+        or log.error("[Bot] Ошибка при продолжении рассылок: %r", t.exception())
+    )
+
     if sys.platform != "win32":
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGINT, signal.SIGTERM):
             loop.add_signal_handler(sig, lambda: loop.create_task(shutdown(bot, dp)))
+        # kill -HUP перечитывает secrets.json без перезапуска бота
+        loop.add_signal_handler(signal.SIGHUP, reload_admin_ids)
 
         log.info("[Bot] Бот запущен. Ожидание завершения через Ctrl+C")
         try:
-            await dp.start_polling(bot)
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
         finally:
             await shutdown(bot, dp)
     else:
         try:
             log.info("[Bot] Бот запущен. Ожидание завершения через Ctrl+C")
-            await dp.start_polling(bot)
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
         except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
             log.warning("[Bot] Получен сигнал завершения работы")
         finally:
@@ -147,4 +172,8 @@ if __name__ == "__main__":
 
     log.info("-" * 80)
     log.info("[Bot] Запуск приложения")
-    asyncio.run(main())
+    # uvloop (libuv) заметно дешевле стандартного цикла на разборе ответов и сетевом I/O
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
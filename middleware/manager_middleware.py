@@ -1,6 +1,7 @@
 from aiogram import BaseMiddleware, Bot
 
 from database.async_db import AsyncDatabase
+from database.managers.broadcast_manager import BroadcastManager
 from database.managers.buyer_info_manager import BuyerInfoManager
 from database.managers.buyer_order_manager import BuyerOrderManager
 from database.managers.order_items_manager import OrderItemsManager
@@ -24,6 +25,7 @@ class ManagerMiddleware(BaseMiddleware):
             payments_manager: PaymentsManager,
             bot: Bot,
             yandex_delivery_client: YandexDeliveryClient,
+            broadcast_manager: BroadcastManager,
     ):
         super().__init__()
         self.db = db
@@ -36,6 +38,7 @@ class ManagerMiddleware(BaseMiddleware):
         self.payments_manager = payments_manager
         self.bot = bot
         self.yandex_delivery_client = yandex_delivery_client
+        self.broadcast_manager = broadcast_manager
 
     async def __call__(self, handler, event, data):
         data["db"] = self.db
@@ -48,5 +51,6 @@ class ManagerMiddleware(BaseMiddleware):
         data["payments_manager"] = self.payments_manager
         data["bot"] = self.bot
         data["yandex_delivery_client"] = self.yandex_delivery_client
+        data["broadcast_manager"] = self.broadcast_manager
 
         return await handler(event, data)
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from utils.logger import get_logger
+
+log = get_logger("[Bot.RequestThrottle]")
+
+
+class TokenBucket:
+    """
+    Общий на процесс token bucket: `rate` запросов в секунду с запасом `capacity` на всплеск.
+    pause() останавливает всех потребителей разом (например, после 429 от Telegram).
+
+    Реализован через расписание слотов (GCRA): каждый вызов acquire() сразу резервирует
+    себе момент отправки и спит ровно до него, без опроса и без общего lock —
+    время самого запроса не добавляется к интервалу между запросами.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self._interval = 1 / rate
+        # На сколько можно опережать график: capacity запросов подряд без ожидания
+        self._burst = ((capacity or rate) - 1) * self._interval
+        self._next_slot = time.monotonic()
+        self._resume_at = 0.0
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            slot = max(self._next_slot, now, self._resume_at)
+            self._next_slot = slot + self._interval
+            delay = max(slot - self._burst, self._resume_at) - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Пауза могла начаться, пока мы спали, — тогда резервируем новый слот после неё
+            if time.monotonic() >= self._resume_at:
+                return
+
+    def pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+class RequestThrottleMiddleware(BaseRequestMiddleware):
+    """
+    Пропускает все исходящие запросы к Bot API через общий TokenBucket,
+    а на TelegramRetryAfter ставит на паузу всех отправителей сразу.
+    """
+
+    def __init__(self, rate: float):
+        self.bucket = TokenBucket(rate)
+
+    async def __call__(self, make_request, bot, method):
+        await self.bucket.acquire()
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            log.warning("[Bot.RequestThrottle] Лимит Telegram, пауза всех запросов на %s c", e.retry_after)
+            self.bucket.pause(e.retry_after)
+            raise
@@ -0,0 +1,27 @@
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, Message
+
+from utils.decorators import handle_telegram_error
+from utils.logger import get_logger
+
+log = get_logger("[Bot.TgErrorMiddleware]")
+
+
+class TgErrorMiddleware(BaseMiddleware):
+    """
+    Перехватывает TelegramBadRequest из хендлеров роутера и передаёт его в handle_telegram_error,
+    чтобы не дублировать try/except вокруг каждого edit_text/answer.
+    """
+
+    async def __call__(self, handler, event, data):
+        try:
+            return await handler(event, data)
+        except TelegramBadRequest as e:
+            log.error("[Bot.TgErrorMiddleware] Ошибка Telegram в хендлере: %s", e)
+            await handle_telegram_error(
+                e,
+                message=event if isinstance(event, Message) else None,
+                call=event if isinstance(event, CallbackQuery) else None,
+                state=data.get("state"),
+            )
@@ -0,0 +1,7 @@
+-- =========================================
+-- 03_broadcasts.rollback.sql
+-- =========================================
+DROP TABLE IF EXISTS broadcast_outbox CASCADE;
+DROP TABLE IF EXISTS broadcasts CASCADE;
+
+DROP TYPE IF EXISTS broadcast_status;
@@ -0,0 +1,31 @@
+-- =========================================
+-- 03_broadcasts.sql
+-- =========================================
+
+-- Рассылки админа и очередь получателей: переживают перезапуск бота
+CREATE TYPE broadcast_status AS ENUM (
+    'running',
+    'done',
+    'cancelled'
+    );
+
+CREATE TABLE broadcasts
+(
+    id             BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    admin_chat_id  BIGINT           NOT NULL,
+    src_chat_id    BIGINT           NOT NULL,
+    src_message_id BIGINT           NOT NULL,
+    payload        JSONB,                       -- текст/фото для прямой отправки (NULL — copy_message)
+    status         broadcast_status NOT NULL DEFAULT 'running',
+    ok_count       INT              NOT NULL DEFAULT 0,
+    fail_count     INT              NOT NULL DEFAULT 0,
+    created_at     TIMESTAMPTZ      NOT NULL DEFAULT now()
+);
+
+-- Получатели, которым сообщение ещё не отправлялось; строка удаляется, когда воркер её забирает
+CREATE TABLE broadcast_outbox
+(
+    broadcast_id BIGINT NOT NULL REFERENCES broadcasts (id) ON DELETE CASCADE,
+    tg_user_id   BIGINT NOT NULL,
+    PRIMARY KEY (broadcast_id, tg_user_id)
+);
@@ -0,0 +1,5 @@
+-- =========================================
+-- 04_user_bot_blocked.rollback.sql
+-- =========================================
+ALTER TABLE user_info
+    DROP COLUMN IF EXISTS bot_blocked;
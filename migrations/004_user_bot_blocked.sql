@@ -0,0 +1,8 @@
+-- =========================================
+-- 04_user_bot_blocked.sql
+-- =========================================
+
+-- Пользователь заблокировал бота (403 при рассылке): такие не попадают в очередь следующих рассылок.
+-- Флаг снимается, когда пользователь снова пишет /start
+ALTER TABLE user_info
+    ADD COLUMN bot_blocked BOOLEAN NOT NULL DEFAULT FALSE;
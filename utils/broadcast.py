@@ -0,0 +1,197 @@
+import asyncio
+import random
+from typing import AsyncIterator
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import (
+    CopyMessage, SendAnimation, SendAudio, SendDocument, SendMessage, SendPhoto, SendVideo, SendVoice, TelegramMethod,
+)
+from aiogram.types import Message
+
+from database.managers.broadcast_manager import BroadcastManager
+from utils.logger import get_logger
+
+log = get_logger("[Bot.Broadcast]")
+
+# Сколько отправок рассылки держать одновременно в полёте
+BROADCAST_WORKERS = 25
+# Сколько раз повторять отправку одному получателю после 429 или сетевой ошибки
+BROADCAST_RETRIES = 3
+# Сколько получателей забирать из очереди в БД за раз (при сбое теряется не больше одной пачки)
+CLAIM_SIZE = 100
+# Как часто (в отправленных сообщениях) обновлять админу прогресс рассылки
+PROGRESS_EVERY = 300
+
+# Активные рассылки: id админа -> задача рассылки (для мгновенной отмены кнопкой «Отмена»)
+active_broadcasts: dict[int, asyncio.Task] = {}
+
+# Одиночные медиа, которые рассылаются повторным использованием file_id: вид -> метод Bot API
+_MEDIA_METHODS: dict[str, type[TelegramMethod]] = {
+    "photo": SendPhoto,
+    "video": SendVideo,
+    "animation": SendAnimation,
+    "document": SendDocument,
+    "audio": SendAudio,
+    "voice": SendVoice,
+}
+
+
+def broadcast_payload(msg: Message) -> dict | None:
+    """
+    Содержимое сообщения для рассылки, если его можно отправить напрямую (текст или одно медиа):
+    тогда рассылка идёт через send_message/send_<медиа> по file_id без copy_message на каждого получателя.
+    Для прочих типов (альбомы, опросы, стикеры и т.п.) возвращает None — используется copy_message.
+    """
+    if msg.text:
+        return {
+            "kind": "text",
+            "text": msg.text,
+            "entities": [e.model_dump(mode="json", exclude_none=True) for e in msg.entities or ()],
+        }
+    if msg.media_group_id:
+        return None
+    for kind in _MEDIA_METHODS:
+        media = getattr(msg, kind)
+        if media:
+            # У фото несколько размеров — берём самый крупный
+            file_id = media[-1].file_id if kind == "photo" else media.file_id
+            return {
+                "kind": kind,
+                kind: file_id,
+                "caption": msg.caption,
+                "caption_entities": [e.model_dump(mode="json", exclude_none=True) for e in msg.caption_entities or ()],
+            }
+    return None
+
+
+def broadcast_method(src_chat_id: int, src_message_id: int, payload: dict | None) -> TelegramMethod:
+    """Шаблон запроса рассылки; для каждого получателя в нём меняется только chat_id."""
+    if payload and payload["kind"] == "text":
+        return SendMessage(chat_id=src_chat_id, text=payload["text"], entities=payload["entities"] or None)
+    if payload and payload["kind"] in _MEDIA_METHODS:
+        kind = payload["kind"]
+        return _MEDIA_METHODS[kind](
+            chat_id=src_chat_id, **{kind: payload[kind]},
+            caption=payload["caption"], caption_entities=payload["caption_entities"] or None,
+        )
+    return CopyMessage(chat_id=src_chat_id, from_chat_id=src_chat_id, message_id=src_message_id)
+
+
+async def _send_with_retry(bot: Bot, method: TelegramMethod, uid: int) -> bool | None:
+    """
+    Отправляет одно сообщение рассылки. На 429 ждёт retry_after (общий bucket в это время
+    тоже стоит на паузе), на сетевые ошибки — экспоненциальную паузу с джиттером.
+    Возвращает None, если пользователь заблокировал бота.
+    """
+    for attempt in range(BROADCAST_RETRIES + 1):
+        try:
+            await bot(method)
+            return True
+        except TelegramForbiddenError:
+            log.debug("[Bot.Broadcast] User %s blocked the bot", uid)
+            return None
+        except TelegramRetryAfter as e:
+            delay = e.retry_after
+        except TelegramNetworkError as e:
+            delay = min(2 ** attempt, 30) + random.uniform(0, 1)
+            log.debug("[Bot.Broadcast] Network error for %s (attempt %s): %r", uid, attempt + 1, e)
+        except TelegramAPIError as e:
+            log.warning("[Bot.Broadcast] Failed to deliver to %s: %r", uid, e)
+            return False
+        if attempt < BROADCAST_RETRIES:
+            await asyncio.sleep(delay)
+    log.warning("[Bot.Broadcast] Failed to deliver to %s: retries exhausted", uid)
+    return False
+
+
+async def claim_chunks(
+        broadcast_manager: BroadcastManager, broadcast_id: int, stats: dict[str, int], blocked: list[int]
+) -> AsyncIterator[list[int]]:
+    """
+    Пачки получателей из очереди рассылки в БД; после каждой пачки сохраняет текущие счётчики
+    и помечает накопившихся в `blocked` пользователей (остаток передаётся в finish_broadcast).
+    """
+    while chunk := await broadcast_manager.claim_batch(broadcast_id, CLAIM_SIZE):
+        yield chunk
+        flushed = blocked[:]
+        blocked.clear()
+        await broadcast_manager.save_progress(broadcast_id, stats["ok"], stats["fail"], flushed)
+
+
+async def run_broadcast(
+        bot: Bot, chunks: AsyncIterator[list[int]], send_tpl: TelegramMethod, stats: dict[str, int],
+        blocked: list[int],
+) -> None:
+    """
+    Рассылает сообщение получателям пулом из BROADCAST_WORKERS воркеров внутри TaskGroup.
+    ID подгружаются пачками и отправка начинается с первой пачки, не дожидаясь всего списка.
+    Темп задаёт общий token bucket сессии бота (RequestThrottleMiddleware), а не фиксированная пауза.
+    Отмена задачи сразу прерывает все ещё не завершённые отправки.
+    Заблокировавшие бота получатели считаются ошибками и добавляются в `blocked`.
+    """
+    queue: asyncio.Queue[int | None] = asyncio.Queue(maxsize=BROADCAST_WORKERS * 2)
+
+    async def _worker() -> None:
+        # None в очереди — сигнал воркеру завершиться
+        while (uid := await queue.get()) is not None:
+            sent = await _send_with_retry(bot, send_tpl.model_copy(update={"chat_id": uid}), uid)
+            if sent:
+                stats["ok"] += 1
+            else:
+                stats["fail"] += 1
+                if sent is None:
+                    blocked.append(uid)
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(BROADCAST_WORKERS):
+            tg.create_task(_worker())
+        async for chunk in chunks:
+            for uid in chunk:
+                await queue.put(uid)
+        for _ in range(BROADCAST_WORKERS):
+            await queue.put(None)
+
+
+async def resume_broadcasts(bot: Bot, broadcast_manager: BroadcastManager) -> None:
+    """
+    Досылает рассылки, прерванные перезапуском бота, и сообщает итог админу, который их запустил.
+    Вызывается один раз при старте.
+    """
+    try:
+        broadcasts = await broadcast_manager.list_running()
+    except Exception as e:
+        log.error("[Bot.Broadcast] Не удалось получить незавершённые рассылки: %s", e)
+        return
+
+    for b in broadcasts:
+        log.info("[Bot.Broadcast] Продолжаю рассылку #%s после перезапуска", b["id"])
+        stats = {"ok": b["ok_count"], "fail": b["fail_count"]}
+        blocked: list[int] = []
+        send_tpl = broadcast_method(b["src_chat_id"], b["src_message_id"], b["payload"])
+        admin_id = b["admin_chat_id"]
+        # Регистрируем как обычную рассылку, чтобы админ мог остановить её кнопкой «Отмена»
+        task = asyncio.create_task(
+            run_broadcast(bot, claim_chunks(broadcast_manager, b["id"], stats, blocked), send_tpl, stats, blocked)
+        )
+        active_broadcasts[admin_id] = task
+        try:
+            await task
+            title, status = "завершена", "done"
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            title, status = "остановлена", "cancelled"
+        finally:
+            active_broadcasts.pop(admin_id, None)
+
+        await broadcast_manager.finish_broadcast(b["id"], status, stats["ok"], stats["fail"], blocked)
+        try:
+            await bot.send_message(
+                admin_id,
+                f"Рассылка, прерванная перезапуском бота, {title}.\n"
+                f"Успешно: `{stats['ok']}`, ошибок: `{stats['fail']}`.",
+                parse_mode="Markdown",
+            )
+        except TelegramAPIError as e:
+            log.warning("[Bot.Broadcast] Не удалось сообщить админу об итогах рассылки #%s: %s", b["id"], e)
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from functools import wraps
+
+# Зарегистрированные кэши по тегам: тег -> список словарей-хранилищ
+_TAGGED: dict[str, list[dict]] = {}
+
+
+def async_ttl_cache(ttl: float, tag: str | None = None, cache_none: bool = True, maxsize: int | None = None):
+    """
+    Кэширует результат async-функции (метода) на `ttl` секунд по её аргументам.
+    Одновременные вызовы с одинаковыми аргументами ждут один общий запрос.
+    Кэш сбрасывается через `func.invalidate()` или `invalidate_tag(tag)` —
+    вызывайте это в методах, которые меняют соответствующие данные.
+    `cache_none=False` — не запоминать None (например, ошибку внешнего API).
+    `maxsize` — ограничить число записей, при переполнении вытесняется самая старая.
+    """
+
+    def decorator(func):
+        store: dict = {}
+        # Запросы «в полёте»: ключ -> задача. Сброс кэша очищает и их, поэтому результат
+        # запроса, начатого до сброса, в кэш уже не попадёт
+        inflight: dict = {}
+        if tag:
+            _TAGGED.setdefault(tag, []).extend((store, inflight))
+
+        def _remember(key, task: asyncio.Task) -> None:
+            if inflight.get(key) is not task:
+                return
+            del inflight[key]
+            if task.cancelled() or task.exception() is not None:
+                return
+            result = task.result()
+            if result is not None or cache_none:
+                store.pop(key, None)
+                store[key] = (time.monotonic() + ttl, result)
+                if maxsize is not None and len(store) > maxsize:
+                    del store[next(iter(store))]
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            hit = store.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                return hit[1]
+            task = inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                inflight[key] = task
+                task.add_done_callback(lambda t: _remember(key, t))
+            # shield: отмена одного ожидающего не прерывает запрос для остальных
+            return await asyncio.shield(task)
+
+        def invalidate() -> None:
+            store.clear()
+            inflight.clear()
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tag(tag: str) -> None:
+    """Сбрасывает все кэши, помеченные тегом."""
+    for store in _TAGGED.get(tag, ()):
+        store.clear()
@@ -0,0 +1,47 @@
+from collections import namedtuple
+from typing import Callable
+
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery
+
+
+class CbData(Filter):
+    """
+    Фильтр callback_data вида "<префикс>:<поле1>:<поле2>...".
+    Проверяет префикс и разбирает поля за один split с известным числом частей,
+    приводя их к нужным типам. Разобранные значения попадают в хендлер как аргумент `cb`.
+
+    Пример: CbData("adm-pos:edit-price", ("pid", int)) -> cb.pid
+    """
+
+    def __init__(self, prefix: str, *fields: tuple[str, Callable[[str], object]]):
+        self.prefix = prefix + ":"
+        self.fields = fields
+        self._maxsplit = len(fields) - 1
+        self._tuple = namedtuple("Cb", [name for name, _ in fields])
+
+    async def __call__(self, call: CallbackQuery) -> bool | dict:
+        data = call.data
+        if not data or not data.startswith(self.prefix):
+            return False
+
+        parts = data[len(self.prefix):].split(":", self._maxsplit)
+        if len(parts) != len(self.fields):
+            return False
+        try:
+            values = [conv(part) for part, (_, conv) in zip(parts, self.fields)]
+        except ValueError:
+            return False
+        return {"cb": self._tuple(*values)}
+
+
+def one_of(*choices: str) -> Callable[[str], str]:
+    """Конвертер поля CbData: пропускает только перечисленные значения (иначе фильтр не сработает)."""
+    allowed = frozenset(choices)
+
+    def conv(value: str) -> str:
+        if value not in allowed:
+            raise ValueError(value)
+        return value
+
+    return conv
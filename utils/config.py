@@ -4,6 +4,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
+# Размер пула keep-alive соединений к Bot API (должен быть не меньше параллелизма рассылки)
+BOT_SESSION_LIMIT = int(os.getenv("BOT_SESSION_LIMIT", "50"))
+# Общий лимит исходящих запросов к Bot API в секунду (глобальный лимит Telegram — около 30)
+BOT_RATE_LIMIT = float(os.getenv("BOT_RATE_LIMIT", "30"))
 
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
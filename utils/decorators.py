@@ -5,7 +5,7 @@ from aiogram import types
 from aiogram.fsm.context import FSMContext
 from aiogram.exceptions import TelegramBadRequest
 
-from utils.secrets import get_admin_ids
+from utils.secrets import is_admin_id
 from keyboards.client import get_main_inline_keyboard
 
 log = logging.getLogger("[Bot.Decorator]")
@@ -33,7 +33,7 @@ async def handle_telegram_error(
             log.debug("[Bot.Decorator] FSM состояние очищено из-за ошибки Telegram")
 
         user = call.from_user if call else message.from_user if message else None
-        is_admin = user and user.id in get_admin_ids()
+        is_admin = user and is_admin_id(user.id)
 
         target = call.message if call else message if message else None
         if target:
@@ -41,10 +41,10 @@ async def handle_telegram_error(
                 text="Не удалось изменить предыдущее сообщение. Выберите действие:",
                 reply_markup=get_main_inline_keyboard(is_admin)
             )
-            log.info(f"[Bot.Decorator] Ошибка Telegram обработана для пользователя {user.id if user else 'unknown'}")
+            log.info("[Bot.Decorator] Ошибка Telegram обработана для пользователя %s", user.id if user else 'unknown')
         return True
 
-    log.warning(f"[Bot.Decorator] [UNHANDLED TelegramBadRequest] {e}")
+    log.warning("[Bot.Decorator] [UNHANDLED TelegramBadRequest] %s", e)
     return False
 
 
@@ -91,17 +91,20 @@ async def _clear_and_show(target, state, text, is_admin=False):
 
 
 def admin_only(handler):
+    # @wraps обязателен: aiogram по сигнатуре оригинального хендлера решает, какие kwargs передавать
     @wraps(handler)
     async def wrapper(*args, **kwargs):
+        # Быстрый путь: событие (Message/CallbackQuery) всегда первый позиционный аргумент,
+        # поиск контекста по всем аргументам нужен только при отказе в доступе
+        user = getattr(args[0], "from_user", None) if args else None
+        user_id = user.id if user else None
+        if is_admin_id(user_id):
+            return await handler(*args, **kwargs)
+
         message, call, state = _get_ctx(args, kwargs)
-        user_id = (message.from_user.id if message else call.from_user.id if call else None)
-
-        if user_id not in get_admin_ids():
-            log.warning(
-                f"[Bot.Decorator] Пользователь {user_id} пытался зайти в {handler.__name__} без прав администратора")
-            await _clear_and_show(
-                call or message, state, "Извините, у вас недостаточно прав для этого действия.", is_admin=False)
-            return
-        return await handler(*args, **kwargs)
+        log.warning(
+            "[Bot.Decorator] Пользователь %s пытался зайти в %s без прав администратора", user_id, handler.__name__)
+        await _clear_and_show(
+            call or message, state, "Извините, у вас недостаточно прав для этого действия.", is_admin=False)
 
     return wrapper
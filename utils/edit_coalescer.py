@@ -0,0 +1,83 @@
+import asyncio
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
+
+from utils.logger import get_logger
+
+log = get_logger("[Bot.EditCoalescer]")
+
+# Окно, в котором серия правок одного сообщения схлопывается в одну (сек.)
+EDIT_DEBOUNCE = 0.05
+
+# (chat_id, message_id) -> последнее желаемое состояние сообщения
+_pending: dict[tuple[int, int], dict] = {}
+# (chat_id, message_id) -> задача, которая отправит правку
+_tasks: dict[tuple[int, int], asyncio.Task] = {}
+# После 429 от Telegram все правки ставятся на паузу до этого момента (loop.time())
+_resume_at = 0.0
+
+
+def schedule_edit(
+        bot: Bot,
+        chat_id: int,
+        message_id: int,
+        text: str | None = None,
+        reply_markup: InlineKeyboardMarkup | None = None,
+        parse_mode: str | None = None,
+) -> None:
+    """
+    Ставит правку сообщения в очередь. Серия быстрых правок одного сообщения
+    схлопывается: в Telegram уходит только последнее состояние.
+    Если text не передан — меняется только клавиатура.
+    """
+    key = (chat_id, message_id)
+    payload = _pending.get(key)
+    if payload is None or text is not None:
+        _pending[key] = {"text": text, "reply_markup": reply_markup, "parse_mode": parse_mode}
+    else:
+        # Новая правка только клавиатуры не должна терять ещё не отправленный текст
+        payload["reply_markup"] = reply_markup
+
+    if key not in _tasks:
+        _tasks[key] = asyncio.create_task(_flush(bot, key))
+
+
+async def _flush(bot: Bot, key: tuple[int, int]) -> None:
+    global _resume_at
+    loop = asyncio.get_running_loop()
+    chat_id, message_id = key
+
+    try:
+        while True:
+            await asyncio.sleep(max(EDIT_DEBOUNCE, _resume_at - loop.time()))
+
+            payload = _pending.pop(key, None)
+            if payload is None:
+                return
+
+            try:
+                if payload["text"] is None:
+                    await bot.edit_message_reply_markup(
+                        chat_id=chat_id, message_id=message_id, reply_markup=payload["reply_markup"]
+                    )
+                else:
+                    await bot.edit_message_text(
+                        text=payload["text"], chat_id=chat_id, message_id=message_id,
+                        reply_markup=payload["reply_markup"], parse_mode=payload["parse_mode"],
+                    )
+            except TelegramRetryAfter as e:
+                log.warning("[Bot.EditCoalescer] Flood control, пауза правок на %s сек.", e.retry_after)
+                _resume_at = loop.time() + e.retry_after
+                _pending.setdefault(key, payload)
+            except TelegramBadRequest as e:
+                if "message is not modified" not in str(e).lower():
+                    log.warning("[Bot.EditCoalescer] Не удалось изменить сообщение %s: %s", key, e)
+            except TelegramAPIError as e:
+                # Сетевой сбой, 5xx или блокировка бота — правка теряется, но следующие отправятся
+                log.warning("[Bot.EditCoalescer] Ошибка Telegram при изменении сообщения %s: %r", key, e)
+    finally:
+        # Иначе schedule_edit навсегда считал бы сообщение «занятым» и копил правки в _pending
+        _tasks.pop(key, None)
+        _pending.pop(key, None)
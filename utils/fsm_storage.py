@@ -0,0 +1,44 @@
+from copy import copy
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+
+class CompactMemoryStorage(MemoryStorage):
+    """
+    MemoryStorage, который не держит пустые записи.
+
+    Стандартное хранилище — defaultdict: любое чтение состояния (а FSM-middleware читает его
+    на каждом апдейте) создаёт запись, и она живёт вечно для каждого пользователя.
+    Здесь чтение не создаёт записей, а запись без состояния и данных удаляется после clear().
+    Сами состояния (строки вида "PosEdit:add_price") общие — это атрибуты классов StatesGroup.
+    """
+
+    def _compact(self, key: StorageKey) -> None:
+        record = self.storage.get(key)
+        if record is not None and record.state is None and not record.data:
+            del self.storage[key]
+
+    async def set_state(self, key: StorageKey, state: State | str | None = None) -> None:
+        await super().set_state(key, state)
+        self._compact(key)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self.storage.get(key)
+        return record.state if record is not None else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        await super().set_data(key, data)
+        self._compact(key)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self.storage.get(key)
+        return record.data.copy() if record is not None else {}
+
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Optional[Any] = None) -> Optional[Any]:
+        record = self.storage.get(storage_key)
+        if record is None:
+            return default
+        return copy(record.data.get(dict_key, default))
@@ -1,4 +1,5 @@
 # utils/notifications.py
+import asyncio
 import logging
 from typing import Dict, List, Tuple, Optional
 
@@ -23,7 +24,7 @@ async def notify_admins(bot: Bot, text: str, reply_markup: Optional[InlineKeyboa
         log.warning("Список ADMIN_IDS пуст. Уведомление не будет отправлено.")
         return
 
-    for admin_id in admin_ids:
+    async def _send(admin_id: int) -> None:
         try:
             await bot.send_message(
                 chat_id=admin_id,
@@ -33,9 +34,12 @@ async def notify_admins(bot: Bot, text: str, reply_markup: Optional[InlineKeyboa
             )
         except TelegramBadRequest as e:
             # Обрабатываем возможные ошибки: бот заблокирован админом, неверный ID и т.д.
-            log.error(f"Не удалось отправить уведомление администратору {admin_id}: {e}")
+            log.error("Не удалось отправить уведомление администратору %s: %s", admin_id, e)
         except Exception as e:
-            log.exception(f"Непредвиденная ошибка при отправке уведомления администратору {admin_id}: {e}")
+            log.exception("Непредвиденная ошибка при отправке уведомления администратору %s: %s", admin_id, e)
+
+    # Админы получают уведомление параллельно: обработчик заказа не ждёт N последовательных запросов
+    await asyncio.gather(*(_send(admin_id) for admin_id in admin_ids))
 
 
 def format_order_for_admin(
@@ -1,11 +1,15 @@
+from functools import lru_cache
+
 import phonenumbers
 from phonenumbers.phonenumberutil import NumberParseException
 
 
+@lru_cache(maxsize=1024)
 def normalize_phone(raw: str, default_region: str = "RU") -> str | None:
     """
     Приводит телефон к формату E.164 («+77771234567»).
     Возвращает None, если номер некорректный.
+    Разбор через phonenumbers дорогой, а функция чистая, поэтому результат кэшируется.
     """
     try:
         num = phonenumbers.parse(raw, default_region)
@@ -23,7 +23,7 @@ async def check_delivery_statuses(
         log.info("Активных заказов для синхронизации с Яндексом не найдено.")
         return
 
-    log.info(f"Найдено {len(active_delivery_orders)} активных доставок для проверки.")
+    log.info("Найдено %s активных доставок для проверки.", len(active_delivery_orders))
 
     synced_count = 0
     # 2. Проверяем статус каждого заказа
@@ -31,20 +31,19 @@ async def check_delivery_statuses(
         order_id = order['id']
         claim_id = order['yandex_claim_id']
 
-        log.debug(f"{order_id}")
+        log.debug("%s", order_id)
 
         if claim_id is None:
             await buyer_order_manager.cancel_order(order_id)
 
-            log.info(
-                f"Статус заказа #{order_id} был автоматически отменён.")
+            log.info("Статус заказа #%s был автоматически отменён.", order_id)
 
             return
 
         try:
-            claim_info = await yandex_delivery_client.get_claim_info(claim_id)
+            claim_info = await yandex_delivery_client.fetch_claim_info(claim_id)
             if not claim_info:
-                log.warning(f"Не удалось получить информацию по заявке {claim_id} для заказа #{order_id}.")
+                log.warning("Не удалось получить информацию по заявке %s для заказа #%s.", claim_id, order_id)
                 continue
 
             yandex_status = claim_info.get("status")
@@ -54,14 +53,13 @@ async def check_delivery_statuses(
 
             if was_updated:
                 synced_count += 1
-                log.info(
-                    f"Статус заказа #{order_id} был автоматически синхронизирован."
-                    f" Новый статус в Яндексе: {yandex_status}.")
+                log.info("Статус заказа #%s был автоматически синхронизирован. Новый статус в Яндексе: %s.",
+                         order_id, yandex_status)
 
         except Exception as e:
-            log.exception(f"Ошибка при синхронизации статуса для заказа #{order_id} (claim_id: {claim_id}): {e}")
+            log.exception("Ошибка при синхронизации статуса для заказа #%s (claim_id: %s): %s", order_id, claim_id, e)
 
-    log.info(f"Задача синхронизации статусов завершена. Обновлено статусов: {synced_count}.")
+    log.info("Задача синхронизации статусов завершена. Обновлено статусов: %s.", synced_count)
 
 
 async def cleanup_stuck_orders(buyer_order_manager: BuyerOrderManager):
@@ -70,13 +68,13 @@ async def cleanup_stuck_orders(buyer_order_manager: BuyerOrderManager):
     """
     # Устанавливаем таймаут. Если за 20 минут заявка не создалась - отменяем.
     timeout = 20
-    log.info(f"Запуск задачи очистки зависших заказов (старше {timeout} минут)...")
+    log.info("Запуск задачи очистки зависших заказов (старше %s минут)...", timeout)
 
     try:
         cancelled_ids = await buyer_order_manager.cancel_stuck_processing_orders(timeout)
         if cancelled_ids:
-            log.info(f"Очистка завершена. Отменено зависших заказов: {len(cancelled_ids)}.")
+            log.info("Очистка завершена. Отменено зависших заказов: %s.", len(cancelled_ids))
         else:
             log.info("Очистка завершена. Зависших заказов не найдено.")
     except Exception as e:
-        log.exception(f"Критическая ошибка в задаче очистки зависших заказов: {e}")
+        log.exception("Критическая ошибка в задаче очистки зависших заказов: %s", e)
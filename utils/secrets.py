@@ -10,6 +10,14 @@ log = logging.getLogger(__name__)
 
 SECRETS_JSON_PATH = os.path.join(os.path.dirname(__file__), '../secrets.json')
 
+# Кэш списка администраторов в памяти: файл читается один раз (при импорте модуля),
+# add_admin_id/remove_admin_id обновляют и файл, и кэш (write-through)
+_admin_ids: list[int] | None = None
+# Неизменяемое множество для is_admin_id: при изменениях подменяется целиком, без мутаций на месте
+_admin_id_set: frozenset[int] = frozenset()
+# Неизменяемый снимок списка для get_admin_ids: пересобирается только при изменениях
+_admin_ids_view: tuple[int, ...] = ()
+
 
 def _load_secrets() -> dict:
     try:
@@ -25,15 +33,52 @@ def _save_secrets(data: dict) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
-def get_admin_ids() -> list[int]:
+def _ensure_loaded() -> list[int]:
+    global _admin_ids, _admin_id_set, _admin_ids_view
+    if _admin_ids is None:
+        with file_lock:
+            if _admin_ids is None:
+                secrets = _load_secrets()
+                # Убедимся, что храним список целых чисел
+                ids = [int(admin_id) for admin_id in secrets.get('ADMIN_IDS', [])]
+                _admin_id_set = frozenset(ids)
+                _admin_ids_view = tuple(ids)
+                _admin_ids = ids
+    return _admin_ids
+
+
+def _refresh_view() -> None:
+    global _admin_ids_view, _admin_id_set
+    _admin_ids_view = tuple(_admin_ids)
+    _admin_id_set = frozenset(_admin_ids)
+
+
+def get_admin_ids() -> tuple[int, ...]:
+    """Список ID администраторов из кэша в памяти (без чтения файла и без копирования)."""
+    _ensure_loaded()
+    return _admin_ids_view
+
+
+def reload_admin_ids() -> None:
+    """Сбрасывает кэш и перечитывает secrets.json (например, после ручной правки файла)."""
+    global _admin_ids
     with file_lock:
-        secrets = _load_secrets()
-        # Убедимся, что возвращаем список целых чисел
-        return [int(admin_id) for admin_id in secrets.get('ADMIN_IDS', [])]
+        _admin_ids = None
+    _ensure_loaded()
+    log.info("Список администраторов перечитан из файла: %s шт.", len(_admin_ids_view))
+
+
+def is_admin_id(user_id: int | None) -> bool:
+    """
+    Быстрая проверка прав администратора по кэшированному множеству ID (стоит в @admin_only
+    на каждом апдейте). Список загружен при импорте модуля, поэтому здесь только проверка вхождения.
+    """
+    return user_id in _admin_id_set
 
 
 def add_admin_id(user_id: int) -> bool:
     """Добавляет ID нового администратора. Возвращает True, если ID был добавлен."""
+    _ensure_loaded()
     with file_lock:
         secrets = _load_secrets()
         admin_ids = secrets.get('ADMIN_IDS', [])
@@ -41,14 +86,17 @@ def add_admin_id(user_id: int) -> bool:
             admin_ids.append(user_id)
             secrets['ADMIN_IDS'] = admin_ids
             _save_secrets(secrets)
-            log.info(f"Администратор с ID {user_id} был добавлен.")
+            _admin_ids.append(user_id)
+            _refresh_view()
+            log.info("Администратор с ID %s был добавлен.", user_id)
             return True
-        log.warning(f"Попытка добавить существующего администратора с ID {user_id}.")
+        log.warning("Попытка добавить существующего администратора с ID %s.", user_id)
         return False
 
 
 def remove_admin_id(user_id: int) -> bool:
     """Удаляет ID администратора. Возвращает True, если ID был удален."""
+    _ensure_loaded()
     with file_lock:
         secrets = _load_secrets()
         admin_ids = secrets.get('ADMIN_IDS', [])
@@ -56,7 +104,13 @@ def remove_admin_id(user_id: int) -> bool:
             admin_ids.remove(user_id)
             secrets['ADMIN_IDS'] = admin_ids
             _save_secrets(secrets)
-            log.info(f"Администратор с ID {user_id} был удален.")
+            if user_id in _admin_id_set:
+                _admin_ids.remove(user_id)
+                _refresh_view()
+            log.info("Администратор с ID %s был удален.", user_id)
             return True
-        log.warning(f"Попытка удалить несуществующего администратора с ID {user_id}.")
+        log.warning("Попытка удалить несуществующего администратора с ID %s.", user_id)
         return False
+
+
+_ensure_loaded()